@@ -19,13 +19,18 @@
 #     https://github.com/munki/munki/blob/main/code/client/munkilib/pkgutils.py
 
 
+import bz2
 import glob
+import hashlib
+import io
+import lzma
 import os
 import plistlib
 import re
-import shutil
+import struct
 import subprocess
-import tempfile
+import xml.etree.ElementTree as ET
+import zlib
 from xml.dom import minidom
 from urllib.parse import unquote
 
@@ -38,6 +43,127 @@ __all__ = ["PkgInfoReader"]
 # we use lots of camelCase-style names. Deal with it.
 # pylint: disable=C0103
 
+# XAR header: magic, header size, version, compressed and uncompressed TOC
+# lengths, checksum algorithm (all big-endian)
+XAR_HEADER = struct.Struct(">4sHHQQI")
+XAR_MAGIC = b"xar!"
+
+# decompressors for the encodings used in XAR archives. "x-gzip" is a zlib
+# stream; wbits=47 also accepts a gzip header
+XAR_DECODERS = {
+    "application/octet-stream": lambda data: data,
+    "application/x-gzip": lambda data: zlib.decompress(data, 47),
+    "application/x-bzip2": bz2.decompress,
+    "application/x-lzma": lzma.decompress,
+    "application/x-xz": lzma.decompress,
+}
+
+
+class XarError(Exception):
+    """A file is not a readable XAR archive, or an entry cannot be read"""
+
+
+class XarArchive:
+    """Reads files from a XAR archive, such as a flat package, without xar.
+
+    The table of contents is read and decompressed once, when the archive is
+    opened. read() then seeks to a file in the heap and decompresses it in
+    memory, so nothing is written to disk.
+    """
+
+    def __init__(self, path):
+        self._fp = open(path, "rb")  # pylint: disable=consider-using-with
+        try:
+            header = self._fp.read(XAR_HEADER.size)
+            if len(header) < XAR_HEADER.size:
+                raise XarError("file is too short to be a XAR archive")
+            magic, header_size, _, toc_length, toc_size, _ = XAR_HEADER.unpack(
+                header
+            )
+            if magic != XAR_MAGIC:
+                raise XarError("not a XAR archive")
+            self._fp.seek(header_size)
+            try:
+                toc = zlib.decompress(self._fp.read(toc_length))
+                root = ET.fromstring(toc)
+            except (zlib.error, ET.ParseError) as e:
+                raise XarError(f"unreadable table of contents: {e}") from e
+            if len(toc) != toc_size:
+                raise XarError("table of contents has the wrong size")
+            self._heap = header_size + toc_length
+            self._entries = {}
+            self._walk(root.find("toc"), "")
+        except (OSError, XarError):
+            self._fp.close()
+            raise
+
+    def _walk(self, parent, prefix):
+        """Record every file under a TOC element, parents before children"""
+        if parent is None:
+            return
+        for elem in parent.findall("file"):
+            name = elem.findtext("name") or ""
+            path = prefix + name
+            self._entries[path] = elem
+            self._walk(elem, path + "/")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Close the archive file"""
+        self._fp.close()
+
+    def names(self):
+        """Return the path of every file and directory, in TOC order"""
+        return list(self._entries)
+
+    def read(self, name):
+        """Return the extracted contents of a file"""
+        elem = self._entries.get(name)
+        if elem is None or elem.findtext("type", "file") != "file":
+            raise XarError(f"{name} is not a file in the archive")
+        data_elem = elem.find("data")
+        if data_elem is None:
+            return b""
+        try:
+            offset = int(data_elem.findtext("offset"))
+            length = int(data_elem.findtext("length"))
+        except (TypeError, ValueError) as e:
+            raise XarError(f"{name} has no valid offset or length") from e
+        encoding_elem = data_elem.find("encoding")
+        encoding = (
+            "application/octet-stream"
+            if encoding_elem is None
+            else encoding_elem.get("style")
+        )
+        decode = XAR_DECODERS.get(encoding)
+        if decode is None:
+            raise XarError(f"{name} has an unsupported encoding {encoding}")
+
+        self._fp.seek(self._heap + offset)
+        data = self._fp.read(length)
+        if len(data) != length:
+            raise XarError(f"{name} is truncated")
+        try:
+            data = decode(data)
+        except (zlib.error, OSError, lzma.LZMAError, ValueError) as e:
+            raise XarError(f"could not decompress {name}: {e}") from e
+
+        checksum = data_elem.find("extracted-checksum")
+        if checksum is not None and checksum.text:
+            try:
+                digest = hashlib.new(checksum.get("style", "sha1"), data)
+            except ValueError:
+                # an algorithm hashlib does not provide; skip the check
+                digest = None
+            if digest and digest.hexdigest() != checksum.text.strip().lower():
+                raise XarError(f"{name} does not match its checksum")
+        return data
+
 
 class PkgInfoReader(Copier):
     """This processor looks for information in packages with the primary objective of
@@ -71,7 +197,8 @@ class PkgInfoReader(Copier):
     description = __doc__
 
     def getProductVersionFromDist(self, filename):
-        """Extracts product version from a Distribution file"""
+        """Extracts product version from a Distribution file (a path or a file
+        object)"""
         dom = minidom.parse(filename)
         product = dom.getElementsByTagName("product")
         if product:
@@ -82,8 +209,10 @@ class PkgInfoReader(Copier):
 
     def parsePkgRefs(self, filename, path_to_pkg=None):
         """Parses a .dist or PackageInfo file looking for pkg-ref or pkg-info tags
-        to get info on included sub-packages"""
+        to get info on included sub-packages. filename may also be a file object,
+        in which case relative references are resolved against path_to_pkg"""
         info = []
+        source_path = filename if isinstance(filename, str) else path_to_pkg
         dom = minidom.parse(filename)
         pkgrefs = dom.getElementsByTagName("pkg-info")
         if pkgrefs:
@@ -129,7 +258,9 @@ class PkgInfoReader(Copier):
                             if text.endswith(".pkg"):
                                 if text.startswith("file:"):
                                     relativepath = unquote(text[5:])
-                                    pkgdir = os.path.dirname(path_to_pkg or filename)
+                                    pkgdir = os.path.dirname(
+                                        path_to_pkg or source_path
+                                    )
                                     pkgref_dict[pkgid]["file"] = os.path.join(
                                         pkgdir, relativepath
                                     )
@@ -137,7 +268,7 @@ class PkgInfoReader(Copier):
                                     if text.startswith("#"):
                                         text = text[1:]
                                     relativepath = unquote(text)
-                                    thisdir = os.path.dirname(filename)
+                                    thisdir = os.path.dirname(source_path)
                                     pkgref_dict[pkgid]["file"] = os.path.join(
                                         thisdir, relativepath
                                     )
@@ -181,50 +312,45 @@ class PkgInfoReader(Copier):
         """
 
         receiptarray = []
-        # get the absolute path to the pkg because we need to do a chdir later
+        productversion = None
+        # get the absolute path to the pkg, against which references are resolved
         abspkgpath = os.path.abspath(pkgpath)
-        # make a tmp dir to expand the flat package into
-        pkgtmp = tempfile.mkdtemp(dir="/tmp")
-        # record our current working dir
-        cwd = os.getcwd()
-        # change into our tmp dir so we can use xar to unarchive the flat package
-        os.chdir(pkgtmp)
-        # Get the TOC of the flat pkg so we can search it later
-        cmd_toc = ["/usr/bin/xar", "-tf", abspkgpath]
-        proc = subprocess.Popen(
-            cmd_toc, bufsize=-1, stdout=subprocess.PIPE, stderr=subprocess.PIPE
-        )
-        (toc, err) = proc.communicate()
-        toc = toc.decode("UTF-8").strip().split("\n")
-        if proc.returncode == 0:
+        # read the TOC of the flat pkg once; the files we need are then read
+        # straight from the archive into memory
+        try:
+            xar = XarArchive(abspkgpath)
+        except (OSError, XarError) as err:
+            self.output(f"An error occurred while reading {pkgpath}: {err}")
+            return {"receipts": receiptarray, "product_version": productversion}
+
+        with xar:
+
+            def extract(toc_entry):
+                try:
+                    return io.BytesIO(xar.read(toc_entry))
+                except (OSError, XarError) as err:
+                    self.output(
+                        f"An error occurred while extracting {toc_entry}: {err}"
+                    )
+                    return None
+
+            toc = xar.names()
             # Walk trough the TOC entries
             for toc_entry in toc:
                 # If the TOC entry is a top-level PackageInfo, extract it
                 if toc_entry.startswith("PackageInfo") and not receiptarray:
-                    cmd_extract = ["/usr/bin/xar", "-xf", abspkgpath, toc_entry]
-                    result = subprocess.call(cmd_extract)
-                    if result == 0:
-                        packageinfoabspath = os.path.abspath(
-                            os.path.join(pkgtmp, toc_entry)
+                    packageinfo = extract(toc_entry)
+                    if packageinfo:
+                        receiptarray = self.parsePkgRefs(
+                            packageinfo, path_to_pkg=abspkgpath
                         )
-                        receiptarray = self.parsePkgRefs(packageinfoabspath)
                         break
-                    else:
-                        self.output(
-                            f"An error occurred while extracting {toc_entry}: {err}"
-                        )
                 # If there are PackageInfo files elsewhere, gather them up
                 elif toc_entry.endswith(".pkg/PackageInfo"):
-                    cmd_extract = ["/usr/bin/xar", "-xf", abspkgpath, toc_entry]
-                    result = subprocess.call(cmd_extract)
-                    if result == 0:
-                        packageinfoabspath = os.path.abspath(
-                            os.path.join(pkgtmp, toc_entry)
-                        )
-                        receiptarray.extend(self.parsePkgRefs(packageinfoabspath))
-                    else:
-                        self.output(
-                            f"An error occurred while extracting {toc_entry}: {err}"
+                    packageinfo = extract(toc_entry)
+                    if packageinfo:
+                        receiptarray.extend(
+                            self.parsePkgRefs(packageinfo, path_to_pkg=abspkgpath)
                         )
             if not receiptarray:
                 self.output(
@@ -232,22 +358,12 @@ class PkgInfoReader(Copier):
                     "the package."
                 )
 
-            productversion = None
-            for toc_entry in [item for item in toc if item == "Distribution"]:
+            if "Distribution" in toc:
                 # Extract the Distribution file
-                cmd_extract = ["/usr/bin/xar", "-xf", abspkgpath, toc_entry]
-                result = subprocess.call(cmd_extract)
-                if result == 0:
-                    distributionabspath = os.path.abspath(
-                        os.path.join(pkgtmp, toc_entry)
-                    )
-                    productversion = self.getProductVersionFromDist(distributionabspath)
-        else:
-            self.output(err.decode("UTF-8"))
+                distribution = extract("Distribution")
+                if distribution:
+                    productversion = self.getProductVersionFromDist(distribution)
 
-        # change back to original working dir
-        os.chdir(cwd)
-        shutil.rmtree(pkgtmp)
         info = {"receipts": receiptarray, "product_version": productversion}
         return info
 
@@ -406,12 +522,17 @@ class PkgInfoReader(Copier):
         """Uses Apple's installer tool to get RestartAction
         from an installer item."""
         installerinfo = {}
-        proc = subprocess.Popen(
-            ["/usr/sbin/installer", "-query", "RestartAction", "-pkg", filename],
-            bufsize=-1,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-        )
+        try:
+            proc = subprocess.Popen(
+                ["/usr/sbin/installer", "-query", "RestartAction", "-pkg", filename],
+                bufsize=-1,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+            )
+        except OSError as err:
+            # installer is only available on macOS
+            self.output(f"Could not query RestartAction with installer: {err}")
+            return {}
         (out, err) = proc.communicate()
         out = out.decode("UTF-8")
         err = err.decode("UTF-8")
@@ -0,0 +1,204 @@
+#!/usr/local/autopkg/python
+# pylint: disable=invalid-name
+
+"""
+Copyright 2026 Graham Pugh
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+NOTES:
+The API endpoint must be defined in the api_endpoints function in JamfUploaderBase.py
+
+All functions are in JamfUploaderLib/JamfBulkObjectUploaderBase.py
+"""
+
+import os.path
+import sys
+
+# to use a base module in AutoPkg we need to add this path to the sys.path.
+# this violates flake8 E402 (PEP8 imports) but is unavoidable, so the following
+# imports require noqa comments for E402
+sys.path.insert(0, os.path.dirname(__file__))
+
+from JamfUploaderLib.JamfBulkObjectUploaderBase import (  # pylint: disable=import-error, wrong-import-position
+    JamfBulkObjectUploaderBase,
+)
+
+__all__ = ["JamfBulkObjectUploader"]
+
+
+class JamfBulkObjectUploader(JamfBulkObjectUploaderBase):
+    """Processor to upload many API objects listed in a manifest"""
+
+    description = (
+        "A processor for AutoPkg that will create or update the API objects listed "
+        "in a JSON or YAML manifest on a Jamf Pro server. Existing objects are found "
+        "with one list request per object type, and the objects are uploaded "
+        "concurrently, in stages so that categories are uploaded before scripts "
+        "and extension attributes, those before groups, and groups before policies "
+        "and other objects. "
+        "Jamf Pro privileges are required by the API_USERNAME user for every "
+        "object type in the manifest."
+    )
+
+    input_variables = {
+        "JSS_URL": {
+            "required": True,
+            "description": "URL to a Jamf Pro server that the API user has write access "
+            "to, optionally set as a key in the com.github.autopkg "
+            "preference file.",
+        },
+        "API_USERNAME": {
+            "required": False,
+            "description": "Username of account with appropriate access to "
+            "jss, optionally set as a key in the com.github.autopkg "
+            "preference file.",
+        },
+        "API_PASSWORD": {
+            "required": False,
+            "description": "Password of api user, optionally set as a key in "
+            "the com.github.autopkg preference file.",
+        },
+        "CLIENT_ID": {
+            "required": False,
+            "description": "Client ID with access to "
+            "jss, optionally set as a key in the com.github.autopkg "
+            "preference file.",
+        },
+        "CLIENT_SECRET": {
+            "required": False,
+            "description": "Secret associated with the Client ID, optionally set as a key in "
+            "the com.github.autopkg preference file.",
+        },
+        "BEARER_TOKEN": {
+            "required": False,
+            "description": "A pre-existing bearer token for the Jamf Pro API. "
+            "If provided, the token will be validated and used directly, "
+            "bypassing credential-based authentication.",
+        },
+        "JAMF_CLI_PROFILE": {
+            "required": False,
+            "description": "A jamf-cli profile to use to obtain a bearer token. "
+            "Requires jamf-cli to be installed and in the PATH. "
+            "Set to a profile name to enable.",
+            "default": "",
+        },
+        "PLATFORM_API_REGION": {
+            "required": False,
+            "description": "Region for Jamf Platform API Gateway (e.g., 'us1', 'eu1', 'au1'). "
+            "Required for Platform API authentication.",
+            "default": "",
+        },
+        "PLATFORM_API_TENANT_ID": {
+            "required": False,
+            "description": "Tenant ID for Jamf Platform API Gateway. "
+            "Required for Platform API authentication.",
+            "default": "",
+        },
+        "dry_run": {
+            "required": False,
+            "description": "If True, perform read-only checks and report what would change "
+            "without making any writes.",
+            "default": False,
+        },
+        "disable_unchanged_check": {
+            "required": False,
+            "description": "If True, always upload a replaced object, even when the "
+            "existing object already matches it.",
+            "default": False,
+        },
+        "manifest": {
+            "required": True,
+            "description": (
+                "Path to a JSON or YAML manifest (YAML requires PyYAML). The manifest "
+                "is a list of objects, or a dictionary with an 'objects' list. Each "
+                "object has an object_type, object_name and object_template, and "
+                "optionally replace_object, elements_to_remove, element_to_replace, "
+                "replacement_value, keys (a dictionary of substitution keys for this "
+                "object only) and stage (to override the upload stage of its type). "
+                "Relative template paths are looked for next to the manifest first."
+            ),
+        },
+        "replace_object": {
+            "required": False,
+            "description": "Overwrite existing objects if True. Can be overridden for "
+            "each object in the manifest.",
+            "default": False,
+        },
+        "upload_workers": {
+            "required": False,
+            "description": (
+                "Number of objects to upload at once. "
+                "Must be an integer between 1 and 16."
+            ),
+            "default": "4",
+        },
+        "max_requests_per_second": {
+            "required": False,
+            "description": (
+                "Maximum number of requests per second to send to the Jamf host. "
+                "0 means unlimited."
+            ),
+            "default": "0",
+        },
+        "sleep": {
+            "required": False,
+            "description": "Pause after running this processor for specified seconds.",
+            "default": "0",
+        },
+        "max_tries": {
+            "required": False,
+            "description": (
+                "Maximum number of attempts to upload each object. "
+                "Must be an integer between 1 and 10."
+            ),
+            "default": "5",
+        },
+        "skip_if": {
+            "required": False,
+            "description": "Skip the process if the supplied predicate evaluates to True.",
+            "default": False,
+        },
+    }
+
+    output_variables = {
+        "jamfbulkobjectuploader_summary_result": {
+            "description": "Description of interesting results, with the time taken "
+            "by each object.",
+        },
+        "bulk_upload_results": {
+            "description": "List of the objects in the manifest, each with its "
+            "object_type, object_name, object_id, action (created, updated, "
+            "unchanged, skipped, failed or not attempted), seconds and error.",
+        },
+        "objects_updated": {
+            "description": "Boolean - True if any object was created or changed."
+        },
+        "process_skipped": {
+            "description": "Boolean - True if the upload process was skipped due to skip_if evaluating to True.",
+        },
+        "dry_run_summary_result": {
+            "description": "Summary of what would have been changed (only set when dry_run "
+            "is True).",
+        },
+    }
+
+    def main(self):
+        """Run the execute function"""
+
+        self.execute()
+
+
+if __name__ == "__main__":
+    PROCESSOR = JamfBulkObjectUploader()
+    PROCESSOR.execute_shell()
@@ -100,6 +100,12 @@ class JamfComputerGroupUploader(JamfComputerGroupUploaderBase):
             "without making any writes.",
             "default": False,
         },
+        "disable_unchanged_check": {
+            "required": False,
+            "description": "If True, always upload a replaced object, even when the "
+            "existing object already matches it.",
+            "default": False,
+        },
         "computergroup_name": {
             "required": False,
             "description": "Computer Group name",
@@ -142,6 +148,10 @@ class JamfComputerGroupUploader(JamfComputerGroupUploaderBase):
             "description": "Boolean - True if the process was skipped due to "
             "skip_if predicate resolved to True.",
         },
+        "jamfcomputergroupuploader_unchanged_summary_result": {
+            "description": "Objects that were not re-uploaded because the existing "
+            "object already matched.",
+        },
         "dry_run_summary_result": {
             "description": "Summary of what would have been changed (only set when dry_run "
             "is True).",
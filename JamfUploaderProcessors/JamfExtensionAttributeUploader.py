@@ -100,6 +100,12 @@ class JamfExtensionAttributeUploader(JamfExtensionAttributeUploaderBase):
             "without making any writes.",
             "default": False,
         },
+        "disable_unchanged_check": {
+            "required": False,
+            "description": "If True, always upload a replaced object, even when the "
+            "existing object already matches it.",
+            "default": False,
+        },
         "ea_name": {
             "required": False,
             "description": "Extension Attribute name",
@@ -185,6 +191,10 @@ class JamfExtensionAttributeUploader(JamfExtensionAttributeUploaderBase):
             "description": "Boolean - True if the process was skipped due to "
             "skip_if predicate resolved to True.",
         },
+        "jamfextensionattributeuploader_unchanged_summary_result": {
+            "description": "Objects that were not re-uploaded because the existing "
+            "object already matched.",
+        },
         "dry_run_summary_result": {
             "description": "Summary of what would have been changed (only set when dry_run "
             "is True).",
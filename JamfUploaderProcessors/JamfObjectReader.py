@@ -108,10 +108,18 @@ class JamfObjectReader(JamfObjectReaderBase):
             "default": "",
         },
         "object_type": {
-            "required": True,
-            "description": "Type of the object. This is the name of the key in the XML template",
+            "required": False,
+            "description": "Type of the object. This is the name of the key in the XML template. "
+            "Required unless object_types is set.",
             "default": "",
         },
+        "object_types": {
+            "required": False,
+            "description": (
+                "With all_objects, a list (or comma-separated string) of object "
+                "types to export in one run, instead of object_type."
+            ),
+        },
         "settings_key": {
             "required": False,
             "description": {
@@ -152,6 +160,40 @@ class JamfObjectReader(JamfObjectReaderBase):
             "description": "Download all objects of the specific object type",
             "default": "False",
         },
+        "export_workers": {
+            "required": False,
+            "description": (
+                "With all_objects, the number of objects to download at once. "
+                "Must be an integer between 1 and 16."
+            ),
+            "default": "4",
+        },
+        "max_requests_per_second": {
+            "required": False,
+            "description": (
+                "With all_objects, the maximum number of requests per second to send "
+                "to the Jamf host. 0 means unlimited."
+            ),
+            "default": "0",
+        },
+        "export_max_age": {
+            "required": False,
+            "description": (
+                "With all_objects, objects whose list entry does not show whether "
+                "they changed (such as Classic API objects) are downloaded again if "
+                "they were exported more than this many seconds ago. 0 means on "
+                "every export."
+            ),
+            "default": "0",
+        },
+        "force_full_export": {
+            "required": False,
+            "description": (
+                "With all_objects, ignore the export manifest in output_dir and "
+                "download and write every object."
+            ),
+            "default": False,
+        },
         "list_only": {
             "required": False,
             "description": "Only output a variable with a list of all objects - ID and name",
@@ -108,6 +108,12 @@ class JamfObjectUploader(JamfObjectUploaderBase):
             "without making any writes.",
             "default": False,
         },
+        "disable_unchanged_check": {
+            "required": False,
+            "description": "If True, always upload a replaced object, even when the "
+            "existing object already matches it.",
+            "default": False,
+        },
         "object_name": {
             "required": False,
             "description": "Name of the object. Required except for settings-related objects.",
@@ -185,6 +191,10 @@ class JamfObjectUploader(JamfObjectUploaderBase):
         "process_skipped": {
             "description": "Boolean - True if the upload process was skipped due to skip_and_proceed input variable being set to True.",
         },
+        "jamfobjectuploader_unchanged_summary_result": {
+            "description": "Objects that were not re-uploaded because the existing "
+            "object already matched.",
+        },
         "dry_run_summary_result": {
             "description": "Summary of what would have been changed (only set when dry_run "
             "is True).",
@@ -165,6 +165,14 @@ class JamfPackageUploader(JamfPackageUploaderBase):
                 "preferences file."
             ),
         },
+        "dp_workers": {
+            "required": False,
+            "description": (
+                "Number of File Share DPs that the package is copied to at the same "
+                "time. Must be an integer between 1 and 16."
+            ),
+            "default": "4",
+        },
         "pkg_name": {
             "required": False,
             "description": (
@@ -101,6 +101,12 @@ class JamfPolicyUploader(JamfPolicyUploaderBase):
             "without making any writes.",
             "default": False,
         },
+        "disable_unchanged_check": {
+            "required": False,
+            "description": "If True, always upload a replaced object, even when the "
+            "existing object already matches it.",
+            "default": False,
+        },
         "policy_name": {
             "required": False,
             "description": "Policy name",
@@ -167,6 +173,10 @@ class JamfPolicyUploader(JamfPolicyUploaderBase):
             "description": "Boolean - True if the process was skipped due to "
             "skip_if predicate resolved to True.",
         },
+        "jamfpolicyuploader_unchanged_summary_result": {
+            "description": "Objects that were not re-uploaded because the existing "
+            "object already matched.",
+        },
         "dry_run_summary_result": {
             "description": "Summary of what would have been changed (only set when dry_run "
             "is True).",
@@ -98,6 +98,12 @@ class JamfScriptUploader(JamfScriptUploaderBase):
             "without making any writes.",
             "default": False,
         },
+        "disable_unchanged_check": {
+            "required": False,
+            "description": "If True, always upload a replaced object, even when the "
+            "existing object already matches it.",
+            "default": False,
+        },
         "script_path": {
             "required": False,
             "description": "Full path to the script to be uploaded",
@@ -212,6 +218,10 @@ class JamfScriptUploader(JamfScriptUploaderBase):
             "description": "Boolean - True if the process was skipped due to "
             "skip_if predicate resolved to True.",
         },
+        "jamfscriptuploader_unchanged_summary_result": {
+            "description": "Objects that were not re-uploaded because the existing "
+            "object already matched.",
+        },
         "dry_run_summary_result": {
             "description": "Summary of what would have been changed (only set when dry_run "
             "is True).",
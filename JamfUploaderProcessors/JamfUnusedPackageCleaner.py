@@ -114,6 +114,44 @@ class JamfUnusedPackageCleaner(JamfUnusedPackageCleanerBase):
             ),
             "default": "5",
         },
+        "scan_workers": {
+            "required": False,
+            "description": (
+                "Number of concurrent requests used to scan policies and patch "
+                "titles for packages. Must be an integer between 1 and 32."
+            ),
+            "default": "8",
+        },
+        "max_requests_per_second": {
+            "required": False,
+            "description": (
+                "Maximum rate of requests to the Jamf Pro server during the scan. "
+                "Set to 0 for no limit."
+            ),
+            "default": "0",
+        },
+        "force_full_rescan": {
+            "required": False,
+            "description": (
+                "Package references found in policies and patch titles are kept in "
+                "a persistent index, so that only objects that changed since the "
+                "last run are downloaded. Set to True to discard the index and "
+                "download every object."
+            ),
+            "default": False,
+        },
+        "package_index_max_age": {
+            "required": False,
+            "description": (
+                "Indexed objects whose list entry has no version field (e.g. "
+                "Classic API policies) are downloaded on every run, as "
+                "changes to their packages cannot otherwise be detected. Set to "
+                "a number of seconds to reuse their index entries for that long "
+                "instead; changes made outside JamfUploader in that time will "
+                "not be seen."
+            ),
+            "default": "0",
+        },
         "skip_if": {
             "required": False,
             "description": "Skip the process if the supplied predicate evaluates to True.",
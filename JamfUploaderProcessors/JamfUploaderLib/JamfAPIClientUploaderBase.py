@@ -20,7 +20,6 @@ limitations under the License.
 import os.path
 import sys
 
-from time import sleep
 
 from autopkglib import (  # pylint: disable=import-error
     ProcessorError,
@@ -80,16 +79,12 @@ class JamfAPIClientUploaderBase(JamfUploaderBase):
             # check HTTP response
             if self.status_check(r, object_type, object_name, request) == "break":
                 break
-            if count >= max_tries:
+            if not self.retry_wait(r, count, max_tries, sleep_time, url):
                 self.output(
-                    f"{object_type} upload did not succeed after {max_tries} attempts"
+                    f"{object_type} upload did not succeed after {count} attempts"
                 )
                 self.output(f"\nHTTP POST Response Code: {r.status_code}")
                 raise ProcessorError(f"ERROR: {object_type} upload failed ")
-            if int(sleep_time) > 10:
-                sleep(int(sleep_time))
-            else:
-                sleep(10)
         return r
 
     def get_api_client_credentials(
@@ -127,16 +122,12 @@ class JamfAPIClientUploaderBase(JamfUploaderBase):
                 == "break"
             ):
                 break
-            if count >= max_tries:
+            if not self.retry_wait(r, count, max_tries, sleep_time, url):
                 self.output(
-                    f"{object_type} upload did not succeed after {max_tries} attempts"
+                    f"{object_type} upload did not succeed after {count} attempts"
                 )
                 self.output(f"\nHTTP POST Response Code: {r.status_code}")
                 raise ProcessorError(f"ERROR: {object_type} upload failed ")
-            if int(sleep_time) > 10:
-                sleep(int(sleep_time))
-            else:
-                sleep(10)
 
         # get the Client ID and Secret
         if r.status_code < 300:
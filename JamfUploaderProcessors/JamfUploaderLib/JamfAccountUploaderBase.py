@@ -20,7 +20,6 @@ import json
 import os.path
 import sys
 
-from time import sleep
 
 from autopkglib import (  # pylint: disable=import-error
     ProcessorError,
@@ -83,8 +82,7 @@ class JamfAccountUploaderBase(JamfUploaderBase):
         """prepare the account contents"""
         # import template from file and replace any keys in the template
         if os.path.exists(account_template):
-            with open(account_template, "r", encoding="utf-8") as file:
-                template_contents = file.read()
+            template_contents = self.read_template(account_template)
         else:
             raise ProcessorError("Template does not exist!")
 
@@ -95,7 +93,7 @@ class JamfAccountUploaderBase(JamfUploaderBase):
         )
 
         self.output("account data:", verbose_level=2)
-        self.output(template_contents, verbose_level=2)
+        self.log(template_contents, verbose_level=2)
 
         # write the template to temp file
         template_xml = self.write_temp_file(api_url, template_contents)
@@ -139,16 +137,12 @@ class JamfAccountUploaderBase(JamfUploaderBase):
             # check HTTP response
             if self.status_check(r, object_type, object_name, request) == "break":
                 break
-            if count >= max_tries:
+            if not self.retry_wait(r, count, max_tries, sleep_time, url):
                 self.output(
-                    f"WARNING: {object_type} upload did not succeed after {max_tries} attempts"
+                    f"WARNING: {object_type} upload did not succeed after {count} attempts"
                 )
                 self.output(f"\nHTTP POST Response Code: {r.status_code}")
                 raise ProcessorError(f"ERROR: {object_type} upload failed ")
-            if int(sleep_time) > 10:
-                sleep(int(sleep_time))
-            else:
-                sleep(10)
         return r
 
     def execute(self):
@@ -0,0 +1,574 @@
+#!/usr/local/autopkg/python
+# pylint: disable=invalid-name
+
+"""
+Copyright 2026 Graham Pugh
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import json
+import os.path
+import re
+import sys
+
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from time import monotonic
+
+from autopkglib import (  # pylint: disable=import-error
+    ProcessorError,
+)
+
+try:
+    import yaml
+
+    YAML_AVAILABLE = True
+except ImportError:
+    YAML_AVAILABLE = False
+
+# to use a base module in AutoPkg we need to add this path to the sys.path.
+# this violates flake8 E402 (PEP8 imports) but is unavoidable, so the following
+# imports require noqa comments for E402
+sys.path.insert(0, os.path.dirname(__file__))
+
+from JamfObjectUploaderBase import (  # pylint: disable=import-error, wrong-import-position
+    JamfObjectUploaderBase,
+)
+
+# Upload stage of each object type. Every object in a stage is uploaded before
+# any object in the next stage, so that objects can refer to those in earlier
+# stages: categories before scripts and extension attributes, those before the
+# smart groups that use them, and groups before policies and profiles.
+# Types not listed here are uploaded in the last stage.
+OBJECT_STAGES = {
+    "building": 0,
+    "category": 0,
+    "department": 0,
+    "network_segment": 0,
+    "site": 0,
+    "computer_extension_attribute": 1,
+    "dock_item": 1,
+    "ldap_server": 1,
+    "mobile_device_extension_attribute": 1,
+    "package": 1,
+    "printer": 1,
+    "script": 1,
+    "computer_group": 2,
+    "mobile_device_group": 2,
+    "smart_computer_group": 2,
+    "smart_mobile_device_group": 2,
+    "static_computer_group": 2,
+    "static_mobile_device_group": 2,
+    "user_group": 2,
+}
+LAST_STAGE = 3
+
+# Object types that are uploaded without looking for an existing object
+NO_LOOKUP_TYPES = ("cloud_distribution_point",)
+
+
+class JamfBulkObjectUploaderBase(JamfObjectUploaderBase):
+    """Class for functions used to upload many API objects to Jamf from a
+    manifest"""
+
+    def get_bulk_settings(self):
+        """Return (workers, requests_per_second) for the uploads.
+
+        upload_workers sets the number of objects uploaded at once (1-16,
+        default 4) and max_requests_per_second paces requests to the Jamf
+        host (default 0, meaning unlimited)."""
+        try:
+            workers = int(self.env.get("upload_workers") or 4)
+            if workers < 1 or workers > 16:
+                raise ValueError
+        except (ValueError, TypeError):
+            workers = 4
+        try:
+            requests_per_second = float(self.env.get("max_requests_per_second") or 0)
+            if requests_per_second < 0:
+                raise ValueError
+        except (ValueError, TypeError):
+            requests_per_second = 0
+        return workers, requests_per_second
+
+    def load_manifest(self, manifest_path):
+        """Return the list of object entries in a JSON or YAML manifest.
+
+        The manifest is either a list of entries or a dictionary with an
+        'objects' list. Each entry needs an object_type, and an object_template
+        and object_name unless the object type has no name (settings)."""
+        if not manifest_path.startswith("/"):
+            found_manifest = self.get_path_to_file(manifest_path)
+            if not found_manifest:
+                raise ProcessorError(f"ERROR: manifest {manifest_path} not found")
+            manifest_path = found_manifest
+        try:
+            with open(manifest_path, "r", encoding="utf-8") as file:
+                text = file.read()
+        except OSError as e:
+            raise ProcessorError(
+                f"ERROR: could not read manifest {manifest_path}: {e}"
+            ) from e
+
+        if manifest_path.endswith((".yaml", ".yml")):
+            if not YAML_AVAILABLE:
+                raise ProcessorError(
+                    "ERROR: PyYAML is required to read YAML manifests; "
+                    "install it or use a JSON manifest"
+                )
+            try:
+                manifest = yaml.safe_load(text)
+            except yaml.YAMLError as e:
+                raise ProcessorError(
+                    f"ERROR: could not parse manifest {manifest_path}: {e}"
+                ) from e
+        else:
+            try:
+                manifest = json.loads(text)
+            except ValueError as e:
+                raise ProcessorError(
+                    f"ERROR: could not parse manifest {manifest_path}: {e}"
+                ) from e
+
+        if isinstance(manifest, dict):
+            manifest = manifest.get("objects")
+        if not isinstance(manifest, list) or not manifest:
+            raise ProcessorError(
+                f"ERROR: manifest {manifest_path} does not contain a list of objects"
+            )
+
+        manifest_dir = os.path.dirname(manifest_path)
+        entries = []
+        for index, entry in enumerate(manifest, start=1):
+            if not isinstance(entry, dict) or not entry.get("object_type"):
+                raise ProcessorError(
+                    f"ERROR: manifest entry {index} has no object_type"
+                )
+            object_type = entry["object_type"]
+            if "_command" in object_type:
+                raise ProcessorError(
+                    f"ERROR: manifest entry {index}: {object_type} is a command, "
+                    "not an object, and cannot be uploaded in bulk"
+                )
+            if not entry.get("object_template"):
+                raise ProcessorError(
+                    f"ERROR: manifest entry {index} ({object_type}) has no "
+                    "object_template"
+                )
+            if "_settings" not in object_type and not entry.get("object_name"):
+                raise ProcessorError(
+                    f"ERROR: manifest entry {index} ({object_type}) has no object_name"
+                )
+            entry = dict(entry)
+            entry["index"] = index
+            entry["template_path"] = self.find_manifest_template(
+                entry["object_template"], manifest_dir
+            )
+            entries.append(entry)
+        return entries
+
+    def find_manifest_template(self, object_template, manifest_dir):
+        """Find a template next to the manifest, otherwise as for other
+        processors"""
+        if object_template.startswith("/"):
+            return object_template
+        manifest_relative = os.path.join(manifest_dir, object_template)
+        if os.path.exists(manifest_relative):
+            return manifest_relative
+        found_template = self.get_path_to_file(object_template)
+        if not found_template:
+            raise ProcessorError(f"ERROR: template {object_template} not found")
+        return found_template
+
+    @contextmanager
+    def entry_keys(self, keys):
+        """Temporarily add an entry's own substitution keys to the environment"""
+        if not keys:
+            yield
+            return
+        if not isinstance(keys, dict):
+            raise ProcessorError("ERROR: manifest 'keys' must be a dictionary")
+        saved = {key: self.env[key] for key in keys if key in self.env}
+        self.env.update({key: str(value) for key, value in keys.items()})
+        try:
+            yield
+        finally:
+            for key in keys:
+                if key in saved:
+                    self.env[key] = saved[key]
+                else:
+                    del self.env[key]
+
+    def get_existing_object_ids(self, api_url, object_type, token, tenant_id=""):
+        """Return {name: id} for every existing object of a type, from one list
+        request. Classic API names are lower-cased, as they are matched
+        regardless of case."""
+        resolved = self.resolve_endpoint(object_type, tenant_id)
+        namekey = self.get_namekey(object_type)
+        id_key = self.get_idkey(object_type)
+        object_list = self.get_all_api_objects(
+            api_url, object_type, tenant_id=tenant_id, token=token, namekey=namekey
+        )
+        existing = {}
+        for obj in object_list or []:
+            if not isinstance(obj, dict) or obj.get(namekey) is None:
+                continue
+            name = str(obj[namekey])
+            if resolved.api_type == "classic":
+                name = name.lower()
+            existing.setdefault(name, obj.get(id_key))
+        return existing
+
+    def created_object_id(self, r):
+        """Return the ID of an object from the response to its upload, if given"""
+        output = r.output
+        if isinstance(output, dict):
+            return output.get("id", "")
+        if isinstance(output, (bytes, bytearray)):
+            output = output.decode("utf-8", "replace")
+        if isinstance(output, str):
+            match = re.search(r"<id>(\d+)</id>", output)
+            if match:
+                return match.group(1)
+        return ""
+
+    def upload_entry(
+        self, api_url, entry, token, sleep_time, max_tries, tenant_id="", pace=None
+    ):
+        """Upload one prepared manifest entry and record the outcome in it"""
+        start = monotonic()
+        object_type = entry["object_type"]
+        try:
+            if entry["object_id"]:
+                pace()
+                if self.object_is_unchanged(
+                    api_url,
+                    object_type,
+                    entry["object_id"],
+                    self.read_template(entry["template_file"]),
+                    token=token,
+                    tenant_id=tenant_id,
+                    elements_to_remove=entry.get("elements_to_remove"),
+                ):
+                    entry["action"] = "unchanged"
+                    return entry
+            pace()
+            r = self.upload_object(
+                api_url,
+                api_type=entry["api_type"],
+                object_type=object_type,
+                object_template=entry["template_file"],
+                sleep_time=sleep_time,
+                token=token,
+                max_tries=max_tries,
+                object_name=entry["object_name"],
+                object_id=entry["object_id"],
+                tenant_id=tenant_id,
+            )
+            if entry["object_id"]:
+                entry["action"] = "updated"
+            else:
+                entry["action"] = "created"
+                entry["object_id"] = self.created_object_id(r)
+        except ProcessorError as e:
+            entry["action"] = "failed"
+            entry["error"] = str(e)
+            self.output(
+                f"WARNING: {object_type} '{entry['object_name']}' failed: {e}"
+            )
+        finally:
+            entry["seconds"] = monotonic() - start
+        return entry
+
+    def bulk_summary(self, entries, elapsed):
+        """Set the aggregated summary result and the per-object results"""
+        counts = {}
+        for entry in entries:
+            counts[entry["action"]] = counts.get(entry["action"], 0) + 1
+        results = [
+            {
+                "object_type": entry["object_type"],
+                "object_name": str(entry["object_name"]),
+                "object_id": str(entry.get("object_id") or ""),
+                "action": entry["action"],
+                "seconds": round(entry.get("seconds", 0.0), 3),
+                "error": entry.get("error", ""),
+            }
+            for entry in entries
+        ]
+        self.env["bulk_upload_results"] = results
+        self.env["objects_updated"] = bool(
+            counts.get("created", 0) + counts.get("updated", 0)
+        )
+        self.env["jamfbulkobjectuploader_summary_result"] = {
+            "summary_text": "The following objects were uploaded to Jamf Pro:",
+            "report_fields": [
+                "created",
+                "updated",
+                "unchanged",
+                "skipped",
+                "failed",
+                "upload_time",
+                "objects",
+            ],
+            "data": {
+                "created": str(counts.get("created", 0)),
+                "updated": str(counts.get("updated", 0)),
+                "unchanged": str(counts.get("unchanged", 0)),
+                "skipped": str(counts.get("skipped", 0)),
+                "failed": str(counts.get("failed", 0)),
+                "upload_time": f"{elapsed:.2f}s",
+                "objects": "\n".join(
+                    f"{result['action']} {result['object_type']} "
+                    f"'{result['object_name']}' ({result['seconds']:.2f}s)"
+                    for result in results
+                ),
+            },
+        }
+
+    def execute(self):
+        """Upload the objects in a manifest"""
+        jamf_url = (self.env.get("JSS_URL") or "").rstrip("/")
+        jamf_user = self.env.get("API_USERNAME")
+        jamf_password = self.env.get("API_PASSWORD")
+        jamf_platform_gw_region = self.env.get("PLATFORM_API_REGION")
+        jamf_platform_gw_tenant_id = self.env.get("PLATFORM_API_TENANT_ID")
+        client_id = self.env.get("CLIENT_ID")
+        client_secret = self.env.get("CLIENT_SECRET")
+        bearer_token = self.env.get("BEARER_TOKEN")
+        jamf_cli_profile = self.env.get("JAMF_CLI_PROFILE")
+        manifest_path = self.env.get("manifest")
+        replace_objects = self.to_bool(self.env.get("replace_object", False))
+        sleep_time = self.env.get("sleep")
+        max_tries = self.env.get("max_tries")
+        skip_if = self.env.get("skip_if")
+
+        # verify that max_tries is an integer greater than zero and less than 10
+        try:
+            max_tries = int(max_tries)
+            if max_tries < 1 or max_tries > 10:
+                raise ValueError
+        except (ValueError, TypeError):
+            max_tries = 5
+
+        # clear any pre-existing summary result
+        for key in (
+            "jamfbulkobjectuploader_summary_result",
+            "dry_run_summary_result",
+        ):
+            if key in self.env:
+                del self.env[key]
+
+        # skip the process if skip_if is True
+        if skip_if and self.predicate_evaluates_as_true(skip_if):
+            self.output("Skipping bulk upload as skip_if evaluated to True")
+            self.env["process_skipped"] = True
+            return
+        elif skip_if:
+            self.output("Not skipping bulk upload as skip_if evaluated to False")
+        self.env["process_skipped"] = False
+
+        if not manifest_path:
+            raise ProcessorError("ERROR: no manifest supplied")
+        entries = self.load_manifest(manifest_path)
+        self.output(f"Manifest contains {len(entries)} objects")
+
+        # now start the process of uploading the objects
+        self.output(f"Obtaining API token for {jamf_url}")
+
+        # get a token
+        token, jamf_url, jamf_platform_gw_region, jamf_platform_gw_tenant_id = (
+            self.auth(
+                jamf_url=jamf_url,
+                jamf_user=jamf_user,
+                password=jamf_password,
+                region=jamf_platform_gw_region,
+                tenant_id=jamf_platform_gw_tenant_id,
+                client_id=client_id,
+                client_secret=client_secret,
+                token=bearer_token,
+                jamf_cli_profile=jamf_cli_profile,
+            )
+        )
+
+        # construct the api_url based on the API type
+        api_url = self.construct_api_url(
+            jamf_url=jamf_url, region=jamf_platform_gw_region
+        )
+        self.output(f"API URL is {api_url}", verbose_level=3)
+
+        # load the schemas now, so that the upload workers do not each fetch them
+        self._ensure_registry_loaded(jamf_url)
+
+        # resolve each entry's type and name. Substituting keys uses the
+        # environment, so this is done here rather than in the upload workers
+        for entry in entries:
+            object_type = entry["object_type"]
+            entry["api_type"] = self.api_type(object_type)
+            if "_settings" in object_type:
+                entry["object_name"] = ""
+            else:
+                with self.entry_keys(entry.get("keys")):
+                    entry["object_name"] = self.substitute_assignable_keys(
+                        str(entry["object_name"])
+                    )
+            try:
+                entry["stage"] = int(
+                    entry.get("stage", OBJECT_STAGES.get(object_type, LAST_STAGE))
+                )
+            except (ValueError, TypeError) as e:
+                raise ProcessorError(
+                    f"ERROR: manifest entry {entry['index']} has an invalid stage"
+                ) from e
+
+        # get the existing objects with one list request per object type
+        workers, requests_per_second = self.get_bulk_settings()
+        lookup_types = list(
+            dict.fromkeys(
+                entry["object_type"]
+                for entry in entries
+                if "_settings" not in entry["object_type"]
+                and entry["object_type"] not in NO_LOOKUP_TYPES
+            )
+        )
+
+        def get_existing(object_type):
+            self.wait_for_rate_limit(api_url, requests_per_second)
+            return self.get_existing_object_ids(
+                api_url, object_type, token, tenant_id=jamf_platform_gw_tenant_id
+            )
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            existing_ids = dict(
+                zip(lookup_types, executor.map(get_existing, lookup_types))
+            )
+
+        for entry in entries:
+            object_type = entry["object_type"]
+            entry["object_id"] = 0
+            if object_type in existing_ids:
+                name = entry["object_name"]
+                if entry["api_type"] == "classic":
+                    name = name.lower()
+                entry["object_id"] = existing_ids[object_type].get(name) or 0
+            replace = self.to_bool(entry.get("replace_object", replace_objects))
+            if entry["object_id"] and not replace:
+                self.output(
+                    f"Not replacing existing {object_type} '{entry['object_name']}'. "
+                    "Set replace_object to True to enforce.",
+                    verbose_level=1,
+                )
+                entry["action"] = "skipped"
+
+        # prepare the templates of the objects to be uploaded
+        to_upload = [entry for entry in entries if "action" not in entry]
+        for entry in to_upload:
+            object_type = entry["object_type"]
+            namekey_path = None
+            if "_settings" not in object_type:
+                namekey_path = self.get_namekey_path(
+                    object_type, self.get_namekey(object_type)
+                )
+            with self.entry_keys(entry.get("keys")):
+                _, entry["template_file"] = self.prepare_template(
+                    jamf_url,
+                    object_type,
+                    entry["template_path"],
+                    object_name=entry["object_name"] or None,
+                    xml_escape=entry["api_type"] == "classic",
+                    elements_to_remove=entry.get("elements_to_remove"),
+                    element_to_replace=entry.get("element_to_replace"),
+                    replacement_value=entry.get("replacement_value"),
+                    namekey_path=namekey_path,
+                )
+
+        if self.env.get("dry_run"):
+            for entry in to_upload:
+                action = "UPDATE" if entry["object_id"] else "CREATE"
+                self.output(
+                    f"DRY RUN: Would {action} {entry['object_type']} "
+                    f"'{entry['object_name']}'"
+                )
+            self.env["objects_updated"] = False
+            self.env["dry_run_summary_result"] = {
+                "summary_text": "DRY RUN: The following changes would be made in Jamf Pro:",
+                "report_fields": ["action", "type", "name"],
+                "data": {
+                    "action": "CREATE/UPDATE",
+                    "type": "bulk",
+                    "name": f"{len(to_upload)} object(s) from {manifest_path}",
+                },
+            }
+            return
+
+        # upload stage by stage, with the objects in each stage uploaded together
+        stages = sorted({entry["stage"] for entry in to_upload})
+        self.output(
+            f"Uploading {len(to_upload)} objects in {len(stages)} stages with "
+            f"{workers} workers"
+            + (
+                f", at most {requests_per_second:g} requests/s"
+                if requests_per_second
+                else ""
+            ),
+            verbose_level=1,
+        )
+
+        def pace():
+            self.wait_for_rate_limit(api_url, requests_per_second)
+
+        def upload(entry):
+            return self.upload_entry(
+                api_url,
+                entry,
+                token,
+                sleep_time,
+                max_tries,
+                tenant_id=jamf_platform_gw_tenant_id,
+                pace=pace,
+            )
+
+        start = monotonic()
+        failed = []
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for stage in stages:
+                stage_entries = [
+                    entry for entry in to_upload if entry["stage"] == stage
+                ]
+                stage_start = monotonic()
+                list(executor.map(upload, stage_entries))
+                self.output(
+                    f"Stage {stage}: {len(stage_entries)} objects in "
+                    f"{monotonic() - stage_start:.2f}s",
+                    verbose_level=2,
+                )
+                failed = [
+                    entry for entry in stage_entries if entry["action"] == "failed"
+                ]
+                if failed:
+                    # later stages may depend on the objects that failed
+                    break
+        for entry in to_upload:
+            entry.setdefault("action", "not attempted")
+
+        self.bulk_summary(entries, monotonic() - start)
+        if failed:
+            raise ProcessorError(
+                f"ERROR: {len(failed)} object(s) failed to upload in stage "
+                f"{failed[0]['stage']}; later stages were not uploaded: "
+                + ", ".join(
+                    f"{entry['object_type']} '{entry['object_name']}'"
+                    for entry in failed
+                )
+            )
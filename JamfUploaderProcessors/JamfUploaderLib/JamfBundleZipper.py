@@ -0,0 +1,179 @@
+#!/usr/local/autopkg/python
+# pylint: disable=invalid-name
+
+"""
+JamfBundleZipper — stream a bundle-style package into a zip archive.
+
+The archive is written straight from the source tree, with the bundle's
+own name as the top-level folder, so no intermediate copy of the bundle is
+needed. The archive is written sequentially (using data descriptors rather
+than seeking back to patch local headers), which lets its digests be
+calculated from the bytes as they are written.
+
+A manifest fingerprint of the bundle (relative paths, sizes and mtimes) is
+stored next to the zip, so an existing zip is reused only if the bundle has
+not changed since it was built.
+
+Copyright 2026 Graham Pugh
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import zipfile
+
+from JamfPackageDigests import ALGORITHMS  # pylint: disable=import-error
+
+# Bump to force zips made by an older layout to be rebuilt
+MANIFEST_VERSION = 1
+
+# Bytes read from each source file per write
+ZIP_CHUNK_SIZE = 1024 * 1024
+
+# Archive bytes gathered before they are hashed and written
+WRITE_BUFFER_SIZE = 8 * 1024 * 1024
+
+
+def bundle_entries(bundle_path):
+    """Yield (path, arcname, is_dir) for a bundle in a stable order.
+
+    Symbolic links are followed, as shutil.copytree used to do when bundles
+    were copied before zipping.
+    """
+    top = os.path.basename(os.path.normpath(bundle_path))
+    yield bundle_path, top, True
+    for dirpath, dirnames, filenames in os.walk(bundle_path, followlinks=True):
+        dirnames.sort()
+        rel_dir = os.path.relpath(dirpath, bundle_path)
+        arc_dir = top if rel_dir == "." else os.path.join(top, rel_dir)
+        for name in dirnames:
+            yield os.path.join(dirpath, name), os.path.join(arc_dir, name), True
+        for name in sorted(filenames):
+            yield os.path.join(dirpath, name), os.path.join(arc_dir, name), False
+
+
+def bundle_fingerprint(bundle_path):
+    """Return a fingerprint of the bundle's paths, sizes and mtimes."""
+    h = hashlib.sha256(f"v{MANIFEST_VERSION}\n".encode("utf-8"))
+    for path, arcname, is_dir in bundle_entries(bundle_path):
+        st = os.stat(path)
+        size = 0 if is_dir else st.st_size
+        h.update(f"{arcname}\0{int(is_dir)}\0{size}\0{st.st_mtime_ns}\n".encode())
+    return h.hexdigest()
+
+
+class _HashingWriter:
+    """Write-only file wrapper that hashes everything written through it.
+
+    zipfile makes many small writes, so they are gathered into WRITE_BUFFER_SIZE
+    blocks before being hashed and written. It does not offer seek(), so
+    zipfile writes the archive sequentially.
+    """
+
+    def __init__(self, fp, hashers):
+        self.fp = fp
+        self.hashers = hashers
+        self.offset = 0
+        self._buffer = bytearray()
+
+    def write(self, data):
+        self._buffer += data
+        self.offset += len(data)
+        if len(self._buffer) >= WRITE_BUFFER_SIZE:
+            self.flush()
+        return len(data)
+
+    def tell(self):
+        return self.offset
+
+    def flush(self):
+        if self._buffer:
+            for h in self.hashers.values():
+                h.update(self._buffer)
+            self.fp.write(self._buffer)
+            self._buffer = bytearray()
+        self.fp.flush()
+
+
+def _manifest_path(zip_path):
+    """Return the path of the fingerprint file kept next to a zip."""
+    return os.path.join(
+        os.path.dirname(zip_path), f".{os.path.basename(zip_path)}.manifest.json"
+    )
+
+
+def is_current(bundle_path, zip_path, fingerprint=None):
+    """Return True if zip_path was built from the bundle as it is now."""
+    try:
+        with open(_manifest_path(zip_path), "r", encoding="utf-8") as fp:
+            manifest = json.load(fp)
+        st = os.stat(zip_path)
+    except (OSError, ValueError):
+        return False
+    fingerprint = fingerprint or bundle_fingerprint(bundle_path)
+    return (
+        manifest.get("fingerprint") == fingerprint
+        and manifest.get("zip_size") == st.st_size
+        and manifest.get("zip_mtime_ns") == st.st_mtime_ns
+    )
+
+
+def zip_bundle(bundle_path, zip_path, algorithms=(), fingerprint=None):
+    """Write bundle_path to zip_path and return {algorithm: hexdigest} of the zip.
+
+    The archive is built in a temporary file in the destination folder and
+    renamed into place, then the bundle fingerprint is recorded next to it.
+    """
+    fingerprint = fingerprint or bundle_fingerprint(bundle_path)
+    hashers = {name: ALGORITHMS[name]() for name in algorithms}
+    zip_dir = os.path.dirname(zip_path) or "."
+    fd, tmp_path = tempfile.mkstemp(dir=zip_dir, prefix=".zip_", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as raw:
+            writer = _HashingWriter(raw, hashers)
+            with zipfile.ZipFile(writer, "w", zipfile.ZIP_DEFLATED) as zf:
+                for path, arcname, is_dir in bundle_entries(bundle_path):
+                    zinfo = zipfile.ZipInfo.from_file(path, arcname)
+                    if is_dir:
+                        zf.writestr(zinfo, b"")
+                        continue
+                    zinfo.compress_type = zipfile.ZIP_DEFLATED
+                    with open(path, "rb") as src, zf.open(zinfo, "w") as dst:
+                        shutil.copyfileobj(src, dst, ZIP_CHUNK_SIZE)
+            writer.flush()
+            os.fsync(raw.fileno())
+        # mkstemp creates the file as 0600; give the zip the usual mode
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(tmp_path, 0o666 & ~umask)
+        os.replace(tmp_path, zip_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    st = os.stat(zip_path)
+    with open(_manifest_path(zip_path), "w", encoding="utf-8") as fp:
+        json.dump(
+            {
+                "fingerprint": fingerprint,
+                "zip_size": st.st_size,
+                "zip_mtime_ns": st.st_mtime_ns,
+            },
+            fp,
+        )
+    return {name: h.hexdigest() for name, h in hashers.items()}
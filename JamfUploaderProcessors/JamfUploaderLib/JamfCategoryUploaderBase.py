@@ -20,7 +20,6 @@ limitations under the License.
 import os.path
 import sys
 
-from time import sleep
 
 from autopkglib import (  # pylint: disable=import-error
     ProcessorError,
@@ -86,16 +85,12 @@ class JamfCategoryUploaderBase(JamfUploaderBase):
             # check HTTP response
             if self.status_check(r, "Category", object_name, request) == "break":
                 break
-            if count >= max_tries:
+            if not self.retry_wait(r, count, max_tries, sleep_time, url):
                 self.output(
-                    f"ERROR: Category creation did not succeed after {max_tries} attempts"
+                    f"ERROR: Category creation did not succeed after {count} attempts"
                 )
                 self.output(f"\nHTTP POST Response Code: {r.status_code}")
                 raise ProcessorError("ERROR: Category upload failed ")
-            if int(sleep_time) > 10:
-                sleep(int(sleep_time))
-            else:
-                sleep(10)
 
             # output the ID of the new or updated object
         if not object_id:
@@ -20,7 +20,6 @@ limitations under the License.
 import os.path
 import sys
 
-from time import sleep
 
 from autopkglib import (  # pylint: disable=import-error
     ProcessorError,
@@ -72,16 +71,12 @@ class JamfClassicAPIObjectUploaderBase(JamfUploaderBase):
             # check HTTP response
             if self.status_check(r, object_type, object_name, request) == "break":
                 break
-            if count > 5:
+            if not self.retry_wait(r, count, 6, sleep_time, url):
                 self.output(
-                    f"WARNING: {object_type} upload did not succeed after 5 attempts"
+                    f"WARNING: {object_type} upload did not succeed after {count} attempts"
                 )
                 self.output(f"\nHTTP POST Response Code: {r.status_code}")
                 raise ProcessorError(f"ERROR: {object_type} upload failed ")
-            if int(sleep_time) > 30:
-                sleep(int(sleep_time))
-            else:
-                sleep(30)
         return r
 
     def execute(self):
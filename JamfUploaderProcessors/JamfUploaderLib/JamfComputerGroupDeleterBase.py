@@ -20,7 +20,6 @@ limitations under the License.
 import os.path
 import sys
 
-from time import sleep
 
 from autopkglib import (  # pylint: disable=import-error
     ProcessorError,
@@ -62,13 +61,12 @@ class JamfComputerGroupDeleterBase(JamfUploaderBase):
             # check HTTP response
             if self.status_check(r, "Computer Group", object_id, request) == "break":
                 break
-            if count >= max_tries:
+            if not self.retry_wait(r, count, max_tries, url=url):
                 self.output(
-                    f"WARNING: Computer Group deletion did not succeed after {max_tries} attempts"
+                    f"WARNING: Computer Group deletion did not succeed after {count} attempts"
                 )
                 self.output(f"\nHTTP POST Response Code: {r.status_code}")
                 raise ProcessorError("ERROR: Computer Group deletion failed ")
-            sleep(10)
         return r
 
     def execute(self):
@@ -50,12 +50,14 @@ class JamfComputerGroupUploaderBase(JamfUploaderBase):
         object_id=0,
         tenant_id="",
     ):
-        """Upload computer group"""
+        """Upload computer group
+
+        Returns None without uploading if the existing computer group already
+        matches the template."""
 
         # import template from file and replace any keys in the template
         if os.path.exists(object_template):
-            with open(object_template, "r", encoding="utf-8") as file:
-                template_contents = file.read()
+            template_contents = self.read_template(object_template)
         else:
             raise ProcessorError("Template does not exist!")
 
@@ -84,14 +86,25 @@ class JamfComputerGroupUploaderBase(JamfUploaderBase):
         )
 
         self.output("Computer Group data:", verbose_level=2)
-        self.output(template_contents, verbose_level=2)
+        self.log(template_contents, verbose_level=2)
+
+        # skip the upload if the existing computer group already matches
+        object_type = "computer_group"
+        if object_id and self.object_is_unchanged(
+            api_url,
+            object_type,
+            object_id,
+            template_contents,
+            token=token,
+            tenant_id=tenant_id,
+        ):
+            return None
 
         self.output("Uploading Computer Group...")
         # write the template to temp file
         template_xml = self.write_temp_file(api_url, template_contents)
 
         # if we find an object ID we put, if not, we post
-        object_type = "computer_group"
         endpoint = self.api_endpoints(object_type, tenant_id=tenant_id)
         url = f"{api_url}/{endpoint}/id/{object_id}"
 
@@ -111,16 +124,13 @@ class JamfComputerGroupUploaderBase(JamfUploaderBase):
             # check HTTP response
             if self.status_check(r, "Computer Group", object_name, request) == "break":
                 break
-            if count >= max_tries:
+            if not self.retry_wait(r, count, max_tries, sleep_time, url):
                 self.output(
-                    f"WARNING: Computer Group upload did not succeed after {max_tries} attempts"
+                    f"WARNING: Computer Group upload did not succeed after {count} attempts"
                 )
                 self.output(f"\nHTTP POST Response Code: {r.status_code}")
                 raise ProcessorError("ERROR: Computer Group upload failed ")
-            if int(sleep_time) > 10:
-                sleep(int(sleep_time))
-            else:
-                sleep(10)
+        return r
 
     def execute(self):
         """Upload a computer group"""
@@ -153,6 +163,8 @@ class JamfComputerGroupUploaderBase(JamfUploaderBase):
             del self.env["jamfcomputergroupuploader_summary_result"]
         if "dry_run_summary_result" in self.env:
             del self.env["dry_run_summary_result"]
+        if "jamfcomputergroupuploader_unchanged_summary_result" in self.env:
+            del self.env["jamfcomputergroupuploader_unchanged_summary_result"]
 
         process_skipped = False
 
@@ -244,7 +256,7 @@ class JamfComputerGroupUploaderBase(JamfUploaderBase):
             return
 
         # upload the group
-        self.upload_computergroup(
+        r = self.upload_computergroup(
             api_url,
             object_name=computergroup_name,
             object_template=computergroup_template,
@@ -254,10 +266,17 @@ class JamfComputerGroupUploaderBase(JamfUploaderBase):
             object_id=object_id,
             tenant_id=jamf_platform_gw_tenant_id,
         )
-        group_uploaded = True
+        if r is None:
+            self.unchanged_summary(
+                "jamfcomputergroupuploader_unchanged_summary_result",
+                "computer_group",
+                computergroup_name,
+            )
+        else:
+            group_uploaded = True
 
-        if int(sleep_time) > 0:
-            sleep(int(sleep_time))
+            if int(sleep_time) > 0:
+                sleep(int(sleep_time))
 
         # output the summary
         self.env["group_uploaded"] = group_uploaded
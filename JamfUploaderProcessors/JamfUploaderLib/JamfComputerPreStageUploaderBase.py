@@ -20,7 +20,6 @@ limitations under the License.
 import os.path
 import sys
 
-from time import sleep
 
 from autopkglib import (  # pylint: disable=import-error
     ProcessorError,
@@ -85,16 +84,12 @@ class JamfComputerPreStageUploaderBase(JamfUploaderBase):
             # check HTTP response
             if self.status_check(r, object_type, object_name, request) == "break":
                 break
-            if count >= max_tries:
+            if not self.retry_wait(r, count, max_tries, sleep_time, url):
                 self.output(
-                    f"WARNING: {object_type} upload did not succeed after {max_tries} attempts"
+                    f"WARNING: {object_type} upload did not succeed after {count} attempts"
                 )
                 self.output(f"\nHTTP POST Response Code: {r.status_code}")
                 raise ProcessorError(f"ERROR: {object_type} upload failed ")
-            if int(sleep_time) > 10:
-                sleep(int(sleep_time))
-            else:
-                sleep(10)
         return r
 
     def execute(self):
@@ -242,8 +237,7 @@ class JamfComputerPreStageUploaderBase(JamfUploaderBase):
         else:
             # new prestages need an id of -1
             if os.path.exists(template_file):
-                with open(template_file, "r", encoding="utf-8") as file:
-                    template_contents = file.read()
+                template_contents = self.read_template(template_file)
             else:
                 raise ProcessorError("Template does not exist!")
 
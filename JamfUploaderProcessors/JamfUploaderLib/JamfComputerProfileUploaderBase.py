@@ -22,7 +22,6 @@ import sys
 import plistlib
 import uuid
 
-from time import sleep
 
 from autopkglib import (  # pylint: disable=import-error
     ProcessorError,
@@ -63,7 +62,7 @@ class JamfComputerProfileUploaderBase(JamfUploaderBase):
         self.output(
             f"Existing payload (type: {type(existing_plist)}):", verbose_level=2
         )
-        self.output(existing_plist.decode("UTF-8"), verbose_level=2)
+        self.log(existing_plist, verbose_level=2)
 
         # now extract the UUID from the existing payload
         existing_payload = plistlib.loads(existing_plist)
@@ -152,7 +151,7 @@ class JamfComputerProfileUploaderBase(JamfUploaderBase):
         mobileconfig_plist = plistlib.dumps(mobileconfig_data)
 
         self.output("Mobileconfig contents:", verbose_level=2)
-        self.output(mobileconfig_plist.decode("UTF-8"), verbose_level=2)
+        self.log(mobileconfig_plist, verbose_level=2)
 
         return mobileconfig_plist
 
@@ -199,13 +198,13 @@ class JamfComputerProfileUploaderBase(JamfUploaderBase):
         self.output(
             "Configuration Profile with intermediate substitution:", verbose_level=2
         )
-        self.output(template_contents, verbose_level=2)
+        self.log(template_contents, verbose_level=2)
 
         # substitute user-assignable keys
         template_contents = self.substitute_assignable_keys(template_contents)
 
         self.output("Configuration Profile to be uploaded:", verbose_level=2)
-        self.output(template_contents, verbose_level=2)
+        self.log(template_contents, verbose_level=2)
 
         # get existing scope if --retain-existing-scope is set
         object_type = "os_x_configuration_profile"
@@ -246,16 +245,12 @@ class JamfComputerProfileUploaderBase(JamfUploaderBase):
                 == "break"
             ):
                 break
-            if count >= max_tries:
+            if not self.retry_wait(r, count, max_tries, sleep_time, url):
                 self.output(
-                    f"ERROR: Configuration Profile upload did not succeed after {max_tries} attempts"
+                    f"ERROR: Configuration Profile upload did not succeed after {count} attempts"
                 )
                 self.output(f"\nHTTP POST Response Code: {r.status_code}")
                 break
-            if int(sleep_time) > 10:
-                sleep(int(sleep_time))
-            else:
-                sleep(10)
 
         return r
 
@@ -369,7 +364,7 @@ class JamfComputerProfileUploaderBase(JamfUploaderBase):
                     mobileconfig_name = mobileconfig_contents["PayloadDisplayName"]
                 self.output(f"Configuration Profile name: {mobileconfig_name}")
                 self.output("Mobileconfig contents:", verbose_level=2)
-                self.output(mobileconfig_plist.decode("UTF-8"), verbose_level=2)
+                self.log(mobileconfig_plist, verbose_level=2)
             except KeyError as e:
                 raise ProcessorError(
                     "ERROR: Invalid mobileconfig file supplied - cannot import"
@@ -416,8 +411,7 @@ class JamfComputerProfileUploaderBase(JamfUploaderBase):
             organization = "AutoPkg"
 
         # import profile template
-        with open(template, "r", encoding="utf-8") as file:
-            template_contents = file.read()
+        template_contents = self.read_template(template)
 
         # check for existing Configuration Profile
         self.output(f"Checking for existing '{mobileconfig_name}' on {jamf_url}")
@@ -116,16 +116,12 @@ class JamfComputerStaticGroupUploaderBase(JamfUploaderBase):
             # check HTTP response
             if self.status_check(r, "Computer Group", object_name, request) == "break":
                 break
-            if count >= max_tries:
+            if not self.retry_wait(r, count, max_tries, sleep_time, url):
                 self.output(
-                    f"WARNING: Computer Group upload did not succeed after {max_tries} attempts"
+                    f"WARNING: Computer Group upload did not succeed after {count} attempts"
                 )
                 self.output(f"\nHTTP POST Response Code: {r.status_code}")
                 raise ProcessorError("ERROR: Computer Group upload failed ")
-            if int(sleep_time) > 10:
-                sleep(int(sleep_time))
-            else:
-                sleep(10)
 
     def execute(self):
         """Upload a static computer group"""
@@ -24,7 +24,6 @@ import os.path
 import sys
 import xml.etree.ElementTree as ET
 
-from time import sleep
 
 from autopkglib import (  # pylint: disable=import-error
     ProcessorError,
@@ -91,16 +90,12 @@ class JamfDockItemUploaderBase(JamfUploaderBase):
             # check HTTP response
             if self.status_check(r, "Dock Item", object_name, request) == "break":
                 break
-            if count >= max_tries:
+            if not self.retry_wait(r, count, max_tries, sleep_time, url):
                 self.output(
-                    f"ERROR: Temporary dock item update did not succeed after {max_tries} attempts"
+                    f"ERROR: Temporary dock item update did not succeed after {count} attempts"
                 )
                 self.output(f"\nHTTP POST Response Code: {r.status_code}")
                 raise ProcessorError("ERROR: dock item upload failed ")
-            if int(sleep_time) > 10:
-                sleep(int(sleep_time))
-            else:
-                sleep(10)
 
     def execute(self):
         """Upload a dock item"""
@@ -0,0 +1,87 @@
+#!/usr/local/autopkg/python
+# pylint: disable=invalid-name
+
+"""
+JamfEndpoint — resolved endpoint metadata for one object type.
+
+JamfUploaderBase derives an object type's API type, endpoint path, list key,
+name and ID keys from the alias tables and, for unlisted types, the schema
+registry. None of these change during a run, so each is resolved once per
+(instance, object_type, tenant_id) and kept for the run. Each processor gets
+its own JamfEndpoint view of the shared values, which resolves missing fields
+through that processor, and which callers can pass around instead of
+resolving the same type again for every request.
+
+Copyright 2026 Graham Pugh
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+
+class JamfEndpoint:
+    """Endpoint metadata for an object type on a Jamf Pro instance.
+
+    Args:
+        object_type: JamfUploader object type, e.g. "policy" or "package_v1".
+        tenant_id:   Platform API tenant ID, or "".
+        values:      Dict of the fields resolved so far, shared by every view
+                     of the same endpoint.
+        resolve_fn:  Callable(field) returning the value of a field, supplied
+                     by the processor that uses this view.
+
+    The fields api_type, endpoint, list_key, name_key, id_key and
+    namekey_prefix are taken from values, or resolved by resolve_fn on first
+    access and added to values, then stored as plain attributes, so later
+    reads cost no more than an attribute lookup. If resolve_fn raises, nothing
+    is stored and the next access tries again.
+    """
+
+    FIELDS = frozenset(
+        ("api_type", "endpoint", "list_key", "name_key", "id_key", "namekey_prefix")
+    )
+
+    def __init__(self, object_type, tenant_id, values, resolve_fn):
+        self.object_type = object_type
+        self.tenant_id = tenant_id
+        self._values = values
+        self._resolve_fn = resolve_fn
+
+    def __getattr__(self, name):
+        # only called for attributes not yet read through this view
+        if name not in JamfEndpoint.FIELDS:
+            raise AttributeError(name)
+        if name in self._values:
+            value = self._values[name]
+        else:
+            value = self._values.setdefault(name, self._resolve_fn(name))
+        setattr(self, name, value)
+        return value
+
+    def url_path(self, uuid=""):
+        """Return the endpoint path with any {id} placeholder replaced by uuid."""
+        endpoint = self.endpoint
+        if "{id}" in endpoint:
+            return endpoint.replace("{id}", uuid)
+        return endpoint
+
+    def namekey_path(self, namekey=None):
+        """Return the XPath of the name key (or another key) in the object."""
+        return self.namekey_prefix + (self.name_key if namekey is None else namekey)
+
+    def __repr__(self):
+        resolved = ", ".join(
+            f"{field}={self._values[field]!r}"
+            for field in sorted(JamfEndpoint.FIELDS)
+            if field in self._values
+        )
+        return f"JamfEndpoint({self.object_type!r}, {resolved})"
@@ -0,0 +1,214 @@
+#!/usr/local/autopkg/python
+# pylint: disable=invalid-name
+
+"""
+JamfExportManifest — record of the objects exported to an output directory.
+
+JamfObjectReader keeps a manifest file in the output directory of an
+all_objects export, with an entry for each exported object: its name, the
+fingerprint of its entry in the list endpoint, the hash of its exported
+content and the files it was written to. On the next export:
+
+- objects whose list fingerprint is unchanged, and whose files are still
+  present, are not downloaded again;
+- downloaded objects whose content hash is unchanged are not written again,
+  so file modification times (and any version control on the directory)
+  only show real changes.
+
+The fingerprint only proves an object is unchanged if the list entry carries
+a version field, or holds the whole object. Other objects, such as Classic
+API objects, whose list entries are summaries, are downloaded again once
+their entry is older than max_age seconds (by default, on every export).
+The manifest also records a hash of the export options; if they change, the
+manifest is discarded so that every object is exported again.
+
+Copyright 2026 Graham Pugh
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+from JamfPackageReferenceIndex import (  # pylint: disable=import-error
+    fingerprint,
+)
+
+# Name of the manifest file in the output directory
+EXPORT_MANIFEST_NAME = ".jamf_export_manifest.json"
+
+MANIFEST_VERSION = 2
+
+
+def content_hash(content):
+    """Return a SHA-256 hex digest of exported text."""
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    return hashlib.sha256(content).hexdigest()
+
+
+def holds_full_object(entry, obj):
+    """Return True if a list entry holds every key and value of the object."""
+    return (
+        isinstance(entry, dict)
+        and isinstance(obj, dict)
+        and bool(obj)
+        and all(key in entry and entry[key] == value for key, value in obj.items())
+    )
+
+
+class ExportManifest:
+    """The export manifest of one output directory.
+
+    Args:
+        output_dir: The export's output directory, where the manifest is kept.
+        max_age:    Seconds after which objects with a weak list fingerprint
+                    are downloaded again. 0 means on every export.
+        log_fn:     Optional callable(msg, verbose_level) for logging.
+        options:    The export options that affect the exported content. If
+                    they differ from those of the last export, every object
+                    is exported again.
+
+    Safe to use from several threads at once. Changes are written by save().
+    """
+
+    def __init__(self, output_dir, max_age=0, log_fn=None, options=None):
+        self.path = os.path.join(output_dir, EXPORT_MANIFEST_NAME)
+        self.max_age = max_age
+        self.options_hash = content_hash(
+            json.dumps(options or {}, sort_keys=True, default=str)
+        )
+        self._log = log_fn or (lambda msg, **kw: None)
+        self._lock = threading.Lock()
+        self._kinds = {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as fp:
+                data = json.load(fp)
+            if data.get("version") != MANIFEST_VERSION:
+                pass
+            elif data.get("options") != self.options_hash:
+                self._log(
+                    "Export options have changed; exporting every object",
+                    verbose_level=1,
+                )
+            else:
+                self._kinds = data.get("objects") or {}
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, AttributeError) as e:
+            self._log(
+                f"WARNING: ignoring unreadable export manifest {self.path}: {e}",
+                verbose_level=1,
+            )
+
+    def reset(self):
+        """Forget every exported object, so that all are exported again."""
+        with self._lock:
+            self._kinds = {}
+
+    def plan(self, kind, objects, id_key="id"):
+        """Work out which objects in a freshly downloaded list must be fetched.
+
+        Entries for objects no longer in the list are removed. Returns
+        (to_fetch, unchanged), where to_fetch is a list of (entry, fingerprint,
+        strong) tuples for the objects that are new, changed, weakly
+        fingerprinted and older than max_age, or missing their files, and
+        unchanged is the number of objects left as they are.
+        """
+        now = time.time()
+        with self._lock:
+            stored = self._kinds.setdefault(kind, {})
+            current_ids = set()
+            to_fetch = []
+            for entry in objects:
+                object_id = str(entry[id_key])
+                current_ids.add(object_id)
+                digest, strong = fingerprint(entry)
+                previous = stored.get(object_id)
+                if (
+                    previous is None
+                    or previous["fingerprint"] != digest
+                    or (
+                        not previous["strong"]
+                        and now - previous["exported_at"] >= self.max_age
+                    )
+                    or not self._files_exist(previous)
+                ):
+                    to_fetch.append((entry, digest, strong))
+            for object_id in set(stored) - current_ids:
+                del stored[object_id]
+        return to_fetch, len(objects) - len(to_fetch)
+
+    def is_unchanged(self, kind, object_id, name, digest):
+        """Return True if an object was last exported with this name and
+        content hash, and its files are still present."""
+        with self._lock:
+            previous = self._kinds.get(kind, {}).get(str(object_id))
+        return bool(
+            previous
+            and previous["content_hash"] == digest
+            and previous["name"] == name
+            and self._files_exist(previous)
+        )
+
+    def record(self, kind, object_id, name, list_fingerprint, strong, digest, files):
+        """Record that an object was exported (or found unchanged)."""
+        with self._lock:
+            kind_entries = self._kinds.setdefault(kind, {})
+            previous = kind_entries.get(str(object_id))
+            if files is None:
+                files = previous["files"] if previous else []
+            kind_entries[str(object_id)] = {
+                "name": name,
+                "fingerprint": list_fingerprint,
+                "strong": strong,
+                "content_hash": digest,
+                "exported_at": time.time(),
+                "files": [os.path.basename(file) for file in files],
+            }
+
+    def save(self):
+        """Write the manifest atomically."""
+        with self._lock:
+            data = json.dumps(
+                {
+                    "version": MANIFEST_VERSION,
+                    "options": self.options_hash,
+                    "objects": self._kinds,
+                },
+                indent=1,
+                sort_keys=True,
+            )
+        directory = os.path.dirname(self.path)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".jamf_export_")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as fp:
+                fp.write(data)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    def _files_exist(self, previous):
+        directory = os.path.dirname(self.path)
+        return all(
+            os.path.exists(os.path.join(directory, file))
+            for file in previous.get("files", [])
+        )
@@ -20,7 +20,6 @@ limitations under the License.
 import os.path
 import sys
 
-from time import sleep
 
 from autopkglib import (  # pylint: disable=import-error
     ProcessorError,
@@ -58,7 +57,10 @@ class JamfExtensionAttributeUploaderBase(JamfUploaderBase):
         object_id=None,
         tenant_id="",
     ):
-        """Update extension attribute metadata."""
+        """Update extension attribute metadata.
+
+        Returns None without uploading if the existing extension attribute already
+        matches."""
         # import script from file and replace any keys in the script
         if ea_input_type == "script":
             if script_path:
@@ -108,11 +110,22 @@ class JamfExtensionAttributeUploaderBase(JamfUploaderBase):
             verbose_level=2,
         )
 
+        # skip the upload if the existing extension attribute already matches
+        object_type = "computer_extension_attribute"
+        if object_id and self.object_is_unchanged(
+            api_url,
+            object_type,
+            object_id,
+            ea_data,
+            token=token,
+            tenant_id=tenant_id,
+        ):
+            return None
+
         self.output("Uploading Extension Attribute...")
         ea_json = self.write_json_file(api_url, ea_data)
 
         # if we find an object ID we put, if not, we post
-        object_type = "computer_extension_attribute"
         endpoint = self.api_endpoints(object_type, tenant_id=tenant_id)
         if object_id:
             url = f"{api_url}/{endpoint}/{object_id}"
@@ -136,16 +149,13 @@ class JamfExtensionAttributeUploaderBase(JamfUploaderBase):
                 == "break"
             ):
                 break
-            if count >= max_tries:
+            if not self.retry_wait(r, count, max_tries, sleep_time, url):
                 self.output(
-                    f"ERROR: Extension Attribute upload did not succeed after {max_tries} attempts"
+                    f"ERROR: Extension Attribute upload did not succeed after {count} attempts"
                 )
                 self.output(f"\nHTTP POST Response Code: {r.status_code}")
                 raise ProcessorError("ERROR: Extension Attribute upload failed ")
-            if int(sleep_time) > 10:
-                sleep(int(sleep_time))
-            else:
-                sleep(10)
+        return r
 
     def execute(self):
         """Upload an extension attribute"""
@@ -194,6 +204,8 @@ class JamfExtensionAttributeUploaderBase(JamfUploaderBase):
             del self.env["jamfextensionattributeuploader_summary_result"]
         if "dry_run_summary_result" in self.env:
             del self.env["dry_run_summary_result"]
+        if "jamfextensionattributeuploader_unchanged_summary_result" in self.env:
+            del self.env["jamfextensionattributeuploader_unchanged_summary_result"]
 
         process_skipped = False
 
@@ -286,7 +298,7 @@ class JamfExtensionAttributeUploaderBase(JamfUploaderBase):
             return
 
         # upload the EA
-        self.upload_ea(
+        r = self.upload_ea(
             api_url,
             object_name=ea_name,
             ea_description=ea_description,
@@ -304,7 +316,14 @@ class JamfExtensionAttributeUploaderBase(JamfUploaderBase):
             object_id=object_id,
             tenant_id=jamf_platform_gw_tenant_id,
         )
-        ea_uploaded = True
+        if r is None:
+            self.unchanged_summary(
+                "jamfextensionattributeuploader_unchanged_summary_result",
+                "computer_extension_attribute",
+                ea_name,
+            )
+        else:
+            ea_uploaded = True
 
         # output the summary
         self.env["extension_attribute"] = ea_name
@@ -0,0 +1,194 @@
+#!/usr/local/autopkg/python
+# pylint: disable=invalid-name
+
+"""
+JamfHTTPTrace — per-request tracing and latency summary for JamfUploader.
+
+When tracing is enabled, every request made by JamfUploaderBase.curl is
+written as one JSON line to a trace file: processor, method, host, endpoint
+(with IDs and names replaced by placeholders, so that requests for different
+objects are grouped together), status, bytes sent and received, seconds taken
+and the retry number. At the end of the AutoPkg run a summary with the call
+count and p50/p95/p99 latency of each endpoint is appended to the file and
+logged.
+
+Tracing is off unless a trace file is set, in which case curl does no more
+than check for it.
+
+Copyright 2026 Graham Pugh
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import atexit
+import json
+import math
+import re
+import threading
+import time
+
+from urllib.parse import unquote, urlparse
+
+# Path segments that are followed by an object's name or other identifier
+NAME_SEGMENTS = frozenset(
+    ("name", "username", "serialnumber", "udid", "macaddress", "groupname")
+)
+
+# Path segments that are IDs: numbers, UUIDs and long hex strings
+ID_RE = re.compile(r"^(\d+|[0-9a-fA-F-]{32,36}|[0-9a-fA-F]{24,})$")
+
+PERCENTILES = (50, 95, 99)
+
+
+def endpoint_template(url):
+    """Return the path of a URL with IDs and names replaced by placeholders.
+
+    e.g. /JSSResource/policies/id/42 -> /JSSResource/policies/id/{id}
+         /api/v1/scripts/42           -> /api/v1/scripts/{id}
+         /JSSResource/policies/name/X -> /JSSResource/policies/name/{name}
+    """
+    segments = urlparse(url).path.split("/")
+    for index, segment in enumerate(segments):
+        if not segment:
+            continue
+        if index and segments[index - 1] in NAME_SEGMENTS:
+            segments[index] = "{name}"
+        elif ID_RE.match(unquote(segment)):
+            segments[index] = "{id}"
+    return "/".join(segments)
+
+
+def percentile(sorted_values, pct):
+    """Return the nearest-rank percentile of a sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class RequestTracer:
+    """Writes request records to a JSONL file and keeps latencies per endpoint.
+
+    Args:
+        path:   The trace file. Records are appended to it.
+        log_fn: Optional callable(msg, verbose_level) that is given the summary.
+    """
+
+    def __init__(self, path, log_fn=None):
+        self.path = path
+        self._log = log_fn
+        self._latencies = {}
+        self._retries = threading.local()
+        self._lock = threading.Lock()
+        # line-buffered, so that records are not lost if the run is interrupted
+        self._file = open(  # pylint: disable=consider-using-with
+            path, "a", encoding="utf-8", buffering=1
+        )
+
+    def note_retry(self, url, attempt):
+        """Mark the next request to url from this thread as retry number attempt."""
+        pending = getattr(self._retries, "urls", None)
+        if pending is None:
+            pending = self._retries.urls = {}
+        pending[url] = attempt
+
+    def record(
+        self,
+        processor,
+        method,
+        url,
+        status,
+        seconds,
+        bytes_out=0,
+        bytes_in=0,
+    ):
+        """Write a record for one request and add it to the latency summary."""
+        pending = getattr(self._retries, "urls", None)
+        retry = pending.pop(url, 0) if pending else 0
+        endpoint = endpoint_template(url)
+        entry = {
+            "type": "request",
+            "time": round(time.time(), 3),
+            "processor": processor,
+            "method": method or "GET",
+            "host": urlparse(url).netloc,
+            "endpoint": endpoint,
+            "status": status,
+            "bytes_out": bytes_out,
+            "bytes_in": bytes_in,
+            "seconds": round(seconds, 4),
+            "retry": retry,
+        }
+        line = json.dumps(entry, separators=(",", ":"))
+        with self._lock:
+            self._latencies.setdefault((entry["method"], endpoint), []).append(
+                seconds
+            )
+            self._file.write(line + "\n")
+
+    def summary(self):
+        """Return [{method, endpoint, count, p50, p95, p99}], busiest first."""
+        with self._lock:
+            latencies = {key: sorted(values) for key, values in self._latencies.items()}
+        rows = []
+        for (method, endpoint), values in latencies.items():
+            row = {"method": method, "endpoint": endpoint, "count": len(values)}
+            for pct in PERCENTILES:
+                row[f"p{pct}"] = round(percentile(values, pct), 4)
+            rows.append(row)
+        rows.sort(key=lambda row: (-row["count"], row["endpoint"]))
+        return rows
+
+    def close(self):
+        """Append the summary to the trace file, log it and close the file."""
+        rows = self.summary()
+        with self._lock:
+            if self._file.closed:
+                return
+            self._file.write(
+                json.dumps({"type": "summary", "endpoints": rows}, separators=(",", ":"))
+                + "\n"
+            )
+            self._file.close()
+        if self._log and rows:
+            total = sum(row["count"] for row in rows)
+            self._log(f"HTTP trace: {total} requests, written to {self.path}")
+            for row in rows:
+                self._log(
+                    f"{row['count']:6d}  p50 {row['p50']:.3f}s  p95 {row['p95']:.3f}s  "
+                    f"p99 {row['p99']:.3f}s  {row['method']} {row['endpoint']}",
+                    verbose_level=1,
+                )
+
+
+_SHARED_TRACER = None
+_SHARED_LOCK = threading.Lock()
+
+
+def shared_tracer(path, log_fn=None):
+    """Return the process-wide RequestTracer for path, creating it on first use.
+
+    The tracer's summary is written when the AutoPkg run ends. If a different
+    path is given, the current tracer is closed and a new one is started.
+    """
+    global _SHARED_TRACER  # pylint: disable=global-statement
+    with _SHARED_LOCK:
+        if _SHARED_TRACER is not None and _SHARED_TRACER.path != path:
+            _SHARED_TRACER.close()
+            _SHARED_TRACER = None
+        if _SHARED_TRACER is None:
+            _SHARED_TRACER = RequestTracer(path, log_fn=log_fn)
+            atexit.register(_SHARED_TRACER.close)
+        elif log_fn is not None:
+            _SHARED_TRACER._log = log_fn  # pylint: disable=protected-access
+        return _SHARED_TRACER
@@ -0,0 +1,569 @@
+#!/usr/local/autopkg/python
+# pylint: disable=invalid-name
+
+"""
+JamfHTTPTransport — in-process HTTP engine for JamfUploader.
+
+Executes the request described by the curl command line that
+JamfUploaderBase.curl builds, without forking /usr/bin/curl. Connections are
+kept alive and pooled per host for the lifetime of the AutoPkg process, so
+consecutive API calls (and consecutive processors) reuse the same TLS session.
+
+Only the curl options that JamfUploaderBase itself emits are understood. Any
+other option (for example from ``custom_curl_opts``) raises
+UnsupportedCurlOption so that the caller can fall back to the curl subprocess.
+
+Copyright 2026 Graham Pugh
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import http.client
+import mimetypes
+import os
+import re
+import select
+import socket
+import ssl
+import threading
+import uuid
+
+from time import monotonic
+from urllib.parse import quote, urljoin, urlsplit
+
+# Socket timeout in seconds for connect and for each read/write operation
+DEFAULT_TIMEOUT = 300
+
+# Maximum number of idle keep-alive connections retained per host
+MAX_IDLE_PER_HOST = 8
+
+# Idle connections older than this are closed rather than reused, as load
+# balancers commonly drop keep-alive connections after 60 seconds
+MAX_IDLE_TIME = 30
+
+# Maximum number of redirects followed for --location
+MAX_REDIRECTS = 10
+
+# Chunk size used when streaming request bodies from disk
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# curl options that take no argument and need no handling in-process
+IGNORED_FLAGS = {"--silent", "--show-error", "--progress-bar", "--location"}
+
+# curl options that take one argument and need no handling in-process
+# (headers and body are returned in memory rather than written to files)
+IGNORED_OPTIONS = {"--dump-header", "--cookie", "--output"}
+
+REDIRECT_CODES = (301, 302, 303, 307, 308)
+
+# Methods that may be sent again if a pooled connection fails mid-request.
+# Others are only sent again if the server cannot have received all of it
+IDEMPOTENT_METHODS = {"GET", "HEAD", "DELETE"}
+
+# One ";key=value" parameter of a --form field, the value optionally quoted
+FORM_PARAM_RE = re.compile(r'(\w+)=("(?:[^"\\]|\\.)*"|[^;]*);?')
+
+
+class UnsupportedCurlOption(Exception):
+    """Raised when a curl command line cannot be executed in-process."""
+
+
+class CurlRequest:
+    """A parsed curl command line.
+
+    Attributes:
+        url:          Target URL.
+        method:       HTTP method, derived as curl would if --request is absent.
+        headers:      list of (name, value) tuples in the order supplied.
+        upload_file:  Path for --upload-file, or None.
+        form:         list of (field, path, content_type) from --form, or [].
+        data:         bytes for --data / --data-urlencode, or None.
+        insecure:     True if --insecure was given.
+        use_cookies:  True if a cookie jar was requested.
+    """
+
+    def __init__(self, curl_cmd):
+        self.url = ""
+        self.method = ""
+        self.headers = []
+        self.upload_file = None
+        self.form = []
+        self.data = None
+        self.insecure = False
+        self.use_cookies = False
+        self._parse(curl_cmd)
+
+    def _parse(self, curl_cmd):
+        """Walk the argument list, rejecting anything we cannot honour."""
+        args = [a.decode("utf-8") if isinstance(a, bytes) else str(a) for a in curl_cmd]
+        data_parts = []
+        i = 1  # skip the curl binary
+        while i < len(args):
+            arg = args[i]
+            if arg in IGNORED_FLAGS:
+                i += 1
+                continue
+            if arg == "--insecure":
+                self.insecure = True
+                i += 1
+                continue
+            if not arg.startswith("-"):
+                if self.url:
+                    raise UnsupportedCurlOption(f"multiple URLs: {arg}")
+                self.url = arg
+                i += 1
+                continue
+            if i + 1 >= len(args):
+                raise UnsupportedCurlOption(f"missing argument for {arg}")
+            value = args[i + 1]
+            if arg in IGNORED_OPTIONS:
+                pass
+            elif arg == "--cookie-jar":
+                self.use_cookies = True
+            elif arg == "--request":
+                self.method = value.upper()
+            elif arg == "--header":
+                name, sep, header_value = value.partition(":")
+                if not sep:
+                    raise UnsupportedCurlOption(f"malformed header: {value}")
+                self.headers.append((name.strip(), header_value.strip()))
+            elif arg == "--upload-file":
+                self.upload_file = value
+            elif arg == "--form":
+                self.form.append(self._parse_form(value))
+            elif arg == "--data":
+                if value.startswith("@"):
+                    with open(value[1:], "rb") as fp:
+                        raw = fp.read().replace(b"\r", b"").replace(b"\n", b"")
+                    data_parts.append(raw)
+                else:
+                    data_parts.append(value.encode("utf-8"))
+            elif arg == "--data-urlencode":
+                name, sep, content = value.partition("=")
+                if sep:
+                    encoded = f"{name}={quote(content, safe='')}"
+                else:
+                    encoded = quote(value, safe="")
+                data_parts.append(encoded.encode("utf-8"))
+            else:
+                raise UnsupportedCurlOption(f"unsupported option {arg}")
+            i += 2
+
+        if not self.url:
+            raise UnsupportedCurlOption("no URL supplied")
+        if data_parts:
+            self.data = b"&".join(data_parts)
+
+        body_sources = sum(
+            1 for x in (self.upload_file, self.form, self.data) if x
+        )
+        if body_sources > 1:
+            raise UnsupportedCurlOption("more than one request body option")
+
+        if not self.method:
+            if self.upload_file:
+                self.method = "PUT"
+            elif self.form or self.data is not None:
+                self.method = "POST"
+            else:
+                self.method = "GET"
+
+    @staticmethod
+    def _parse_form(value):
+        """Parse a '--form name=@path[;type=mime][;filename=name]' argument."""
+        field, sep, spec = value.partition("=")
+        if not sep or not spec.startswith("@"):
+            raise UnsupportedCurlOption(f"unsupported form field: {value}")
+        path, _, params = spec[1:].partition(";")
+        content_type = ""
+        filename = ""
+        while params:
+            match = FORM_PARAM_RE.match(params)
+            if not match or match.group(1) not in ("type", "filename"):
+                raise UnsupportedCurlOption(f"unsupported form parameters: {params}")
+            param_value = match.group(2)
+            if param_value.startswith('"'):
+                param_value = re.sub(r"\\(.)", r"\1", param_value[1:-1])
+            if match.group(1) == "type":
+                content_type = param_value
+            else:
+                filename = param_value
+            params = params[match.end() :]
+        if not content_type:
+            content_type = (
+                mimetypes.guess_type(filename or path)[0] or "application/octet-stream"
+            )
+        return field, path, content_type, filename
+
+    def has_header(self, name):
+        """Return True if a header with this name was supplied."""
+        return any(h.lower() == name.lower() for h, _ in self.headers)
+
+
+class _HostPool:
+    """Idle keep-alive connections and cookies for one scheme/host/port."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.idle = []  # (connection, monotonic time it became idle)
+        self.cookies = {}
+
+
+class JamfHTTPTransport:
+    """Keep-alive connection pool that executes curl command lines in-process.
+
+    Args:
+        timeout:            Socket timeout in seconds.
+        max_idle_per_host:  Idle connections retained per host.
+        max_idle_time:      Seconds after which an idle connection is closed
+                            rather than reused.
+        log_fn:             Optional callable(msg, verbose_level) for logging.
+    """
+
+    def __init__(
+        self,
+        timeout=DEFAULT_TIMEOUT,
+        max_idle_per_host=MAX_IDLE_PER_HOST,
+        max_idle_time=MAX_IDLE_TIME,
+        log_fn=None,
+    ):
+        self.timeout = timeout
+        self.max_idle_per_host = max_idle_per_host
+        self.max_idle_time = max_idle_time
+        self._log = log_fn or (lambda msg, **kw: None)
+        self._pools = {}
+        self._pools_lock = threading.Lock()
+        self.stats = {
+            "requests": 0,
+            "connections_opened": 0,
+            "connections_reused": 0,
+            "connections_discarded": 0,
+        }
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def execute_curl(self, curl_cmd, progress_fn=None):
+        """Execute a curl command line in-process.
+
+        Returns a tuple (header_lines, status_code, body) where header_lines
+        mirrors what ``curl --dump-header`` writes (status line first, one list
+        entry per header, for every response in a redirect chain), and body
+        is the final response body as bytes.
+
+        If progress_fn is given, it is called as progress_fn(bytes_sent, total)
+        while a file body (--upload-file or --form) is streamed.
+
+        Raises UnsupportedCurlOption if the command uses an option that is not
+        implemented here, or OSError / http.client.HTTPException on transport
+        failure.
+        """
+        req = CurlRequest(curl_cmd)
+        follow = "--location" in curl_cmd
+        url = req.url
+        headers = list(req.headers)
+        header_lines = []
+        for _ in range(MAX_REDIRECTS + 1):
+            status, reason, resp_headers, body = self._send(
+                req, url, headers, progress_fn
+            )
+            header_lines.append(f"HTTP/1.1 {status} {reason}")
+            header_lines.extend(f"{k}: {v}" for k, v in resp_headers)
+            header_lines.append("")
+            location = next(
+                (v for k, v in resp_headers if k.lower() == "location"), None
+            )
+            if not (follow and status in REDIRECT_CODES and location):
+                break
+            new_url = urljoin(url, location)
+            if urlsplit(new_url).netloc != urlsplit(url).netloc:
+                # as curl does, never forward credentials to a different host
+                headers = [h for h in headers if h[0].lower() != "authorization"]
+            self._log(f"Following redirect to {new_url}", verbose_level=3)
+            url = new_url
+        else:
+            raise http.client.HTTPException(
+                f"Maximum ({MAX_REDIRECTS}) redirects followed"
+            )
+
+        return header_lines, status, body
+
+    def close(self):
+        """Close all pooled connections."""
+        with self._pools_lock:
+            pools = list(self._pools.values())
+            self._pools = {}
+        for pool in pools:
+            with pool.lock:
+                for conn, _ in pool.idle:
+                    conn.close()
+                pool.idle = []
+
+    # ------------------------------------------------------------------
+    # Connection pool
+    # ------------------------------------------------------------------
+
+    def _pool_for(self, key):
+        with self._pools_lock:
+            pool = self._pools.get(key)
+            if pool is None:
+                pool = self._pools[key] = _HostPool()
+            return pool
+
+    def _acquire(self, pool, key):
+        """Return (connection, reused) from the pool, opening one if needed.
+
+        Idle connections that are too old, or that the server has closed, are
+        discarded rather than reused."""
+        while True:
+            with pool.lock:
+                if not pool.idle:
+                    break
+                conn, idle_since = pool.idle.pop()
+            if monotonic() - idle_since <= self.max_idle_time and self._is_alive(conn):
+                with pool.lock:
+                    self.stats["connections_reused"] += 1
+                return conn, True
+            conn.close()
+            with pool.lock:
+                self.stats["connections_discarded"] += 1
+            self._log("Discarding idle pooled connection", verbose_level=3)
+        scheme, host, port, insecure = key
+        if scheme == "https":
+            context = ssl.create_default_context()
+            if insecure:
+                context.check_hostname = False
+                context.verify_mode = ssl.CERT_NONE
+            conn = http.client.HTTPSConnection(
+                host, port, timeout=self.timeout, context=context
+            )
+        else:
+            conn = http.client.HTTPConnection(host, port, timeout=self.timeout)
+        conn.connect()
+        # as curl does, disable Nagle so small requests are not delayed
+        conn.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.stats["connections_opened"] += 1
+        self._log(f"Opening new connection to {scheme}://{host}:{port}", verbose_level=3)
+        return conn, False
+
+    def _release(self, pool, conn, reusable):
+        with pool.lock:
+            if reusable and len(pool.idle) < self.max_idle_per_host:
+                pool.idle.append((conn, monotonic()))
+                return
+        conn.close()
+
+    @staticmethod
+    def _is_alive(conn):
+        """Return False if an idle connection has been closed by the server.
+
+        An idle keep-alive socket should have nothing to read; if it is
+        readable, the server has closed it (or sent something unexpected), so
+        it is not reused. This is the same check urllib3 makes."""
+        sock = conn.sock
+        if sock is None:
+            return False
+        try:
+            readable, _, _ = select.select([sock], [], [], 0)
+        except (OSError, ValueError):
+            return False
+        return not readable
+
+    # ------------------------------------------------------------------
+    # Request execution
+    # ------------------------------------------------------------------
+
+    def _send(self, req, url, headers, progress_fn=None):
+        """Send one request (no redirect handling) and read the response."""
+        parts = urlsplit(url)
+        scheme = parts.scheme.lower()
+        if scheme not in ("http", "https"):
+            raise UnsupportedCurlOption(f"unsupported URL scheme {scheme}")
+        port = parts.port or (443 if scheme == "https" else 80)
+        key = (scheme, parts.hostname, port, req.insecure)
+        pool = self._pool_for(key)
+        path = parts.path or "/"
+        if parts.query:
+            path = f"{path}?{parts.query}"
+
+        send_headers = dict(headers)
+        if not req.has_header("Accept"):
+            send_headers["Accept"] = "*/*"
+        if req.use_cookies:
+            with pool.lock:
+                if pool.cookies:
+                    send_headers["Cookie"] = "; ".join(
+                        f"{k}={v}" for k, v in pool.cookies.items()
+                    )
+
+        self.stats["requests"] += 1
+        # a pooled connection may have been closed by the server while idle;
+        # in that case retry exactly once on a fresh connection, but only if the
+        # request is idempotent or the server cannot have received all of it
+        for attempt in (1, 2):
+            conn, reused = self._acquire(pool, key)
+            sent = {"body": False, "request": False}
+            try:
+                body_iter, length, content_type = self._body(req, progress_fn)
+                if isinstance(body_iter, (bytes, str)):
+                    # sent along with the headers
+                    sent["body"] = bool(body_iter)
+                elif body_iter is not None:
+                    body_iter = self._tracked(body_iter, sent)
+                if length is not None:
+                    send_headers["Content-Length"] = str(length)
+                if content_type and not req.has_header("Content-Type"):
+                    send_headers["Content-Type"] = content_type
+                elif content_type and req.form:
+                    # the multipart boundary must always be declared
+                    for name in list(send_headers):
+                        if name.lower() == "content-type":
+                            del send_headers[name]
+                    send_headers["Content-Type"] = content_type
+                conn.request(req.method, path, body=body_iter, headers=send_headers)
+                sent["request"] = True
+                resp = conn.getresponse()
+                body = resp.read()
+            except (
+                http.client.RemoteDisconnected,
+                ConnectionResetError,
+                BrokenPipeError,
+            ):
+                conn.close()
+                retry_safe = req.method in IDEMPOTENT_METHODS or not (
+                    sent["body"] or sent["request"]
+                )
+                if reused and attempt == 1 and retry_safe:
+                    self._log("Stale pooled connection, reconnecting", verbose_level=3)
+                    continue
+                raise
+            except Exception:
+                conn.close()
+                raise
+            break
+
+        resp_headers = resp.getheaders()
+        if req.use_cookies:
+            self._store_cookies(pool, resp_headers)
+        self._release(pool, conn, not resp.will_close)
+        return resp.status, resp.reason, resp_headers, body
+
+    @staticmethod
+    def _store_cookies(pool, resp_headers):
+        """Keep name=value pairs from Set-Cookie headers for this host."""
+        with pool.lock:
+            for name, value in resp_headers:
+                if name.lower() != "set-cookie":
+                    continue
+                pair = value.split(";", 1)[0]
+                cookie_name, sep, cookie_value = pair.partition("=")
+                if sep:
+                    pool.cookies[cookie_name.strip()] = cookie_value.strip()
+
+    @staticmethod
+    def _file_chunks(path):
+        with open(path, "rb") as fp:
+            while True:
+                chunk = fp.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+
+    def _body(self, req, progress_fn=None):
+        """Return (body, content_length, content_type) for the request.
+
+        File bodies are streamed from disk rather than read into memory.
+        """
+        if req.upload_file:
+            length = os.path.getsize(req.upload_file)
+            return (
+                self._counted(self._file_chunks(req.upload_file), length, progress_fn),
+                length,
+                None,
+            )
+        if req.form:
+            body_iter, length, content_type = self._multipart(req.form)
+            return self._counted(body_iter, length, progress_fn), length, content_type
+        if req.data is not None:
+            return req.data, len(req.data), "application/x-www-form-urlencoded"
+        if req.method in ("POST", "PUT", "PATCH"):
+            return None, 0, None
+        return None, None, None
+
+    @staticmethod
+    def _tracked(chunks, sent):
+        """Pass chunks through, noting in sent once the first is sent."""
+        for chunk in chunks:
+            sent["body"] = True
+            yield chunk
+
+    @staticmethod
+    def _counted(chunks, total, progress_fn):
+        """Pass chunks through, reporting the running byte count to progress_fn."""
+        if progress_fn is None:
+            yield from chunks
+            return
+        sent = 0
+        progress_fn(sent, total)
+        for chunk in chunks:
+            yield chunk
+            sent += len(chunk)
+            progress_fn(sent, total)
+
+    def _multipart(self, form):
+        """Build a streamed multipart/form-data body from --form file fields."""
+        boundary = f"------------------------{uuid.uuid4().hex}"
+        pieces = []
+        length = 0
+        for field, path, content_type, filename in form:
+            filename = (filename or os.path.basename(path)).replace('"', "%22")
+            head = (
+                f"--{boundary}\r\n"
+                f'Content-Disposition: form-data; name="{field}"; '
+                f'filename="{filename}"\r\n'
+                f"Content-Type: {content_type}\r\n\r\n"
+            ).encode("utf-8")
+            pieces.append((head, path))
+            length += len(head) + os.path.getsize(path) + 2
+        tail = f"--{boundary}--\r\n".encode("utf-8")
+        length += len(tail)
+
+        def generate():
+            for head, path in pieces:
+                yield head
+                yield from self._file_chunks(path)
+                yield b"\r\n"
+            yield tail
+
+        return generate(), length, f"multipart/form-data; boundary={boundary}"
+
+
+_SHARED_TRANSPORT = None
+_SHARED_LOCK = threading.Lock()
+
+
+def shared_transport(log_fn=None):
+    """Return the process-wide JamfHTTPTransport, creating it on first use.
+
+    AutoPkg runs every processor of every recipe in a single Python process,
+    so a module-level instance keeps one connection pool per Jamf host for
+    the whole run.
+    """
+    global _SHARED_TRANSPORT  # pylint: disable=global-statement
+    with _SHARED_LOCK:
+        if _SHARED_TRANSPORT is None:
+            _SHARED_TRANSPORT = JamfHTTPTransport(log_fn=log_fn)
+        elif log_fn is not None:
+            _SHARED_TRANSPORT._log = log_fn  # pylint: disable=protected-access
+        return _SHARED_TRANSPORT
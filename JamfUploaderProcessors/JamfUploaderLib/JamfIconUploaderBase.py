@@ -20,7 +20,6 @@ limitations under the License.
 import os.path
 import sys
 
-from time import sleep
 
 from autopkglib import (  # pylint: disable=import-error
     ProcessorError,
@@ -58,16 +57,12 @@ class JamfIconUploaderBase(JamfUploaderBase):
             # check HTTP response
             if self.status_check(r, "Icon", icon_uri, request) == "break":
                 break
-            if count >= max_tries:
+            if not self.retry_wait(r, count, max_tries, sleep_time, icon_uri):
                 self.output(
-                    f"ERROR: Icon download did not succeed after {max_tries} attempts"
+                    f"ERROR: Icon download did not succeed after {count} attempts"
                 )
                 self.output(f"\nHTTP POST Response Code: {r.status_code}")
                 raise ProcessorError("ERROR: Icon download failed ")
-            if int(sleep_time) > 10:
-                sleep(int(sleep_time))
-            else:
-                sleep(10)
         return r
 
     def upload_icon(
@@ -103,16 +98,12 @@ class JamfIconUploaderBase(JamfUploaderBase):
             # check HTTP response
             if self.status_check(r, "Icon", icon_file, request) == "break":
                 break
-            if count >= max_tries:
+            if not self.retry_wait(r, count, max_tries, sleep_time, url):
                 self.output(
-                    f"ERROR: Icon upload did not succeed after {max_tries} attempts"
+                    f"ERROR: Icon upload did not succeed after {count} attempts"
                 )
                 self.output(f"\nHTTP POST Response Code: {r.status_code}")
                 raise ProcessorError("ERROR: Icon upload failed ")
-            if int(sleep_time) > 10:
-                sleep(int(sleep_time))
-            else:
-                sleep(10)
         return r
 
     def execute(self):
@@ -21,7 +21,6 @@ import os.path
 import sys
 
 from datetime import datetime, timedelta
-from time import sleep
 
 from autopkglib import (  # pylint: disable=import-error
     ProcessorError,
@@ -55,8 +54,11 @@ class JamfMSUPlanUploaderBase(JamfUploaderBase):
             api_url, object_type, token, tenant_id=tenant_id
         )
         if object_content:
-            self.output(
-                f"{object_type} content on {api_url}: {object_content}",
+            self.log(
+                "%s content on %s: %s",
+                object_type,
+                api_url,
+                object_content,
                 verbose_level=3,
             )
             toggle_value = object_content["toggle"]
@@ -111,7 +113,7 @@ class JamfMSUPlanUploaderBase(JamfUploaderBase):
         if specific_version is not None:
             template_contents["config"]["specificVersion"] = specific_version
 
-        self.output(template_contents, verbose_level=2)
+        self.log(template_contents, verbose_level=2)
 
         # write the template to temp file
         template_file = self.write_json_file(api_url, template_contents)
@@ -152,16 +154,12 @@ class JamfMSUPlanUploaderBase(JamfUploaderBase):
             # check HTTP response
             if self.status_check(r, object_type, object_name, request) == "break":
                 break
-            if count >= max_tries:
+            if not self.retry_wait(r, count, max_tries, sleep_time, url):
                 self.output(
-                    f"WARNING: {object_type} upload did not succeed after {max_tries} attempts"
+                    f"WARNING: {object_type} upload did not succeed after {count} attempts"
                 )
                 self.output(f"\nHTTP POST Response Code: {r.status_code}")
                 raise ProcessorError(f"ERROR: {object_type} upload failed ")
-            if int(sleep_time) > 10:
-                sleep(int(sleep_time))
-            else:
-                sleep(10)
         return r
 
     def execute(self):
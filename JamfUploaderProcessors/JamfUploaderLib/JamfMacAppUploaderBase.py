@@ -22,7 +22,6 @@ import os.path
 import re
 import sys
 
-from time import sleep
 
 from autopkglib import (  # pylint: disable=import-error
     ProcessorError,
@@ -45,8 +44,7 @@ class JamfMacAppUploaderBase(JamfUploaderBase):
         """prepare the macapp contents"""
         # import template from file and replace any keys in the template
         if os.path.exists(macapp_template):
-            with open(macapp_template, "r", encoding="utf-8") as file:
-                template_contents = file.read()
+            template_contents = self.read_template(macapp_template)
         else:
             raise ProcessorError("Template does not exist!")
 
@@ -57,7 +55,7 @@ class JamfMacAppUploaderBase(JamfUploaderBase):
         )
 
         self.output("MAS app data:", verbose_level=2)
-        self.output(template_contents, verbose_level=2)
+        self.log(template_contents, verbose_level=2)
 
         # write the template to temp file
         template_xml = self.write_temp_file(api_url, template_contents)
@@ -98,16 +96,12 @@ class JamfMacAppUploaderBase(JamfUploaderBase):
             # check HTTP response
             if self.status_check(r, "mac_application", object_name, request) == "break":
                 break
-            if count >= max_tries:
+            if not self.retry_wait(r, count, max_tries, sleep_time, url):
                 self.output(
-                    f"WARNING: MAS app upload did not succeed after {max_tries} attempts"
+                    f"WARNING: MAS app upload did not succeed after {count} attempts"
                 )
                 self.output(f"\nHTTP POST Response Code: {r.status_code}")
                 raise ProcessorError("ERROR: Mac app upload failed ")
-            if int(sleep_time) > 10:
-                sleep(int(sleep_time))
-            else:
-                sleep(10)
         return r
 
     def execute(self):
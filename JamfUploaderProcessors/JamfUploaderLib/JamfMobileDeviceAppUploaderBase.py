@@ -22,7 +22,6 @@ import os.path
 import re
 import sys
 
-from time import sleep
 
 from autopkglib import (  # pylint: disable=import-error
     ProcessorError,
@@ -47,8 +46,7 @@ class JamfMobileDeviceAppUploaderBase(JamfUploaderBase):
             found_template = self.get_path_to_file(appconfig_template)
             if found_template:
                 appconfig_template = found_template
-                with open(appconfig_template, "r", encoding="utf-8") as file:
-                    appconfig_xml = file.read()
+                appconfig_xml = self.read_template(appconfig_template)
 
                 # substitute user assignable keys and escape XML
                 appconfig = self.substitute_assignable_keys(
@@ -67,8 +65,7 @@ class JamfMobileDeviceAppUploaderBase(JamfUploaderBase):
         """prepare the mobiledeviceapp contents"""
         # import template from file and replace any keys in the template
         if os.path.exists(mobiledeviceapp_template):
-            with open(mobiledeviceapp_template, "r", encoding="utf-8") as file:
-                template_contents = file.read()
+            template_contents = self.read_template(mobiledeviceapp_template)
         else:
             raise ProcessorError("Template does not exist!")
 
@@ -79,7 +76,7 @@ class JamfMobileDeviceAppUploaderBase(JamfUploaderBase):
         )
 
         self.output("Mobile device app data:", verbose_level=2)
-        self.output(template_contents, verbose_level=2)
+        self.log(template_contents, verbose_level=2)
 
         # write the template to temp file
         template_xml = self.write_temp_file(api_url, template_contents)
@@ -123,16 +120,12 @@ class JamfMobileDeviceAppUploaderBase(JamfUploaderBase):
                 == "break"
             ):
                 break
-            if count >= max_tries:
+            if not self.retry_wait(r, count, max_tries, sleep_time, url):
                 self.output(
-                    f"WARNING: Mobile device app upload did not succeed after {max_tries} attempts"
+                    f"WARNING: Mobile device app upload did not succeed after {count} attempts"
                 )
                 self.output(f"\nHTTP POST Response Code: {r.status_code}")
                 raise ProcessorError("ERROR: Mobile device app upload failed ")
-            if int(sleep_time) > 10:
-                sleep(int(sleep_time))
-            else:
-                sleep(10)
         return r
 
     def execute(self):
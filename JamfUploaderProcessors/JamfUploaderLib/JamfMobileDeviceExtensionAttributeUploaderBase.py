@@ -20,7 +20,6 @@ limitations under the License.
 import os.path
 import sys
 
-from time import sleep
 
 from autopkglib import (  # pylint: disable=import-error
     ProcessorError,
@@ -127,16 +126,12 @@ class JamfMobileDeviceExtensionAttributeUploaderBase(JamfUploaderBase):
                 == "break"
             ):
                 break
-            if count >= max_tries:
+            if not self.retry_wait(r, count, max_tries, sleep_time, url):
                 self.output(
-                    f"ERROR: Extension Attribute upload did not succeed after {max_tries} attempts"
+                    f"ERROR: Extension Attribute upload did not succeed after {count} attempts"
                 )
                 self.output(f"\nHTTP POST Response Code: {r.status_code}")
                 raise ProcessorError("ERROR: Extension Attribute upload failed ")
-            if int(sleep_time) > 10:
-                sleep(int(sleep_time))
-            else:
-                sleep(10)
 
     def execute(self):
         """Upload an extension attribute"""
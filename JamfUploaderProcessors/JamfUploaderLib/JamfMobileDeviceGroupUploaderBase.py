@@ -54,8 +54,7 @@ class JamfMobileDeviceGroupUploaderBase(JamfUploaderBase):
 
         # import template from file and replace any keys in the template
         if os.path.exists(object_template):
-            with open(object_template, "r", encoding="utf-8") as file:
-                template_contents = file.read()
+            template_contents = self.read_template(object_template)
         else:
             raise ProcessorError("Template does not exist!")
 
@@ -63,7 +62,7 @@ class JamfMobileDeviceGroupUploaderBase(JamfUploaderBase):
         template_contents = self.substitute_assignable_keys(template_contents)
 
         self.output("Mobile Device Group data:", verbose_level=2)
-        self.output(template_contents, verbose_level=2)
+        self.log(template_contents, verbose_level=2)
 
         self.output("Uploading Mobile Device Group...")
         # write the template to temp file
@@ -93,16 +92,12 @@ class JamfMobileDeviceGroupUploaderBase(JamfUploaderBase):
                 == "break"
             ):
                 break
-            if count >= max_tries:
+            if not self.retry_wait(r, count, max_tries, sleep_time, url):
                 self.output(
-                    f"WARNING: Mobile Device Group upload did not succeed after {max_tries} attempts"
+                    f"WARNING: Mobile Device Group upload did not succeed after {count} attempts"
                 )
                 self.output(f"\nHTTP POST Response Code: {r.status_code}")
                 raise ProcessorError("ERROR: Mobile Device Group upload failed ")
-            if int(sleep_time) > 10:
-                sleep(int(sleep_time))
-            else:
-                sleep(10)
 
     def execute(self):
         """Upload a mobile device group"""
@@ -23,7 +23,6 @@ import plistlib
 import subprocess
 import uuid
 
-from time import sleep
 
 from autopkglib import (  # pylint: disable=import-error
     ProcessorError,
@@ -64,7 +63,7 @@ class JamfMobileDeviceProfileUploaderBase(JamfUploaderBase):
         self.output(
             f"Existing payload (type: {type(existing_plist)}):", verbose_level=2
         )
-        self.output(existing_plist.decode("UTF-8"), verbose_level=2)
+        self.log(existing_plist, verbose_level=2)
 
         # now extract the UUID from the existing payload
         existing_payload = plistlib.loads(existing_plist)
@@ -152,13 +151,13 @@ class JamfMobileDeviceProfileUploaderBase(JamfUploaderBase):
         self.output(
             "Configuration Profile with intermediate substitution:", verbose_level=2
         )
-        self.output(template_contents, verbose_level=2)
+        self.log(template_contents, verbose_level=2)
 
         # substitute user-assignable keys
         template_contents = self.substitute_assignable_keys(template_contents)
 
         self.output("Configuration Profile to be uploaded:", verbose_level=2)
-        self.output(template_contents, verbose_level=2)
+        self.log(template_contents, verbose_level=2)
 
         self.output("Uploading Configuration Profile...")
         # write the template to temp file
@@ -190,17 +189,13 @@ class JamfMobileDeviceProfileUploaderBase(JamfUploaderBase):
                 == "break"
             ):
                 break
-            if count >= max_tries:
+            if not self.retry_wait(r, count, max_tries, sleep_time, url):
                 self.output(
                     f"ERROR: Configuration Profile upload did not succeed after {max_tries} "
                     "attempts"
                 )
                 self.output(f"\nHTTP POST Response Code: {r.status_code}")
                 break
-            if int(sleep_time) > 10:
-                sleep(int(sleep_time))
-            else:
-                sleep(10)
 
         return r
 
@@ -295,7 +290,7 @@ class JamfMobileDeviceProfileUploaderBase(JamfUploaderBase):
                 mobileconfig_name = mobileconfig_contents["PayloadDisplayName"]
                 self.output(f"Configuration Profile name: {mobileconfig_name}")
                 self.output("Mobileconfig contents:", verbose_level=2)
-                self.output(mobileconfig_plist.decode("UTF-8"), verbose_level=2)
+                self.log(mobileconfig_plist, verbose_level=2)
             except KeyError as exc:
                 raise ProcessorError(
                     "ERROR: Invalid mobileconfig file supplied - cannot import"
@@ -323,8 +318,7 @@ class JamfMobileDeviceProfileUploaderBase(JamfUploaderBase):
             organization = "AutoPkg"
 
         # import profile template
-        with open(template, "r", encoding="utf-8") as file:
-            template_contents = file.read()
+        template_contents = self.read_template(template)
 
         # get a token using auth() with Platform API parameters
         token, jamf_url, jamf_platform_gw_region, jamf_platform_gw_tenant_id = (
@@ -117,16 +117,12 @@ class JamfMobileDeviceStaticGroupUploaderBase(JamfUploaderBase):
                 == "break"
             ):
                 break
-            if count >= max_tries:
+            if not self.retry_wait(r, count, max_tries, sleep_time, url):
                 self.output(
-                    f"WARNING: Mobile Device Group upload did not succeed after {max_tries} attempts"
+                    f"WARNING: Mobile Device Group upload did not succeed after {count} attempts"
                 )
                 self.output(f"\nHTTP POST Response Code: {r.status_code}")
                 raise ProcessorError("ERROR: Mobile Device Group upload failed ")
-            if int(sleep_time) > 10:
-                sleep(int(sleep_time))
-            else:
-                sleep(10)
 
     def execute(self):
         """Upload a static mobile device group"""
@@ -0,0 +1,212 @@
+#!/usr/local/autopkg/python
+# pylint: disable=invalid-name
+
+"""
+JamfObjectCache — run-scoped cache of API object lists for JamfUploader.
+
+Several processors in one recipe chain look up object IDs by name, and for
+Classic API types each lookup downloads the entire collection. This module
+keeps the downloaded lists, and name→ID indexes built from them, for the
+lifetime of the AutoPkg process so that later lookups are answered in O(1).
+
+Entries are keyed by (instance, object_type, tenant_id). Any write (POST, PUT,
+PATCH, DELETE) made through JamfUploaderBase.curl invalidates the entries
+for the same resource on the same instance.
+
+Copyright 2026 Graham Pugh
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import copy
+import re
+import threading
+
+from collections import OrderedDict
+from urllib.parse import urlparse
+
+# Maximum number of cached object lists (least recently used are dropped)
+MAX_ENTRIES = 64
+
+# Lists longer than this are not cached, to bound memory use
+MAX_OBJECTS_PER_ENTRY = 100000
+
+
+def resource_family(endpoint):
+    """Reduce an endpoint path to the resource it manages.
+
+    Classic, Jamf Pro API and Platform API paths for the same kind of object
+    map to the same family, e.g. ``JSSResource/computergroups/id/3``,
+    ``api/v2/computer-groups/smart-groups`` and
+    ``api/pro/v1/tenant/abc/computer-groups`` all give ``computergroups``.
+    """
+    path = urlparse(endpoint).path if "://" in endpoint else endpoint
+    path = path.strip("/")
+    path = re.sub(r"^(JSSResource|api/proclassic/tenant/[^/]+)/", "", path)
+    path = re.sub(r"^(api|uapi)/(pro/)?", "", path)
+    path = re.sub(r"^(v\d+|preview)/", "", path)
+    path = re.sub(r"^tenant/[^/]+/", "", path)
+    first = path.split("/", 1)[0].split("?", 1)[0]
+    return first.replace("-", "").lower()
+
+
+class _Entry:
+    """A cached object list plus lazily built lookup indexes."""
+
+    def __init__(self, family):
+        self.family = family
+        self.objects = None
+        self.indexes = {}
+        self.lookups = {}
+
+    def index(self, name_key, id_key, case_insensitive):
+        """Return a name→ID dict for the list, building it on first use."""
+        index_key = (name_key, id_key, case_insensitive)
+        if index_key not in self.indexes:
+            index = {}
+            for obj in self.objects:
+                if not isinstance(obj, dict) or name_key not in obj:
+                    continue
+                name = obj[name_key]
+                if case_insensitive and isinstance(name, str):
+                    name = name.lower()
+                # keep the first match, as a linear scan would
+                index.setdefault(name, obj.get(id_key))
+            self.indexes[index_key] = index
+        return self.indexes[index_key]
+
+
+class JamfObjectCache:
+    """Size-bounded, thread-safe cache of object lists and name lookups.
+
+    Args:
+        max_entries: Maximum number of (instance, object_type, tenant) entries.
+    """
+
+    def __init__(self, max_entries=MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(jamf_url, object_type, tenant_id="", uuid=""):
+        """Return the cache key for an object type on an instance."""
+        netloc = urlparse(jamf_url).netloc.lower()
+        if uuid:
+            object_type = f"{object_type}:{uuid}"
+        return (netloc, object_type, tenant_id or "")
+
+    def get_list(self, key):
+        """Return a copy of the cached object list for key, or None.
+
+        The copy is deep, so callers may change the objects in it without
+        affecting the cache."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.objects is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            objects = entry.objects
+        # stored lists are replaced, never changed, so they can be copied unlocked
+        return copy.deepcopy(objects)
+
+    def put_list(self, key, endpoint, objects):
+        """Store a copy of a full object list downloaded from endpoint."""
+        if not isinstance(objects, list) or len(objects) > MAX_OBJECTS_PER_ENTRY:
+            return
+        objects = copy.deepcopy(objects)
+        with self._lock:
+            entry = self._entry(key, endpoint)
+            entry.objects = objects
+            entry.indexes = {}
+
+    def find_id(self, key, name, name_key="name", id_key="id", case_insensitive=True):
+        """Look up an object ID by name.
+
+        A cached full list is used if there is one, otherwise a previously
+        recorded lookup. Returns (found, object_id); found is False if
+        neither is available, and object_id is 0 if the object does not exist.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            found, object_id = False, 0
+            if entry is not None and entry.objects is not None:
+                index = entry.index(name_key, id_key, case_insensitive)
+                # a list without the name key cannot answer the question
+                if index or not entry.objects:
+                    lookup = name.lower() if case_insensitive else name
+                    found, object_id = True, index.get(lookup) or 0
+            if not found and entry is not None and (name_key, name) in entry.lookups:
+                found, object_id = True, entry.lookups[(name_key, name)]
+            if found:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+            return found, object_id
+
+    def put_lookup(self, key, endpoint, name_key, name, object_id):
+        """Record the result of a single (e.g. filtered) name lookup."""
+        with self._lock:
+            self._entry(key, endpoint).lookups[(name_key, name)] = object_id
+
+    def invalidate_url(self, url):
+        """Drop every entry for the instance and resource family written to."""
+        parsed = urlparse(url)
+        netloc = parsed.netloc.lower()
+        family = resource_family(parsed.path)
+        with self._lock:
+            stale = [
+                key
+                for key, entry in self._entries.items()
+                if key[0] == netloc and entry.family == family
+            ]
+            for key in stale:
+                del self._entries[key]
+        return len(stale)
+
+    def clear(self):
+        """Drop all entries."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Return a short hit/miss summary string."""
+        return f"{self.hits} hits, {self.misses} misses, {len(self._entries)} entries"
+
+    def _entry(self, key, endpoint):
+        """Return the entry for key, creating it and evicting LRU if needed."""
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._entries[key] = _Entry(resource_family(endpoint))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        self._entries.move_to_end(key)
+        return entry
+
+
+_SHARED_CACHE = None
+_SHARED_LOCK = threading.Lock()
+
+
+def shared_object_cache():
+    """Return the process-wide JamfObjectCache, creating it on first use."""
+    global _SHARED_CACHE  # pylint: disable=global-statement
+    with _SHARED_LOCK:
+        if _SHARED_CACHE is None:
+            _SHARED_CACHE = JamfObjectCache()
+        return _SHARED_CACHE
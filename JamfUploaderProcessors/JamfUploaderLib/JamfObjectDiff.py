@@ -0,0 +1,161 @@
+#!/usr/local/autopkg/python
+# pylint: disable=invalid-name
+
+"""
+JamfObjectDiff — decide whether an upload would change an existing object.
+
+An object on the server carries more than the template that created it: IDs,
+server-side defaults and computed values. So the existing object is first
+projected onto the shape of the new contents, keeping only the elements or
+keys that the new contents set, and both sides are reduced to a canonical
+form and hashed. If the hashes match, uploading the new contents would not
+change anything that the template controls.
+
+Lists (and repeated XML elements) must have the same length on both sides;
+their items are matched in order where possible, otherwise by content, as
+the server may return them in a different order.
+
+Copyright 2026 Graham Pugh
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import hashlib
+import json
+import xml.etree.ElementTree as ET
+
+
+def _scalar(value):
+    """Return the canonical text of a leaf value."""
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    text = str(value).strip()
+    if text.lower() in ("true", "false"):
+        return text.lower()
+    return text
+
+
+def _xml_value(elem):
+    """Return an element as leaf text, or a list of (tag, value) pairs."""
+    children = list(elem)
+    if not children:
+        return _scalar(elem.text)
+    return [(child.tag, _xml_value(child)) for child in children]
+
+
+def _json_value(value):
+    """Return JSON data with every leaf in canonical form."""
+    if isinstance(value, dict):
+        return {key: _json_value(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_json_value(item) for item in value]
+    return _scalar(value)
+
+
+def _match_items(existing_items, new_items, project):
+    """Project each existing item onto the new item it corresponds to.
+
+    Each existing item is matched to at most one new item."""
+    unused = list(range(len(existing_items)))
+    projected = []
+    for index, new_item in enumerate(new_items):
+        match = None
+        if index in unused:
+            candidate = project(existing_items[index], new_item)
+            if candidate == new_item:
+                match = index
+        if match is None:
+            # the server may have reordered the list, so look for an equal item
+            for other in unused:
+                other_candidate = project(existing_items[other], new_item)
+                if other_candidate == new_item:
+                    match, candidate = other, other_candidate
+                    break
+        if match is None:
+            # nothing left is equal, so compare with an unmatched item
+            match = index if index in unused else unused[0]
+            candidate = project(existing_items[match], new_item)
+        unused.remove(match)
+        projected.append(candidate)
+    return projected
+
+
+def _project_xml(existing, new):
+    """Keep only the parts of an XML value that the new value sets."""
+    if not isinstance(new, list) or not isinstance(existing, list):
+        return existing
+    projected = []
+    for tag in dict.fromkeys(tag for tag, _ in new):
+        new_items = [value for item_tag, value in new if item_tag == tag]
+        existing_items = [value for item_tag, value in existing if item_tag == tag]
+        if len(new_items) != len(existing_items):
+            projected.extend((tag, value) for value in existing_items)
+            continue
+        projected.extend(
+            (tag, value)
+            for value in _match_items(existing_items, new_items, _project_xml)
+        )
+    return projected
+
+
+def _project_json(existing, new):
+    """Keep only the parts of a JSON value that the new value sets."""
+    if isinstance(new, dict) and isinstance(existing, dict):
+        return {key: _project_json(existing.get(key, ""), new[key]) for key in new}
+    if isinstance(new, list) and isinstance(existing, list):
+        if len(new) != len(existing):
+            return existing
+        return _match_items(existing, new, _project_json)
+    return existing
+
+
+def canonical_hash(value):
+    """Return a SHA-256 hex digest of canonical data."""
+    text = json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def compare_objects(existing, new, api_type):
+    """Compare an existing object with the contents that would be uploaded.
+
+    Args:
+        existing: The object on the server, as XML text (Classic API) or JSON
+                  text or dict.
+        new:      The contents to be uploaded, in the same format.
+        api_type: "classic" for XML, anything else for JSON.
+
+    Returns (unchanged, existing_hash, new_hash). Raises ValueError if either
+    side cannot be parsed.
+    """
+    if api_type == "classic":
+        try:
+            existing_root = ET.fromstring(existing)
+            new_root = ET.fromstring(new)
+        except ET.ParseError as e:
+            raise ValueError(f"could not parse XML: {e}") from e
+        if existing_root.tag != new_root.tag:
+            return False, "", ""
+        new_value = _xml_value(new_root)
+        projected = _project_xml(_xml_value(existing_root), new_value)
+    else:
+        if not isinstance(existing, (dict, list)):
+            existing = json.loads(existing)
+        if not isinstance(new, (dict, list)):
+            new = json.loads(new)
+        new_value = _json_value(new)
+        projected = _project_json(_json_value(existing), new_value)
+    existing_hash = canonical_hash(projected)
+    new_hash = canonical_hash(new_value)
+    return existing_hash == new_hash, existing_hash, new_hash
@@ -22,6 +22,9 @@ import os.path
 import sys
 import xml.etree.ElementTree as ET
 
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from time import monotonic
+
 from autopkglib import (  # pylint: disable=import-error
     ProcessorError,
 )
@@ -31,10 +34,19 @@ from autopkglib import (  # pylint: disable=import-error
 # imports require noqa comments for E402
 sys.path.insert(0, os.path.dirname(__file__))
 
+from JamfExportManifest import (  # pylint: disable=import-error, wrong-import-position
+    ExportManifest,
+    content_hash,
+    holds_full_object,
+)
 from JamfUploaderBase import (  # pylint: disable=import-error, wrong-import-position
     JamfUploaderBase,
 )
 
+# Save the export manifest after this many objects, so that an interrupted
+# export does not have to start again
+EXPORT_MANIFEST_SAVE_INTERVAL = 100
+
 
 class JamfObjectReaderBase(JamfUploaderBase):
     """Class for functions used to read a generic API object in Jamf"""
@@ -161,6 +173,344 @@ class JamfObjectReaderBase(JamfUploaderBase):
 
         return payload_output_filename, payload_file_path
 
+    def get_object_types(self):
+        """Return the object types to export: object_types (a list or a
+        comma-separated string), otherwise object_type"""
+        object_types = self.env.get("object_types")
+        if isinstance(object_types, str):
+            object_types = object_types.split(",")
+        object_types = [
+            str(object_type).strip()
+            for object_type in object_types or []
+            if str(object_type).strip()
+        ]
+        if not object_types and self.env.get("object_type"):
+            object_types = [self.env["object_type"]]
+        return object_types
+
+    def get_export_settings(self):
+        """Return (workers, requests_per_second, max_age) for all_objects exports.
+
+        export_workers sets the number of objects downloaded at once (1-16,
+        default 4), max_requests_per_second paces requests to the Jamf host
+        (default 0, meaning unlimited) and export_max_age is the number of
+        seconds after which objects whose list entry is only an ID and name are
+        downloaded again (default 0, meaning on every export)."""
+        try:
+            workers = int(self.env.get("export_workers") or 4)
+            if workers < 1 or workers > 16:
+                raise ValueError
+        except (ValueError, TypeError):
+            workers = 4
+        try:
+            requests_per_second = float(self.env.get("max_requests_per_second") or 0)
+            if requests_per_second < 0:
+                raise ValueError
+        except (ValueError, TypeError):
+            requests_per_second = 0
+        try:
+            max_age = int(self.env.get("export_max_age") or 0)
+            if max_age < 0:
+                raise ValueError
+        except (ValueError, TypeError):
+            max_age = 0
+        return workers, requests_per_second, max_age
+
+    def export_object(
+        self,
+        api_url,
+        job,
+        output_dir,
+        subdomain,
+        manifest,
+        token,
+        tenant_id="",
+        elements_to_remove=None,
+        elements_to_retain=None,
+    ):
+        """Download one object and write it to output_dir unless its content is
+        unchanged since the last export. Returns the path written, or ''."""
+        fetch_type = job["fetch_type"]
+        raw_object = self.get_api_object_contents_from_id(
+            api_url,
+            fetch_type,
+            job["id"],
+            object_path="",
+            token=token,
+            tenant_id=tenant_id,
+        )
+        parsed_object = self.parse_downloaded_api_object(
+            raw_object, fetch_type, elements_to_remove, elements_to_retain
+        )
+        # a list entry that holds the whole object shows every later change
+        strong = job["strong"] or holds_full_object(job["entry"], raw_object)
+        self.output("Raw object:", verbose_level=3)
+        self.log(parsed_object, verbose_level=3)
+
+        digest = content_hash(parsed_object)
+        if manifest.is_unchanged(fetch_type, job["id"], job["name"], digest):
+            self.output(
+                f"{fetch_type} '{job['name']}' is unchanged", verbose_level=2
+            )
+            manifest.record(
+                fetch_type,
+                job["id"],
+                job["name"],
+                job["fingerprint"],
+                strong,
+                digest,
+                None,
+            )
+            return ""
+
+        _, file_path = self.write_output_file(
+            job["write_type"],
+            output_dir,
+            parsed_object,
+            subdomain,
+            object_subtype=job["subtype"],
+            n=job["name"],
+        )
+        files = [file_path]
+        if job["subtype"] is None:
+            payload, payload_filetype = self.get_payload_filetype(
+                fetch_type, parsed_object
+            )
+            if payload:
+                _, payload_file_path = self.write_payload_file(
+                    output_dir,
+                    payload,
+                    payload_filetype,
+                    subdomain,
+                    fetch_type,
+                    n=job["name"],
+                )
+                files.append(payload_file_path)
+        manifest.record(
+            fetch_type,
+            job["id"],
+            job["name"],
+            job["fingerprint"],
+            strong,
+            digest,
+            files,
+        )
+        return file_path
+
+    def export_all_objects(
+        self,
+        api_url,
+        object_types,
+        output_dir,
+        subdomain,
+        token,
+        tenant_id="",
+        uuid="",
+        elements_to_remove=None,
+        elements_to_retain=None,
+    ):
+        """Export every object of each type to output_dir.
+
+        Objects are downloaded by a bounded pool of workers and each is written
+        as soon as it arrives. An export manifest in output_dir records what was
+        exported, so that objects whose list entry is unchanged are not
+        downloaded again, and objects whose content is unchanged are not written
+        again. Returns a list of per-type results."""
+        workers, requests_per_second, max_age = self.get_export_settings()
+        if not os.path.isdir(output_dir):
+            try:
+                os.makedirs(output_dir)
+            except OSError as e:
+                raise ProcessorError(
+                    f"Could not create output directory {output_dir} - {str(e)}"
+                ) from e
+            self.output(f"Created output directory {output_dir}", verbose_level=1)
+
+        manifest = ExportManifest(
+            output_dir,
+            max_age=max_age,
+            log_fn=self.output,
+            options={
+                "elements_to_remove": elements_to_remove,
+                "elements_to_retain": elements_to_retain,
+            },
+        )
+        if self.to_bool(self.env.get("force_full_export", False)):
+            self.output("Ignoring the export manifest as force_full_export is set")
+            manifest.reset()
+
+        results = []
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            try:
+                for object_type in object_types:
+                    results.append(
+                        self.export_object_type(
+                            api_url,
+                            object_type,
+                            output_dir,
+                            subdomain,
+                            manifest,
+                            token,
+                            executor,
+                            requests_per_second,
+                            tenant_id=tenant_id,
+                            uuid=uuid,
+                            elements_to_remove=elements_to_remove,
+                            elements_to_retain=elements_to_retain,
+                        )
+                    )
+            finally:
+                manifest.save()
+        return results
+
+    def export_object_type(
+        self,
+        api_url,
+        object_type,
+        output_dir,
+        subdomain,
+        manifest,
+        token,
+        executor,
+        requests_per_second=0,
+        tenant_id="",
+        uuid="",
+        elements_to_remove=None,
+        elements_to_retain=None,
+    ):
+        """Export every object of one type, using the shared executor"""
+        start = monotonic()
+        namekey = self.get_namekey(object_type)
+        self.output(f"Getting all {object_type} objects from {api_url}")
+        object_list = self.get_all_api_objects(
+            api_url,
+            object_type,
+            tenant_id=tenant_id,
+            uuid=uuid,
+            token=token,
+            namekey=namekey,
+        )
+
+        # accounts are listed as users and groups, which are fetched separately
+        if object_type == "account":
+            lists = [
+                ("account_user", "users", (object_list or {}).get("users", [])),
+                ("account_group", "groups", (object_list or {}).get("groups", [])),
+            ]
+            list_namekey = "name"
+        else:
+            lists = [(object_type, None, object_list or [])]
+            list_namekey = namekey
+
+        jobs = []
+        total = unchanged_listed = 0
+        for fetch_type, subtype, objects in lists:
+            total += len(objects)
+            to_fetch, unchanged = manifest.plan(fetch_type, objects)
+            unchanged_listed += unchanged
+            for entry, list_fingerprint, strong in to_fetch:
+                if list_namekey not in entry:
+                    raise ProcessorError(
+                        f"ERROR: {list_namekey} not found in object {entry}"
+                    )
+                jobs.append(
+                    {
+                        "fetch_type": fetch_type,
+                        "write_type": object_type,
+                        "subtype": subtype,
+                        "id": entry["id"],
+                        "name": str(entry[list_namekey]),
+                        "fingerprint": list_fingerprint,
+                        "strong": strong,
+                        "entry": entry,
+                    }
+                )
+        self.output(
+            f"{total} {object_type} objects: downloading {len(jobs)}, "
+            f"{unchanged_listed} unchanged since the last export"
+        )
+
+        def export(job):
+            self.wait_for_rate_limit(api_url, requests_per_second)
+            return self.export_object(
+                api_url,
+                job,
+                output_dir,
+                subdomain,
+                manifest,
+                token,
+                tenant_id=tenant_id,
+                elements_to_remove=elements_to_remove,
+                elements_to_retain=elements_to_retain,
+            )
+
+        written = []
+        failed = []
+        futures = {executor.submit(export, job): job for job in jobs}
+        for done, future in enumerate(as_completed(futures), start=1):
+            job = futures[future]
+            try:
+                file_path = future.result()
+            except ProcessorError as e:
+                self.output(
+                    f"WARNING: could not export {job['fetch_type']} "
+                    f"'{job['name']}': {e}"
+                )
+                failed.append(job)
+            else:
+                if file_path:
+                    written.append(file_path)
+            if done % EXPORT_MANIFEST_SAVE_INTERVAL == 0:
+                manifest.save()
+
+        result = {
+            "object_type": object_type,
+            "objects": total,
+            "downloaded": len(jobs),
+            "written": len(written),
+            "unchanged": total - len(written) - len(failed),
+            "failed": failed,
+            "seconds": monotonic() - start,
+            "file_path": written[-1] if written else "",
+        }
+        self.output(
+            f"Exported {object_type}: {result['written']} written, "
+            f"{result['unchanged']} unchanged, {len(failed)} failed "
+            f"in {result['seconds']:.2f}s"
+        )
+        return result
+
+    def export_summary(self, results, output_dir):
+        """Set the output variables and summary result of an all_objects export"""
+        file_paths = [result["file_path"] for result in results if result["file_path"]]
+        self.env["object_type"] = ", ".join(result["object_type"] for result in results)
+        self.env["output_dir"] = output_dir
+        self.env["file_path"] = file_paths[-1] if file_paths else ""
+        self.env["jamfobjectreader_summary_result"] = {
+            "summary_text": "The following objects were outputted in Jamf Pro:",
+            "report_fields": [
+                "object_types",
+                "objects",
+                "written",
+                "unchanged",
+                "failed",
+                "export_time",
+                "output_dir",
+            ],
+            "data": {
+                "object_types": self.env["object_type"],
+                "objects": str(sum(result["objects"] for result in results)),
+                "written": str(sum(result["written"] for result in results)),
+                "unchanged": str(sum(result["unchanged"] for result in results)),
+                "failed": str(sum(len(result["failed"]) for result in results)),
+                "export_time": ", ".join(
+                    f"{result['object_type']} {result['seconds']:.2f}s"
+                    for result in results
+                ),
+                "output_dir": output_dir,
+            },
+        }
+
     def execute(self):
         """Upload an API object"""
         jamf_url = (self.env.get("JSS_URL") or "").rstrip("/")
@@ -189,6 +539,9 @@ class JamfObjectReaderBase(JamfUploaderBase):
             [elements_to_retain] if isinstance(elements_to_retain, str) else []
         )
         skip_if = self.env.get("skip_if")
+        object_types = self.get_object_types()
+        if not object_type and all_objects and object_types:
+            object_type = object_types[0]
 
         # check for required variables
         if not all_objects and not list_only and not "_settings" in object_type:
@@ -268,8 +621,36 @@ class JamfObjectReaderBase(JamfUploaderBase):
         )
         self.output(f"API URL for {object_type} is {api_url}", verbose_level=3)
 
-        # if requesting all objects we need to generate a list of all to iterate through
-        if all_objects or list_only:
+        # export every object of each type, downloading them concurrently
+        if all_objects and not list_only:
+            # we really need an output path for all_objects, so exit if not provided
+            if not output_dir:
+                raise ProcessorError("ERROR: no output path provided")
+            results = self.export_all_objects(
+                api_url,
+                object_types,
+                output_dir,
+                subdomain,
+                token,
+                tenant_id=jamf_platform_gw_tenant_id,
+                uuid=uuid,
+                elements_to_remove=elements_to_remove,
+                elements_to_retain=elements_to_retain,
+            )
+            self.export_summary(results, output_dir)
+            self.env["process_skipped"] = process_skipped
+            failed = [job for result in results for job in result["failed"]]
+            if failed:
+                raise ProcessorError(
+                    f"ERROR: {len(failed)} object(s) could not be exported: "
+                    + ", ".join(
+                        f"{job['fetch_type']} '{job['name']}'" for job in failed
+                    )
+                )
+            return
+
+        # if requesting a list of all objects we need to generate it
+        if list_only:
             self.output(f"Getting all {object_type} objects from {api_url}")
             object_list = self.get_all_api_objects(
                 api_url,
@@ -312,9 +693,6 @@ class JamfObjectReaderBase(JamfUploaderBase):
                                 raise ProcessorError(
                                     f"Could not create output directory {output_dir} - {str(dir_error)}"
                                 ) from dir_error
-            # we really need an output path for all_objects, so exit if not provided
-            if not output_dir:
-                raise ProcessorError("ERROR: no output path provided")
 
         elif object_id:
             if object_name:
@@ -390,8 +768,11 @@ class JamfObjectReaderBase(JamfUploaderBase):
                 api_url, object_type, token, tenant_id=jamf_platform_gw_tenant_id
             )
             if object_content:
-                self.output(
-                    f"{object_type} content on {api_url}: {object_content}",
+                self.log(
+                    "%s content on %s: %s",
+                    object_type,
+                    api_url,
+                    object_content,
                     verbose_level=3,
                 )
                 if settings_key:
@@ -432,126 +813,72 @@ class JamfObjectReaderBase(JamfUploaderBase):
                 f"Iterating through {object_type} objects in {api_url}",
                 verbose_level=1,
             )
-            # exception for accounts
-            if object_type == "account":
-                # for accounts we need to split the object list into users and groups
-                for object_subtype in ["users", "groups"]:
-                    self.output(
-                        f"Iterating through {object_subtype} in {object_type} object list",
-                        verbose_level=1,
-                    )
-                    for obj in object_list[object_subtype]:
-                        i = obj["id"]
-                        n = obj["name"]
-                        raw_object = ""
-                        parsed_object = ""
-                        payload = ""
-
-                        # get the object
-                        if object_subtype == "users":
-                            object_type = "account_user"
-                        else:
-                            object_type = "account_group"
-                        raw_object = self.get_api_object_contents_from_id(
-                            api_url,
-                            object_type,
-                            i,
-                            object_path="",
-                            token=token,
-                            tenant_id=jamf_platform_gw_tenant_id,
-                        )
-
-                        # parse the object
-                        parsed_object = self.parse_downloaded_api_object(
-                            raw_object,
-                            object_type,
-                            elements_to_remove,
-                            elements_to_retain,
+            # iterate through the list and get the object contents
+            for obj in object_list:
+                i = obj["id"]
+                if object_name:
+                    # if we have an object name, use that
+                    n = object_name
+                elif object_id and len(object_list) == 1:
+                    # if we have an object ID use the ID in the filename if only one object
+                    n = object_id
+                else:
+                    # otherwise use the name key from the object
+                    if namekey not in obj:
+                        raise ProcessorError(
+                            f"ERROR: {namekey} not found in object {obj}"
                         )
+                    n = obj[namekey]
+                raw_object = ""
+                parsed_object = ""
+                payload = ""
 
-                        self.output(parsed_object, verbose_level=2)
+                # get the object
+                raw_object = self.get_api_object_contents_from_id(
+                    api_url,
+                    object_type,
+                    i,
+                    object_path="",
+                    token=token,
+                    tenant_id=jamf_platform_gw_tenant_id,
+                )
 
-                        # dump the object to file if output_dir is specified
+                # parse the object
+                parsed_object = self.parse_downloaded_api_object(
+                    raw_object, object_type, elements_to_remove, elements_to_retain
+                )
 
-                        if output_dir:
-                            object_content, file_path = self.write_output_file(
-                                object_type,
-                                output_dir,
-                                parsed_object,
-                                subdomain,
-                                object_subtype=object_subtype,
-                                n=n,
-                            )
-            else:
-                # for all other object types we can just iterate through the list
-                # and get the object contents
-                for obj in object_list:
-                    i = obj["id"]
-                    if object_name:
-                        # if we have an object name, use that
-                        n = object_name
-                    elif object_id and len(object_list) == 1:
-                        # if we have an object ID use the ID in the filename if only one object
-                        n = object_id
-                    else:
-                        # otherwise use the name key from the object
-                        if namekey not in obj:
-                            raise ProcessorError(
-                                f"ERROR: {namekey} not found in object {obj}"
-                            )
-                        n = obj[namekey]
-                    raw_object = ""
-                    parsed_object = ""
-                    payload = ""
+                self.output("Raw object:", verbose_level=3)
+                self.output(parsed_object, verbose_level=3)
 
-                    # get the object
-                    raw_object = self.get_api_object_contents_from_id(
-                        api_url,
+                # dump the object to file if output_dir is specified
+                if output_dir:
+                    object_content, file_path = self.write_output_file(
                         object_type,
-                        i,
-                        object_path="",
-                        token=token,
-                        tenant_id=jamf_platform_gw_tenant_id,
+                        output_dir,
+                        parsed_object,
+                        subdomain,
+                        object_subtype=None,
+                        n=n,
                     )
 
-                    # parse the object
-                    parsed_object = self.parse_downloaded_api_object(
-                        raw_object, object_type, elements_to_remove, elements_to_retain
+                    payload, payload_filetype = self.get_payload_filetype(
+                        object_type, parsed_object
                     )
 
-                    self.output("Raw object:", verbose_level=3)
-                    self.output(parsed_object, verbose_level=3)
-
-                    # dump the object to file if output_dir is specified
-                    if output_dir:
-                        object_content, file_path = self.write_output_file(
-                            object_type,
-                            output_dir,
-                            parsed_object,
-                            subdomain,
-                            object_subtype=None,
-                            n=n,
-                        )
-
-                        payload, payload_filetype = self.get_payload_filetype(
-                            object_type, parsed_object
-                        )
-
-                        if payload:
-                            payload_output_filename, payload_file_path = (
-                                self.write_payload_file(
-                                    output_dir,
-                                    payload,
-                                    payload_filetype,
-                                    subdomain,
-                                    object_type,
-                                    n=n,
-                                )
-                            )
-                            self.env["payload_output_filename"] = (
-                                payload_output_filename
+                    if payload:
+                        payload_output_filename, payload_file_path = (
+                            self.write_payload_file(
+                                output_dir,
+                                payload,
+                                payload_filetype,
+                                subdomain,
+                                object_type,
+                                n=n,
                             )
-                            self.env["payload_file_path"] = payload_file_path
+                        )
+                        self.env["payload_output_filename"] = payload_output_filename
+                        self.env["payload_file_path"] = payload_file_path
 
         self.env["object_type"] = object_type
         self.env["output_dir"] = output_dir
@@ -21,7 +21,6 @@ import json
 import os.path
 import sys
 
-from time import sleep
 from xml.etree import ElementTree as ET
 
 from autopkglib import (  # pylint: disable=import-error
@@ -87,16 +86,12 @@ class JamfObjectStateChangerBase(JamfUploaderBase):
             # check HTTP response
             if self.status_check(r, object_type, object_id, request) == "break":
                 break
-            if count >= max_tries:
+            if not self.retry_wait(r, count, max_tries, sleep_time, url):
                 self.output(
-                    f"WARNING: {object_type} request did not succeed after {max_tries} attempts"
+                    f"WARNING: {object_type} request did not succeed after {count} attempts"
                 )
                 self.output(f"\nHTTP GET Response Code: {r.status_code}")
                 raise ProcessorError(f"ERROR: {object_type} GET Request failed")
-            if int(sleep_time) > 10:
-                sleep(int(sleep_time))
-            else:
-                sleep(10)
 
         # now update the object state
         self.output(f"Setting {object_type} state to {object_state}...")
@@ -149,7 +144,7 @@ class JamfObjectStateChangerBase(JamfUploaderBase):
         with open(output_file, "r", encoding="utf-8") as file:
             updated_data = file.read().encode("utf-8")
         self.output("Updated data to be sent:", verbose_level=3)
-        self.output(updated_data.decode("utf-8"), verbose_level=3)
+        self.log(updated_data, verbose_level=3)
 
         # now upload the updated object
         count = 0
@@ -170,16 +165,12 @@ class JamfObjectStateChangerBase(JamfUploaderBase):
             # check HTTP response
             if self.status_check(r, object_type, object_id, request) == "break":
                 break
-            if count >= max_tries:
+            if not self.retry_wait(r, count, max_tries, sleep_time, url):
                 self.output(
-                    f"WARNING: {object_type} update did not succeed after {max_tries} attempts"
+                    f"WARNING: {object_type} update did not succeed after {count} attempts"
                 )
                 self.output(f"\nHTTP PUT Response Code: {r.status_code}")
                 raise ProcessorError(f"ERROR: {object_type} update failed ")
-            if int(sleep_time) > 10:
-                sleep(int(sleep_time))
-            else:
-                sleep(10)
 
     def execute(self):
         """Flush a policy log"""
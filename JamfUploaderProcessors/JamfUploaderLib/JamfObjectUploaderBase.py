@@ -20,7 +20,6 @@ limitations under the License.
 import os.path
 import sys
 
-from time import sleep
 
 from autopkglib import (  # pylint: disable=import-error
     ProcessorError,
@@ -147,16 +146,12 @@ class JamfObjectUploaderBase(JamfUploaderBase):
                     self.output(f"Failover URL: {failover_url}", verbose_level=1)
                     self.env["failover_url"] = failover_url
                 break
-            if count >= max_tries:
+            if not self.retry_wait(r, count, max_tries, sleep_time, url):
                 self.output(
-                    f"WARNING: {object_type} upload did not succeed after {max_tries} attempts"
+                    f"WARNING: {object_type} upload did not succeed after {count} attempts"
                 )
                 self.output(f"\nHTTP POST Response Code: {r.status_code}")
                 raise ProcessorError(f"ERROR: {object_type} upload failed ")
-            if int(sleep_time) > 10:
-                sleep(int(sleep_time))
-            else:
-                sleep(10)
         return r
 
     def execute(self):
@@ -198,6 +193,8 @@ class JamfObjectUploaderBase(JamfUploaderBase):
             del self.env["jamfobjectuploader_summary_result"]
         if "dry_run_summary_result" in self.env:
             del self.env["dry_run_summary_result"]
+        if "jamfobjectuploader_unchanged_summary_result" in self.env:
+            del self.env["jamfobjectuploader_unchanged_summary_result"]
 
         # skip the process if skip_if is True
         if skip_if and self.predicate_evaluates_as_true(skip_if):
@@ -386,20 +383,41 @@ class JamfObjectUploaderBase(JamfUploaderBase):
             self.env["process_skipped"] = process_skipped
             return
 
-        # upload the object
-        self.upload_object(
-            api_url,
-            api_type=api_type,
-            object_type=object_type,
-            object_template=template_file,
-            sleep_time=sleep_time,
-            token=token,
-            max_tries=max_tries,
-            object_name=object_name,
-            object_id=object_id,
-            tenant_id=jamf_platform_gw_tenant_id,
-        )
-        object_updated = True
+        # skip the upload if the existing object already matches the template
+        if (
+            object_id
+            and template_file
+            and "_command" not in object_type
+            and self.object_is_unchanged(
+                api_url,
+                object_type,
+                object_id,
+                self.read_template(template_file),
+                token=token,
+                tenant_id=jamf_platform_gw_tenant_id,
+                elements_to_remove=elements_to_remove,
+            )
+        ):
+            self.unchanged_summary(
+                "jamfobjectuploader_unchanged_summary_result",
+                object_type,
+                str(object_name),
+            )
+        else:
+            # upload the object
+            self.upload_object(
+                api_url,
+                api_type=api_type,
+                object_type=object_type,
+                object_template=template_file,
+                sleep_time=sleep_time,
+                token=token,
+                max_tries=max_tries,
+                object_name=object_name,
+                object_id=object_id,
+                tenant_id=jamf_platform_gw_tenant_id,
+            )
+            object_updated = True
 
         # output the summary
         self.env["object_name"] = str(object_name)
@@ -20,7 +20,6 @@ limitations under the License.
 import os.path
 import sys
 
-from time import sleep
 from urllib.parse import urlparse
 
 from autopkglib import (  # pylint: disable=import-error
@@ -83,13 +82,12 @@ class JamfPackageCleanerBase(JamfUploaderBase):
             # check HTTP response
             if self.status_check(r, "Package", object_id, request) == "break":
                 break
-            if count >= max_tries:
+            if not self.retry_wait(r, count, max_tries, url=url):
                 self.output(
-                    f"WARNING: Package deletion did not succeed after {max_tries} attempts"
+                    f"WARNING: Package deletion did not succeed after {count} attempts"
                 )
                 self.output(f"\nHTTP DELETE Response Code: {r.status_code}")
                 raise ProcessorError("ERROR: Package deletion failed")
-            sleep(10)
         return r
 
     def execute(self):
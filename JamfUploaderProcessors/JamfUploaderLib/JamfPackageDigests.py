@@ -0,0 +1,193 @@
+#!/usr/local/autopkg/python
+# pylint: disable=invalid-name
+
+"""
+JamfPackageDigests — single-pass package hashing with a persistent cache.
+
+Computes any combination of SHA3-512, SHA-512, SHA-256 and MD5 digests of a
+file in one streaming pass over an mmap of the file (falling back to large
+buffered reads where mmap is not possible). The digests of each chunk are
+updated in parallel threads, as hashlib releases the GIL for large buffers.
+
+Results are kept in a cache directory, one small JSON file per package path,
+and are reused as long as the file's (path, size, mtime_ns, inode) key is
+unchanged, so an unchanged package is never hashed twice. The cache
+directory must be owned by the current user and is kept owner-only; if it is
+not, the cache is not used.
+
+Copyright 2026 Graham Pugh
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import stat
+import tempfile
+
+from concurrent.futures import ThreadPoolExecutor
+
+# Default location of the digest cache
+DIGEST_CACHE_DIR = "/tmp/jamf_upload/digest_cache"
+
+# Bytes hashed per step of the streaming pass
+CHUNK_SIZE = 8 * 1024 * 1024
+
+# Supported digests, named as in hashlib
+ALGORITHMS = {
+    "sha3_512": hashlib.sha3_512,
+    "sha512": hashlib.sha512,
+    "sha256": hashlib.sha256,
+    "md5": hashlib.md5,
+}
+
+
+def file_key(path):
+    """Return the (path, size, mtime_ns, inode) identity of a file."""
+    st = os.stat(path)
+    return [os.path.realpath(path), st.st_size, st.st_mtime_ns, st.st_ino]
+
+
+def compute_digests(path, algorithms, chunk_size=CHUNK_SIZE):
+    """Return {algorithm: hexdigest} for a file, reading it only once."""
+    hashers = {name: ALGORITHMS[name]() for name in algorithms}
+    if not hashers:
+        return {}
+
+    with ThreadPoolExecutor(max_workers=len(hashers)) as pool:
+
+        def update(chunk):
+            if len(hashers) == 1:
+                for h in hashers.values():
+                    h.update(chunk)
+                return
+            for future in [pool.submit(h.update, chunk) for h in hashers.values()]:
+                future.result()
+
+        with open(path, "rb", buffering=0) as f:
+            size = os.fstat(f.fileno()).st_size
+            mapped = None
+            if size:
+                try:
+                    mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                except (OSError, ValueError):
+                    pass
+            if mapped is not None:
+                if hasattr(mapped, "madvise") and hasattr(mmap, "MADV_SEQUENTIAL"):
+                    mapped.madvise(mmap.MADV_SEQUENTIAL)
+                view = memoryview(mapped)
+                try:
+                    for offset in range(0, size, chunk_size):
+                        update(view[offset : offset + chunk_size])
+                finally:
+                    view.release()
+                    mapped.close()
+            else:
+                buffer = memoryview(bytearray(chunk_size))
+                for n in iter(lambda: f.readinto(buffer), 0):
+                    update(buffer[:n])
+
+    return {name: h.hexdigest() for name, h in hashers.items()}
+
+
+class JamfPackageDigestCache:
+    """Persistent cache of package digests.
+
+    Args:
+        cache_dir: Directory for cache entries.
+        log_fn:    Optional callable(msg, verbose_level) for logging.
+    """
+
+    def __init__(self, cache_dir=DIGEST_CACHE_DIR, log_fn=None):
+        self.cache_dir = cache_dir
+        self._log = log_fn or (lambda msg, **kw: None)
+        self._dir_ok = None
+
+    def get_digests(self, path, algorithms):
+        """Return {algorithm: hexdigest} for path, hashing only what is not cached."""
+        key = file_key(path)
+        entry_path = self._entry_path(key[0])
+        digests = {}
+        if self._ensure_dir():
+            try:
+                with open(entry_path, "r", encoding="utf-8") as fp:
+                    entry = json.load(fp)
+                if entry.get("key") == key:
+                    digests = entry.get("digests", {})
+            except (OSError, ValueError):
+                pass
+
+        missing = [name for name in algorithms if name not in digests]
+        if not missing:
+            self._log(f"Using cached digests for {path}", verbose_level=2)
+        else:
+            self._log(f"Calculating {', '.join(missing)} of {path}", verbose_level=2)
+            digests.update(compute_digests(path, missing))
+            # only store the result if the file did not change while being read
+            if file_key(path) == key:
+                self._store(entry_path, key, digests)
+        return {name: digests[name] for name in algorithms}
+
+    def put_digests(self, path, digests):
+        """Record digests of path that were calculated elsewhere."""
+        if digests:
+            key = file_key(path)
+            self._store(self._entry_path(key[0]), key, dict(digests))
+
+    def _entry_path(self, real_path):
+        """Return the cache file for a package path."""
+        digest = hashlib.sha256(real_path.encode("utf-8")).hexdigest()[:32]
+        return os.path.join(self.cache_dir, f"{digest}.json")
+
+    def _ensure_dir(self):
+        """Create the cache directory as owner-only, and return False if it is
+        not safe to use, so that the cache is skipped."""
+        if self._dir_ok is None:
+            try:
+                os.makedirs(self.cache_dir, mode=0o700, exist_ok=True)
+                st = os.lstat(self.cache_dir)
+                if not stat.S_ISDIR(st.st_mode) or st.st_uid != os.getuid():
+                    self._log(
+                        f"Digest cache {self.cache_dir} is not owned by the "
+                        "current user; not using it",
+                        verbose_level=1,
+                    )
+                    self._dir_ok = False
+                else:
+                    if stat.S_IMODE(st.st_mode) != 0o700:
+                        os.chmod(self.cache_dir, 0o700)
+                    self._dir_ok = True
+            except OSError as e:
+                self._log(f"Could not use digest cache: {e}", verbose_level=2)
+                self._dir_ok = False
+        return self._dir_ok
+
+    def _store(self, entry_path, key, digests):
+        """Write a cache entry atomically; failures only cost a re-hash."""
+        if not self._ensure_dir():
+            return
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, prefix=".digest_")
+        except OSError as e:
+            self._log(f"Could not cache digests: {e}", verbose_level=2)
+            return
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as fp:
+                json.dump({"key": key, "digests": digests}, fp)
+            os.replace(tmp_path, entry_path)
+        except OSError as e:
+            self._log(f"Could not cache digests: {e}", verbose_level=2)
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
@@ -0,0 +1,316 @@
+#!/usr/local/autopkg/python
+# pylint: disable=invalid-name
+
+"""
+JamfPackageReferenceIndex — persistent index of package references.
+
+Records which packages each policy and patch software title on a Jamf Pro
+instance references, in an SQLite database under the instance cache
+directory, so that JamfUnusedPackageCleaner only has to download the objects
+that changed since its last run.
+
+Change detection uses a fingerprint of each object's entry in the list
+endpoint. Unless the list entry carries a version field, the fingerprint
+cannot see changes to the object's packages (Classic API policies, for
+instance, are listed by ID and name only), so such entries are re-fetched on
+every run unless max_age is set, in which case they are re-fetched once they
+are older than max_age seconds.
+Writes to a policy, patch software title or PreStage made through
+JamfUploaderBase.curl drop the written object's entry straight away.
+
+As the index decides which packages are treated as in use, its directories
+must be owned by the current user and are kept owner-only; if they are not,
+the index is refused.
+
+Copyright 2026 Graham Pugh
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import stat
+import threading
+import time
+from urllib.parse import urlparse
+
+from JamfObjectCache import resource_family  # pylint: disable=import-error
+
+# Default location of the index databases
+PACKAGE_INDEX_DIR = "/tmp/jamf_upload/package_index"
+
+# Entries whose list fingerprint is only an ID and name are re-fetched after
+# this many seconds (0: on every run)
+WEAK_FINGERPRINT_MAX_AGE = 0
+
+# Resource families (see JamfObjectCache.resource_family) whose writes change
+# the packages recorded for an index kind
+_KIND_FAMILIES = {
+    "policy": {"policies"},
+    "patch_software_title": {
+        "patchsoftwaretitles",
+        "patchsoftwaretitleconfigurations",
+    },
+    "computer_prestage": {"computerprestages"},
+}
+
+# List entry keys that change whenever the object is modified
+VERSION_KEYS = {
+    "versionLock",
+    "lastModified",
+    "lastModifiedDate",
+    "dateModified",
+    "modifiedDate",
+    "lastUpdated",
+    "updatedAt",
+}
+
+
+def fingerprint(entry):
+    """Return (fingerprint, strong) for an object's list entry.
+
+    strong is True only if the entry carries a version field. Summaries such
+    as {"id": 3, "name": "x", "is_smart": true} are weak: a matching
+    fingerprint does not prove the object is unchanged.
+    """
+    canonical = json.dumps(entry, sort_keys=True, separators=(",", ":"), default=str)
+    digest = hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+    strong = isinstance(entry, dict) and bool(VERSION_KEYS & set(entry))
+    return digest, strong
+
+
+def _ensure_private_dir(path):
+    """Create a directory as owner-only and refuse one owned by another user."""
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    st = os.lstat(path)
+    if not stat.S_ISDIR(st.st_mode) or st.st_uid != os.getuid():
+        raise PermissionError(f"{path} is not a directory owned by the current user")
+    if stat.S_IMODE(st.st_mode) != 0o700:
+        os.chmod(path, 0o700)
+
+
+def invalidate_package_references(url, index_dir=PACKAGE_INDEX_DIR):
+    """Drop index entries made stale by a write to url.
+
+    Writes to an object's own endpoint drop that object's entry; writes that
+    name the object some other way drop every entry of its kind. Writes to the
+    collection itself create new objects, which the next plan() fetches
+    anyway. Returns the number of entries dropped.
+    """
+    parsed = urlparse(url)
+    family = resource_family(parsed.path)
+    kinds = [kind for kind, families in _KIND_FAMILIES.items() if family in families]
+    if not kinds or not os.path.isdir(index_dir):
+        return 0
+
+    segments = [segment for segment in parsed.path.split("/") if segment]
+    rest = []
+    for position, segment in enumerate(segments):
+        if segment.replace("-", "").lower() == family:
+            rest = segments[position + 1 :]
+            break
+    if not rest:
+        return 0
+    if rest[0] == "id" and len(rest) > 1:
+        object_id = rest[1]
+    elif rest[0].isdigit():
+        object_id = rest[0]
+    else:
+        object_id = None
+
+    instance_id = re.sub(r"\W+", "_", parsed.netloc).strip("_")
+    dropped = 0
+    for name in os.listdir(index_dir):
+        if name != instance_id and not name.startswith(f"{instance_id}_"):
+            continue
+        db_path = os.path.join(index_dir, name, "references.db")
+        try:
+            if os.lstat(os.path.dirname(db_path)).st_uid != os.getuid():
+                continue
+        except OSError:
+            continue
+        if not os.path.exists(db_path):
+            continue
+        try:
+            with _closing(sqlite3.connect(db_path, timeout=30)) as conn:
+                for kind in kinds:
+                    if object_id is None:
+                        cursor = conn.execute(
+                            "DELETE FROM refs WHERE kind = ?", (kind,)
+                        )
+                    else:
+                        cursor = conn.execute(
+                            "DELETE FROM refs WHERE kind = ? AND object_id = ?",
+                            (kind, object_id),
+                        )
+                    dropped += cursor.rowcount
+        except sqlite3.Error:
+            continue
+    return dropped
+
+
+class JamfPackageReferenceIndex:
+    """SQLite-backed map of object → referenced package names.
+
+    Args:
+        db_path: Path of the SQLite database. Its directory is created if needed.
+                 PermissionError is raised if the directory, or the default
+                 index directory above it, belongs to another user.
+        max_age: Seconds after which weakly fingerprinted entries are re-fetched.
+                 0 (the default) re-fetches them on every run.
+        log_fn:  Optional callable(msg, verbose_level) for logging.
+    """
+
+    def __init__(self, db_path, max_age=WEAK_FINGERPRINT_MAX_AGE, log_fn=None):
+        self.db_path = db_path
+        self.max_age = max_age
+        self._log = log_fn or (lambda msg, **kw: None)
+        self._lock = threading.Lock()
+        db_dir = os.path.dirname(db_path)
+        if os.path.dirname(db_dir) == PACKAGE_INDEX_DIR:
+            _ensure_private_dir(PACKAGE_INDEX_DIR)
+        _ensure_private_dir(db_dir)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS refs ("
+                " kind TEXT NOT NULL,"
+                " object_id TEXT NOT NULL,"
+                " fingerprint TEXT NOT NULL,"
+                " strong INTEGER NOT NULL,"
+                " fetched_at REAL NOT NULL,"
+                " packages TEXT NOT NULL,"
+                " PRIMARY KEY (kind, object_id))"
+            )
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def reset(self, kind=None):
+        """Forget all entries, or all entries of one kind."""
+        with self._lock, self._connect() as conn:
+            if kind:
+                conn.execute("DELETE FROM refs WHERE kind = ?", (kind,))
+            else:
+                conn.execute("DELETE FROM refs")
+        self._log(f"Package reference index reset ({kind or 'all'})", verbose_level=2)
+
+    def plan(self, kind, objects, id_key="id"):
+        """Work out which objects in a freshly downloaded list must be fetched.
+
+        Entries for objects no longer in the list are removed. Returns a list
+        of (object_id, fingerprint, strong) tuples for the objects that are
+        new, changed, or weakly fingerprinted and older than max_age.
+        """
+        current = {}
+        for entry in objects:
+            digest, strong = fingerprint(entry)
+            current[str(entry[id_key])] = (digest, strong)
+
+        with self._lock, self._connect() as conn:
+            stored = {
+                object_id: (digest, fetched_at)
+                for object_id, digest, fetched_at in conn.execute(
+                    "SELECT object_id, fingerprint, fetched_at FROM refs"
+                    " WHERE kind = ?",
+                    (kind,),
+                )
+            }
+            removed = [
+                (kind, object_id) for object_id in stored if object_id not in current
+            ]
+            if removed:
+                conn.executemany(
+                    "DELETE FROM refs WHERE kind = ? AND object_id = ?", removed
+                )
+
+        now = time.time()
+        stale = []
+        for object_id, (digest, strong) in current.items():
+            previous = stored.get(object_id)
+            if (
+                previous is None
+                or previous[0] != digest
+                or (not strong and now - previous[1] >= self.max_age)
+            ):
+                stale.append((object_id, digest, strong))
+        self._log(
+            f"Package reference index: {len(current) - len(stale)} {kind} unchanged, "
+            f"{len(stale)} to fetch, {len(removed)} removed",
+            verbose_level=2,
+        )
+        return stale
+
+    def record(self, kind, rows):
+        """Store fetched results as (object_id, fingerprint, strong, packages)."""
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO refs"
+                " (kind, object_id, fingerprint, strong, fetched_at, packages)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        kind,
+                        str(object_id),
+                        digest,
+                        int(strong),
+                        now,
+                        json.dumps(sorted(set(packages))),
+                    )
+                    for object_id, digest, strong, packages in rows
+                ],
+            )
+
+    def packages(self, kind):
+        """Return the set of package names referenced by objects of a kind."""
+        with self._lock, self._connect() as conn:
+            rows = conn.execute(
+                "SELECT packages FROM refs WHERE kind = ?", (kind,)
+            ).fetchall()
+        referenced = set()
+        for (packages,) in rows:
+            referenced.update(json.loads(packages))
+        return referenced
+
+    # ------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------
+
+    def _connect(self):
+        """Open a connection; one per operation keeps the index thread-safe."""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return _closing(conn)
+
+
+class _closing:
+    """Commit (or roll back) and close an sqlite3 connection on exit."""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None:
+                self.conn.commit()
+            else:
+                self.conn.rollback()
+        finally:
+            self.conn.close()
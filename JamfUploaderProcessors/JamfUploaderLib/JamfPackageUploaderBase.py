@@ -24,7 +24,6 @@ Requirements for uploading to the AWS S3 API endpoint:
 To resolve the dependencies, run: /usr/local/autopkg/python -m pip install boto3
 """
 
-import hashlib
 import json
 import os.path
 import shutil
@@ -32,8 +31,8 @@ import subprocess
 import sys
 from urllib.parse import quote
 
-from shutil import copyfile
-from time import sleep
+from concurrent.futures import ThreadPoolExecutor
+from time import monotonic, sleep
 from urllib.parse import urlparse
 
 from autopkglib import ProcessorError, APLooseVersion  # pylint: disable=import-error
@@ -43,6 +42,20 @@ from autopkglib import ProcessorError, APLooseVersion  # pylint: disable=import-
 # imports require noqa comments for E402
 sys.path.insert(0, os.path.dirname(__file__))
 
+from JamfBundleZipper import (  # pylint: disable=import-error, wrong-import-position
+    bundle_fingerprint,
+    is_current,
+    zip_bundle,
+)
+from JamfPackageDigests import (  # pylint: disable=import-error, wrong-import-position
+    JamfPackageDigestCache,
+)
+from JamfUploadEngine import (  # pylint: disable=import-error, wrong-import-position
+    UploadProgress,
+    format_bytes,
+    resumable_copy,
+    verify_file,
+)
 from JamfUploaderBase import (  # pylint: disable=import-error, wrong-import-position
     JamfUploaderBase,
 )
@@ -51,87 +64,72 @@ from JamfUploaderBase import (  # pylint: disable=import-error, wrong-import-pos
 class JamfPackageUploaderBase(JamfUploaderBase):
     """Class for functions used to upload a package to Jamf"""
 
+    def get_pkg_digests(self, pkg_path, algorithms):
+        """calculate the requested digests of the package in a single pass.
+        algorithms are hashlib names: sha3_512, sha512, sha256, md5.
+        Results are cached, keyed by path, size, mtime and inode, so an unchanged
+        package is not hashed again on later runs."""
+        cache = JamfPackageDigestCache(
+            log_fn=lambda msg, verbose_level=2: self.output(
+                msg, verbose_level=verbose_level
+            ),
+        )
+        return cache.get_digests(pkg_path, algorithms)
+
     def sha512sum(self, filename):
-        """calculate the SHA512 hash of the package
-        (see https://stackoverflow.com/a/44873382)"""
-        h = hashlib.sha512()
-        b = bytearray(128 * 1024)
-        mv = memoryview(b)
-        with open(filename, "rb", buffering=0) as f:
-            for n in iter(lambda: f.readinto(mv), 0):
-                h.update(mv[:n])
-        return h.hexdigest()
+        """calculate the SHA512 hash of the package"""
+        return self.get_pkg_digests(filename, ["sha512"])["sha512"]
 
     def sha3sum(self, pkg_path):
         """calculate the SHA-3 512 hash of the package"""
-        h = hashlib.sha3_512()
-        b = bytearray(128 * 1024)
-        mv = memoryview(b)
-        with open(pkg_path, "rb", buffering=0) as f:
-            for n in iter(lambda: f.readinto(mv), 0):
-                h.update(mv[:n])
-        return h.hexdigest()
+        return self.get_pkg_digests(pkg_path, ["sha3_512"])["sha3_512"]
 
     def sha256sum(self, filename):
         """calculate the SHA256 hash of the package"""
-        h = hashlib.sha256()
-        b = bytearray(128 * 1024)
-        mv = memoryview(b)
-        with open(filename, "rb", buffering=0) as f:
-            for n in iter(lambda: f.readinto(mv), 0):
-                h.update(mv[:n])
-        return h.hexdigest()
+        return self.get_pkg_digests(filename, ["sha256"])["sha256"]
 
     def md5sum(self, filename):
         """calculate the MD5 hash of the package"""
-        h = hashlib.md5()
-        b = bytearray(128 * 1024)
-        mv = memoryview(b)
-        with open(filename, "rb", buffering=0) as f:
-            for n in iter(lambda: f.readinto(mv), 0):
-                h.update(mv[:n])
-        return h.hexdigest()
+        return self.get_pkg_digests(filename, ["md5"])["md5"]
 
-    def zip_pkg_path(self, bundle_path, recipe_cache_dir):
-        """Add files from path to a zip file handle.
+    def zip_pkg_path(self, bundle_path, recipe_cache_dir, algorithms=None):
+        """Zip a bundle-style package, streaming it straight from the source tree.
+
+        The archive contains the package folder itself (not just its contents).
+        An existing zip is reused only if the bundle's fingerprint (relative
+        paths, sizes and mtimes) matches the one recorded when it was built.
+        Any digests in algorithms are calculated while the zip is written and
+        stored in the digest cache.
 
         Args:
-            path (str): Path to folder to zip.
+            bundle_path (str): Path to the bundle to zip.
+            recipe_cache_dir (str): Unused, kept for compatibility.
+            algorithms (list): hashlib names of digests to calculate.
 
         Returns:
             (str) name of resulting zip file.
         """
-
+        # pylint: disable=unused-argument
         zip_name = f"{bundle_path}.zip"
 
-        if os.path.exists(zip_name):
-            self.output("Package object is a bundle. Zipped archive already exists.")
+        fingerprint = bundle_fingerprint(bundle_path)
+        if is_current(bundle_path, zip_name, fingerprint):
+            self.output(
+                "Package object is a bundle. Zipped archive already exists "
+                "and the bundle is unchanged."
+            )
             return zip_name
 
-        # we need to create a zip that contains the package (not just the contents of the package)
-        # to do this, me copy the package into it's own folder, and then zip that folder.
         self.output(
-            f"Package object is a bundle. Converting to zip, will be placed at {recipe_cache_dir}"
+            "Package object is a bundle. "
+            f"Converting to zip, will be placed at {zip_name}"
         )
-        pkg_basename = os.path.basename(bundle_path)
-        # make a subdirectory
-        pkg_dir = os.path.join(recipe_cache_dir, "temp", "pkg")
-        os.makedirs(pkg_dir, mode=0o777)
-        # copy the package into pkg_dir
-        shutil.copytree(bundle_path, os.path.join(pkg_dir, pkg_basename))
-        # now rename pkg_dir to the package name (I know, weird)
-        temp_dir = os.path.join(recipe_cache_dir, "temp", pkg_basename)
-        shutil.move(pkg_dir, temp_dir)
-        # now make the zip archive
-        zip_path = shutil.make_archive(
-            temp_dir,
-            "zip",
-            temp_dir,
-        )
-        # move it to the recipe_cache_dir
-        shutil.move(zip_path, zip_name)
-        # clean up
-        shutil.rmtree(os.path.join(recipe_cache_dir, "temp"))
+        digests = zip_bundle(bundle_path, zip_name, algorithms or [], fingerprint)
+        JamfPackageDigestCache(
+            log_fn=lambda msg, verbose_level=2: self.output(
+                msg, verbose_level=verbose_level
+            ),
+        ).put_digests(zip_name, digests)
 
         self.output(f"Zip file {zip_name} created.")
         return zip_name
@@ -161,17 +159,206 @@ class JamfPackageUploaderBase(JamfUploaderBase):
             )
             return None
 
-    def copy_pkg(self, mount_share, pkg_path, pkg_name):
-        """Copy package from AutoPkg Cache to local or mounted Distribution Point"""
-        if os.path.isfile(pkg_path):
-            dirname = f"/Volumes{urlparse(mount_share).path}"
-            destination_pkg_path = os.path.join(dirname, "Packages", pkg_name)
-            self.output(f"Copying {pkg_name} to {destination_pkg_path}")
-            copyfile(pkg_path, destination_pkg_path)
+    def report_upload_progress(self, event):
+        """Output a package transfer progress event. The event dict is shown in
+        full at verbose level 3; the summary line is shown at level 1 if
+        show_upload_progress is set, otherwise at level 2"""
+        self.output(event, verbose_level=3)
+        if event["event"] == "complete":
+            message = (
+                f"Transferred {format_bytes(event['total_bytes'])} of "
+                f"{event['label']} in {event['elapsed_seconds']}s "
+                f"({format_bytes(event['bytes_per_sec'])}/s)"
+            )
+        else:
+            eta = event["eta_seconds"]
+            message = (
+                f"{event['label']}: {event['percent']}% "
+                f"({format_bytes(event['bytes_sent'])} of "
+                f"{format_bytes(event['total_bytes'])}) at "
+                f"{format_bytes(event['bytes_per_sec'])}/s, "
+                f"ETA {'unknown' if eta is None else f'{eta}s'}"
+            )
+        self.output(
+            message, verbose_level=1 if self.env.get("show_upload_progress") else 2
+        )
+
+    def copy_pkg(self, mount_share, pkg_path, pkg_name, max_tries=5, digest=None):
+        """Copy package from AutoPkg Cache to local or mounted Distribution Point.
+        The copy is resumed from the last flushed offset if a write fails. If the
+        package's SHA3-512 digest is given, the copy is read back and checked
+        against it before it replaces any existing package.
+        Returns the transfer's "complete" progress event, plus the time spent
+        verifying the copy"""
+        dirname = f"/Volumes{urlparse(mount_share).path}"
+        destination_pkg_path = os.path.join(dirname, "Packages", pkg_name)
+        self.output(f"Copying {pkg_name} to {destination_pkg_path}")
+        size = os.path.getsize(pkg_path)
+        progress = UploadProgress(size, self.report_upload_progress, label=pkg_name)
+        result = {}
+
+        def verify(partial_path):
+            result.update(progress.event("complete"))
+            start = monotonic()
+            verify_file(partial_path, size, digest)
+            result["verify_seconds"] = round(monotonic() - start, 1)
+            self.output(
+                f"Verified copy at {destination_pkg_path} "
+                f"in {result['verify_seconds']}s",
+                verbose_level=2,
+            )
+
+        try:
+            resumable_copy(
+                pkg_path,
+                destination_pkg_path,
+                progress_fn=progress.update,
+                max_tries=max_tries,
+                log_fn=lambda msg, verbose_level=1: self.output(
+                    msg, verbose_level=verbose_level
+                ),
+                verify_fn=verify if digest else None,
+            )
+        except OSError as e:
+            raise ProcessorError(
+                f"ERROR: Package copy to {destination_pkg_path} failed: {e}"
+            ) from e
+        if not result:
+            result.update(progress.event("complete"))
+        self.report_upload_progress(result)
         if os.path.isfile(destination_pkg_path):
             self.output("Package copy successful")
         else:
             self.output("Package copy failed")
+        return result
+
+    def replicate_to_dp(
+        self, smb_share, pkg_path, pkg_name, replace, max_tries=5, digest=None
+    ):
+        """Mount a file share DP, copy the package to it unless it is already
+        there (or replace is set), and unmount it again.
+        Returns a dict describing the outcome for the replication summary"""
+        smb_url, smb_user, smb_password = smb_share[0], smb_share[1], smb_share[2]
+        self.output(f"Begin upload to File Share DP {smb_url}", verbose_level=1)
+        if "smb://" in smb_url:
+            # mount the share
+            self.mount_smb(smb_url, smb_user, smb_password)
+        try:
+            # check for existing package
+            local_pkg = self.check_local_pkg(smb_url, pkg_name)
+            if local_pkg and not replace:
+                self.output(
+                    (
+                        f"Not replacing existing {pkg_name} on {smb_url} as "
+                        "'replace_pkg' is set to False. Use replace_pkg='True' to "
+                        "enforce."
+                    ),
+                    verbose_level=1,
+                )
+                return {"dp": smb_url, "status": "skipped"}
+            if replace:
+                self.output(
+                    "Replacing existing package as 'replace_pkg' is set to True",
+                    verbose_level=1,
+                )
+            # copy the file
+            event = self.copy_pkg(
+                smb_url, pkg_path, pkg_name, max_tries=max_tries, digest=digest
+            )
+            return {
+                "dp": smb_url,
+                "status": "copied",
+                "bytes": event["total_bytes"],
+                "seconds": event["elapsed_seconds"],
+                "bytes_per_sec": event["bytes_per_sec"],
+                "verify_seconds": event.get("verify_seconds"),
+            }
+        finally:
+            if "smb://" in smb_url:
+                # unmount the share
+                self.umount_smb(smb_url)
+
+    def replicate_to_dps(
+        self, smb_shares, pkg_path, pkg_name, replace, max_tries=5, digest=None
+    ):
+        """Replicate the package to all file share DPs concurrently.
+
+        Shares are copied by up to dp_workers threads (1-16, default 4). Shares
+        that mount at the same /Volumes path are handled one after the other by
+        the same worker so that they never overwrite each other's mount. Every DP
+        is attempted even if another one fails; a ProcessorError listing the
+        failures is raised once all have finished.
+        Returns one result dict per share, in the order of smb_shares"""
+        try:
+            workers = int(self.env.get("dp_workers") or 4)
+            if workers < 1 or workers > 16:
+                raise ValueError
+        except (ValueError, TypeError):
+            workers = 4
+
+        # group the shares by mount point, keeping their order
+        lanes = {}
+        for index, smb_share in enumerate(smb_shares):
+            mount_point = f"/Volumes{urlparse(smb_share[0]).path}"
+            lanes.setdefault(mount_point, []).append((index, smb_share))
+
+        def run_lane(lane):
+            lane_results = []
+            for index, smb_share in lane:
+                try:
+                    result = self.replicate_to_dp(
+                        smb_share, pkg_path, pkg_name, replace, max_tries, digest
+                    )
+                except subprocess.CalledProcessError as e:
+                    # the mount command includes the password, so is not shown
+                    error = f"mount failed with exit status {e.returncode}"
+                    result = {"dp": smb_share[0], "status": "failed", "error": error}
+                except ProcessorError as e:
+                    result = {"dp": smb_share[0], "status": "failed", "error": str(e)}
+                lane_results.append((index, result))
+            return lane_results
+
+        workers = min(workers, len(lanes))
+        self.output(
+            f"Replicating {pkg_name} to {len(smb_shares)} File Share DPs "
+            f"using {workers} workers",
+            verbose_level=2,
+        )
+        results = [None] * len(smb_shares)
+        if workers == 1:
+            lane_results = [run_lane(lane) for lane in lanes.values()]
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                lane_results = list(executor.map(run_lane, lanes.values()))
+        for lane in lane_results:
+            for index, result in lane:
+                results[index] = result
+
+        for result in results:
+            self.output(
+                f"File Share DP {result['dp']}: {self.describe_replication(result)}",
+                verbose_level=1,
+            )
+        failed = [result["dp"] for result in results if result["status"] == "failed"]
+        if failed:
+            raise ProcessorError(
+                f"ERROR: Package copy failed for File Share DP(s): {', '.join(failed)}"
+            )
+        return results
+
+    def describe_replication(self, result):
+        """Return a one-line description of a replicate_to_dp result"""
+        if result["status"] == "copied":
+            description = (
+                f"copied {format_bytes(result['bytes'])} in {result['seconds']}s "
+                f"({format_bytes(result['bytes_per_sec'])}/s)"
+            )
+            if result.get("verify_seconds") is not None:
+                description += f", verified in {result['verify_seconds']}s"
+            return description
+        if result["status"] == "failed":
+            return f"failed ({result['error']})"
+        return "already present, not replaced"
 
     # End of functions for upload to Local Fileshare Distribution Points
     # ------------------------------------------------------------------------
@@ -190,25 +377,23 @@ class JamfPackageUploaderBase(JamfUploaderBase):
     ):
         """Upload a package to a Cloud Distribution Point using the v1/packages endpoint"""
 
-        # if pkg_name does not match the package name in pkg_path we copy the package locally first
-        pkg_dirname = os.path.dirname(pkg_path)
-        pkg_basename = os.path.basename(pkg_path)
-        tmp_pkg_path = ""
-        if pkg_basename != pkg_name:
-            tmp_pkg_path = os.path.join(pkg_dirname, pkg_name)
-            shutil.copyfile(pkg_path, tmp_pkg_path)
+        # if pkg_name does not match the package name in pkg_path, the file is sent
+        # under pkg_name directly from pkg_path rather than being copied first
+        form_filename = ""
+        if os.path.basename(pkg_path) != pkg_name:
+            form_filename = pkg_name
             self.output(
-                (
-                    f"Package name does not match path, so package copied from {pkg_path} to",
-                    f"{tmp_pkg_path}",
-                ),
+                f"Uploading {pkg_path} with the file name {pkg_name}",
                 verbose_level=2,
             )
-            pkg_path = tmp_pkg_path
 
         object_type = "package_v1"
         endpoint = self.api_endpoints(object_type, tenant_id=tenant_id)
         url = f"{api_url}/{endpoint}/{pkg_id}/upload"
+        # progress events are available when the native HTTP transport is used
+        progress = UploadProgress(
+            os.path.getsize(pkg_path), self.report_upload_progress, label=pkg_name
+        )
         count = 0
         while True:
             count += 1
@@ -218,50 +403,84 @@ class JamfPackageUploaderBase(JamfUploaderBase):
             )
 
             request = "POST"
-            r = self.curl(
-                api_type="jpapi",
-                request=request,
-                url=url,
-                token=token,
-                data=pkg_path,
-                endpoint_type="package_v1",
-            )
+            try:
+                r = self.curl(
+                    api_type="jpapi",
+                    request=request,
+                    url=url,
+                    token=token,
+                    data=pkg_path,
+                    endpoint_type="package_v1",
+                    progress_fn=progress.update,
+                    form_filename=form_filename,
+                )
+            except (ProcessorError, subprocess.CalledProcessError) as e:
+                # a dropped connection is worth retrying like an error response
+                self.output(f"Package upload attempt {count} failed: {e}")
+                r = None
 
             # check HTTP response
-            if self.status_check(r, "Package upload", pkg_name, request) == "break":
+            if (
+                r is not None
+                and self.status_check(r, "Package upload", pkg_name, request)
+                == "break"
+            ):
                 break
-            if count >= max_tries:
+            if not self.retry_wait(r, count, max_tries, sleep_time, url):
                 self.output(
-                    f"WARNING: Package upload did not succeed after {max_tries} attempts"
+                    f"WARNING: Package upload did not succeed after {count} attempts"
                 )
                 self.output(
-                    f"HTTP POST Response Code: {r.status_code}",
+                    "HTTP POST Response Code: "
+                    f"{r.status_code if r is not None else 'none'}",
                     verbose_level=1,
                 )
                 raise ProcessorError("ERROR: Package upload failed ")
-            if int(sleep_time) > 10:
-                sleep(int(sleep_time))
-            else:
-                sleep(10)
+        if progress.attempt:
+            progress.finish()
 
         self.output(f"HTTP response: {r.status_code}", verbose_level=1)
-
-        # delete temp package
-        if tmp_pkg_path:
-            self.output(
-                f"Removing temporary file {tmp_pkg_path}",
-                verbose_level=2,
-            )
-            try:
-                os.remove(tmp_pkg_path)
-            except OSError:
-                pass
         return r
 
     # End of function for uploading to v1/packages endpoint
     # ------------------------------------------------------------------------
     # Beginning of function for uploading to AWS CDP (not needed for 11.5+)
 
+    def link_pkg(self, pkg_path, pkg_name):
+        """Make the package available as pkg_name in the same folder as pkg_path,
+        without copying its data where possible: a hard link is tried first, then
+        an APFS clone, and only then a full copy. Returns the path of the new file,
+        which the caller should remove, or an empty string if pkg_path already has
+        that name"""
+        if os.path.basename(pkg_path) == pkg_name:
+            return ""
+        link_path = os.path.join(os.path.dirname(pkg_path), pkg_name)
+        if os.path.exists(link_path) and os.path.samefile(pkg_path, link_path):
+            return ""
+        tmp_link_path = os.path.join(
+            os.path.dirname(pkg_path), f".{pkg_name}.{os.getpid()}.tmp"
+        )
+        try:
+            os.link(pkg_path, tmp_link_path)
+            method = "hard link"
+        except OSError:
+            try:
+                # cp -c uses clonefile(2), which is instant on APFS
+                subprocess.run(
+                    ["/bin/cp", "-c", pkg_path, tmp_link_path],
+                    check=True,
+                    capture_output=True,
+                )
+                method = "clone"
+            except (OSError, subprocess.CalledProcessError):
+                shutil.copyfile(pkg_path, tmp_link_path)
+                method = "copy"
+        os.replace(tmp_link_path, link_path)
+        self.output(
+            f"Package made available as {link_path} ({method})", verbose_level=2
+        )
+        return link_path
+
     def upload_to_aws_s3_bucket(self, pkg_path, pkg_name):
         """upload the package to an AWS CDP
         Note that this requires the installation of the aws-cli tools on your AutoPkg machine
@@ -271,6 +490,9 @@ class JamfPackageUploaderBase(JamfUploaderBase):
         You must also specify the bucket name to the environment ('S3_BUCKET_NAME').
         """
 
+        # aws s3 sync selects the file by name, so it must exist under pkg_name
+        link_path = self.link_pkg(pkg_path, pkg_name)
+
         aws_cmd = [
             "/usr/local/bin/aws",
             "s3",
@@ -289,13 +511,19 @@ class JamfPackageUploaderBase(JamfUploaderBase):
             aws_output = subprocess.check_output(aws_cmd)
         except subprocess.CalledProcessError as exc:
             raise ProcessorError(f"Error from aws: {exc}") from exc
+        finally:
+            if link_path:
+                try:
+                    os.remove(link_path)
+                except OSError:
+                    pass
 
         # if os.path.exists(output_file) and os.path.getsize(output_file) > 0:
         #     with open(output_file, "rb") as file:
         #         aws_output = file.read()
 
-        self.output(
-            "AWS response: " + aws_output.decode("ascii"),
+        self.log(
+            lambda: "AWS response: " + aws_output.decode("ascii"),
             verbose_level=2,
         )
 
@@ -324,6 +552,124 @@ class JamfPackageUploaderBase(JamfUploaderBase):
         else:
             return "-1"
 
+    def check_pkg_hash_match(
+        self, api_url, pkg_id, pkg_name, pkg_path, token, tenant_id=""
+    ):
+        """compare the hashes on an existing package_v1 record with the local package.
+        Returns a reason string if the record already describes the same file, so the
+        upload can be skipped, or an empty string if the package must be uploaded"""
+        try:
+            record = self.get_api_object_value_from_id(
+                api_url,
+                object_type="package_v1",
+                object_id=pkg_id,
+                object_path="",
+                token=token,
+                tenant_id=tenant_id,
+            )
+        except ProcessorError:
+            self.output("Could not read existing package record", verbose_level=2)
+            return ""
+        if not isinstance(record, dict) or record.get("fileName") != pkg_name:
+            return ""
+
+        # collect every hash the record holds, by hashlib algorithm name
+        hash_type_algorithms = {
+            "MD5": "md5",
+            "SHA_256": "sha256",
+            "SHA256": "sha256",
+            "SHA_512": "sha512",
+            "SHA512": "sha512",
+            "SHA3_512": "sha3_512",
+        }
+        server_hashes = {}
+        hash_type = str(record.get("hashType") or "").upper()
+        if hash_type in hash_type_algorithms and record.get("hashValue"):
+            server_hashes[hash_type_algorithms[hash_type]] = record["hashValue"]
+        for field, algorithm in (
+            ("md5", "md5"),
+            ("sha256", "sha256"),
+            ("sha3512", "sha3_512"),
+        ):
+            if record.get(field):
+                server_hashes.setdefault(algorithm, record[field])
+        if not server_hashes:
+            self.output("Existing package record has no hash", verbose_level=2)
+            return ""
+
+        local_hashes = self.get_pkg_digests(pkg_path, list(server_hashes))
+        for algorithm, server_hash in server_hashes.items():
+            self.output(
+                f"{algorithm}: server {server_hash} local {local_hashes[algorithm]}",
+                verbose_level=3,
+            )
+            if str(server_hash).lower() != local_hashes[algorithm].lower():
+                return ""
+
+        # the record's hashes are written before the file is uploaded, so they
+        # only count if the file itself is confirmed on the distribution point
+        if not self.check_pkg_on_cloud_dp(
+            api_url, pkg_name, pkg_path, token, tenant_id
+        ):
+            self.output(
+                "Existing package record matches, but the file could not be "
+                "confirmed on the Cloud Distribution Point",
+                verbose_level=2,
+            )
+            return ""
+        return (
+            "package on server matches local file "
+            f"({', '.join(sorted(server_hashes))})"
+        )
+
+    def check_pkg_on_cloud_dp(self, api_url, pkg_name, pkg_path, token, tenant_id=""):
+        """check that the file on the Cloud Distribution Point matches the local
+        package, using the JCDS file list. Returns False if it cannot be confirmed,
+        e.g. because the Cloud DP is not JCDS"""
+        endpoint = self.api_endpoints("jcds", tenant_id=tenant_id)
+        url = f"{api_url}/{endpoint}/files"
+        try:
+            r = self.curl(api_type="jpapi", request="GET", url=url, token=token)
+        except ProcessorError:
+            return False
+        if r.status_code != 200 or not isinstance(r.output, list):
+            self.output(
+                f"Cloud Distribution Point file list not available ({r.status_code})",
+                verbose_level=2,
+            )
+            return False
+        dp_file = next(
+            (
+                item
+                for item in r.output
+                if isinstance(item, dict) and item.get("fileName") == pkg_name
+            ),
+            None,
+        )
+        if not dp_file:
+            self.output(f"{pkg_name} not found on Cloud DP", verbose_level=2)
+            return False
+        try:
+            if int(dp_file.get("length")) != os.path.getsize(pkg_path):
+                self.output(f"{pkg_name} size differs on Cloud DP", verbose_level=2)
+                return False
+        except (TypeError, ValueError):
+            return False
+        dp_hashes = {
+            algorithm: dp_file[field]
+            for field, algorithm in (("md5", "md5"), ("sha3", "sha3_512"))
+            if dp_file.get(field)
+        }
+        if dp_hashes:
+            local_hashes = self.get_pkg_digests(pkg_path, list(dp_hashes))
+            for algorithm, dp_hash in dp_hashes.items():
+                if str(dp_hash).lower() != local_hashes[algorithm].lower():
+                    self.output(
+                        f"{pkg_name} {algorithm} differs on Cloud DP", verbose_level=2
+                    )
+                    return False
+        return True
+
     def get_category_id(self, api_url, category_name, token="", tenant_id=""):
         """Get the category ID from the name, or abort if ID not found"""
         # check for existing category
@@ -428,16 +774,12 @@ class JamfPackageUploaderBase(JamfUploaderBase):
             # check HTTP response
             if self.status_check(r, "Package Metadata", pkg_name, request) == "break":
                 break
-            if count >= max_tries:
+            if not self.retry_wait(r, count, max_tries, sleep_time, url):
                 self.output(
-                    f"Package metadata upload did not succeed after {max_tries} attempts"
+                    f"Package metadata upload did not succeed after {count} attempts"
                 )
                 self.output(f"\nHTTP POST Response Code: {r.status_code}")
                 raise ProcessorError("ERROR: Package metadata upload failed ")
-            if int(sleep_time) > 10:
-                sleep(int(sleep_time))
-            else:
-                sleep(10)
         if r.status_code == 201:
             obj = json.loads(json.dumps(r.output))
             self.output(
@@ -541,6 +883,7 @@ class JamfPackageUploaderBase(JamfUploaderBase):
         recipe_cache_dir = self.env.get("RECIPE_CACHE_DIR")
         pkg_uploaded = False
         pkg_metadata_updated = False
+        skip_reason = ""
         max_tries = self.env.get("max_tries")
         skip_if = self.env.get("skip_if")
 
@@ -678,8 +1021,10 @@ class JamfPackageUploaderBase(JamfUploaderBase):
         # If so, zip_pkg_path will look for an existing .zip
         # If that doesn't exist, it will create the zip and return the pkg_path with .zip added
         # In that case, we need to add .zip to the pkg_name key too, if we don't already have it
+        # The digests the upload needs are calculated while a bundle is zipped
+        algorithms = ["sha3_512", "md5"] if use_md5 else ["sha3_512"]
         if os.path.isdir(pkg_path):
-            pkg_path = self.zip_pkg_path(pkg_path, recipe_cache_dir)
+            pkg_path = self.zip_pkg_path(pkg_path, recipe_cache_dir, algorithms)
             if ".zip" not in pkg_name:
                 pkg_name += ".zip"
 
@@ -688,14 +1033,11 @@ class JamfPackageUploaderBase(JamfUploaderBase):
         if not pkg_display_name:
             pkg_display_name = pkg_name
 
-        # calculate the SHA-3-512 hash of the package
-        sha3string = self.sha3sum(pkg_path)
-
-        # calculate the SHA-256 hash of the package
-        # sha256string = self.sha256sum(pkg_path)
-
-        # calculate the MD5 hash of the package
-        md5string = self.md5sum(pkg_path) if use_md5 else None
+        # calculate the SHA-3-512 hash, and the MD5 hash if required, of the package
+        # in a single pass
+        digests = self.get_pkg_digests(pkg_path, algorithms)
+        sha3string = digests["sha3_512"]
+        md5string = digests.get("md5")
 
         # now start the process of uploading the package
         self.output(f"Checking for existing package '{pkg_name}' on {jamf_url}")
@@ -779,53 +1121,48 @@ class JamfPackageUploaderBase(JamfUploaderBase):
         self.output(
             "Number of File Share DPs: " + str(len(smb_shares)), verbose_level=2
         )
-        for smb_share in smb_shares:
-            smb_url, smb_user, smb_password = smb_share[0], smb_share[1], smb_share[2]
-            self.output(f"Begin upload to File Share DP {smb_url}", verbose_level=1)
-            if "smb://" in smb_url:
-                # mount the share
-                self.mount_smb(smb_url, smb_user, smb_password)
-            # check for existing package
-            local_pkg = self.check_local_pkg(smb_url, pkg_name)
-            if not local_pkg or replace:
-                if replace:
-                    self.output(
-                        "Replacing existing package as 'replace_pkg' is set to True",
-                        verbose_level=1,
-                    )
-                # copy the file
-                self.copy_pkg(smb_url, pkg_path, pkg_name)
-                if "smb://" in smb_url:
-                    # unmount the share
-                    self.umount_smb(smb_url)
-                # Don't set this property if
-                # 1. We need to upload to the cloud (cloud_dp == True)
-                # 2. We have more SMB shares to process
-                if not cloud_dp and (len(smb_shares) - 1) == smb_shares.index(
-                    smb_share
-                ):
-                    pkg_uploaded = True
-            else:
-                self.output(
-                    (
-                        f"Not replacing existing {pkg_name} as 'replace_pkg' is set to "
-                        "False. Use replace_pkg='True' to enforce."
-                    ),
-                    verbose_level=1,
-                )
-                if "smb://" in smb_url:
-                    # unmount the share
-                    self.umount_smb(smb_url)
-                if smb_shares and not replace_metadata:
-                    # even if we don't upload a package, we still need to pass it on so that a
-                    # subsequent processor can use it
-                    self.env["pkg_name"] = pkg_name
-                    pkg_uploaded = False
+        dp_results = []
+        if smb_shares:
+            dp_results = self.replicate_to_dps(
+                smb_shares,
+                pkg_path,
+                pkg_name,
+                replace,
+                max_tries=max_tries,
+                digest=sha3string,
+            )
+            # Don't set this property if we need to upload to the cloud
+            # (cloud_dp == True)
+            if not cloud_dp and dp_results[-1]["status"] == "copied":
+                pkg_uploaded = True
+            elif not replace_metadata:
+                # even if we don't upload a package, we still need to pass it on so
+                # that a subsequent processor can use it
+                self.env["pkg_name"] = pkg_name
 
         # otherwise process for cloud DP
         if cloud_dp or not smb_shares:
             self.output("Handling Cloud Distribution Point", verbose_level=2)
-            if not pkg_id or replace:
+            # if the existing package record already has the same hash as the local
+            # package, there is no need to upload it again
+            if pkg_id and replace and not aws_cdp_mode:
+                skip_reason = self.check_pkg_hash_match(
+                    api_url,
+                    pkg_id,
+                    pkg_name,
+                    pkg_path,
+                    token,
+                    tenant_id=jamf_platform_gw_tenant_id,
+                )
+                if skip_reason:
+                    self.output(
+                        f"Not uploading {pkg_name}: {skip_reason}. "
+                        "Only the metadata will be updated.",
+                        verbose_level=1,
+                    )
+            if skip_reason:
+                pkg_uploaded = False
+            elif not pkg_id or replace:
                 if replace:
                     self.output(
                         "Replacing existing package as 'replace_pkg' is set to True",
@@ -927,7 +1264,12 @@ class JamfPackageUploaderBase(JamfUploaderBase):
 
         # upload package if the metadata was updated - has to be done last with v1/packages
         # (already done with smb_shares or aws_cdp_mode)
-        if not aws_cdp_mode and (not smb_shares or cloud_dp) and pkg_metadata_updated:
+        if (
+            not aws_cdp_mode
+            and (not smb_shares or cloud_dp)
+            and pkg_metadata_updated
+            and not skip_reason
+        ):
             self.output(f"ID: {object_id}", verbose_level=3)  # TEMP
             if object_id != "-1":
                 self.output(f"Package '{pkg_name}' metadata exists: ID {object_id}")
@@ -957,9 +1299,11 @@ class JamfPackageUploaderBase(JamfUploaderBase):
         # recalculate packages on JCDS if the metadata was updated
         # if recalculate is set, we'll do a global refresh, otherwise we'll just refresh the package that was updated
         # Jamf Pro 11.10+ only
+        # (not needed if only the metadata of an unchanged package was updated)
         if (
             APLooseVersion(jamf_pro_version) >= APLooseVersion("11.10")
             and pkg_metadata_updated
+            and (not skip_reason or recalculate)
         ):
             # check token again using oauth or basic auth depending on the credentials given
             # as package upload may have taken some time
@@ -1015,6 +1359,8 @@ class JamfPackageUploaderBase(JamfUploaderBase):
                     "pkg_path",
                     "version",
                     "packages_recalculated",
+                    "upload_skipped_reason",
+                    "file_share_dps",
                 ],
                 "data": {
                     "category": pkg_category,
@@ -1024,6 +1370,11 @@ class JamfPackageUploaderBase(JamfUploaderBase):
                     "pkg_path": pkg_path,
                     "version": version,
                     "packages_recalculated": str(packages_recalculated),
+                    "upload_skipped_reason": skip_reason,
+                    "file_share_dps": "; ".join(
+                        f"{result['dp']}: {self.describe_replication(result)}"
+                        for result in dp_results
+                    ),
                 },
             }
         self.env["process_skipped"] = process_skipped
@@ -93,8 +93,9 @@ class JamfPatchCheckerBase(JamfUploaderBase):
                 # Inject package element into version element
                 v.append(pkg_element)
                 # Print new version element for debugging reasons
-                self.output(
-                    ET.tostring(v, encoding="unicode", method="xml"), verbose_level=3
+                self.log(
+                    lambda: ET.tostring(v, encoding="unicode", method="xml"),
+                    verbose_level=3,
                 )
                 self.env["patch_version_found"] = patch_version_found
 
@@ -49,8 +49,7 @@ class JamfPatchUploaderBase(JamfUploaderBase):
         Prepares the patch template. Mostly copied from the policy processor.
         """
         if os.path.exists(patch_template):
-            with open(patch_template, "r", encoding="utf-8") as file:
-                template_contents = file.read()
+            template_contents = self.read_template(patch_template)
         else:
             raise ProcessorError("Patch template does not exist!")
 
@@ -61,7 +60,7 @@ class JamfPatchUploaderBase(JamfUploaderBase):
         )
 
         self.output("Patch data:", verbose_level=2)
-        self.output(template_contents, verbose_level=2)
+        self.log(template_contents, verbose_level=2)
 
         # write the template to temp file
         template_xml = self.write_temp_file(api_url, template_contents)
@@ -147,8 +146,9 @@ class JamfPatchUploaderBase(JamfUploaderBase):
                 # Inject package element into version element
                 v.append(pkg_element)
                 # Print new version element for debugging reasons
-                self.output(
-                    ET.tostring(v, encoding="UTF-8", method="xml"), verbose_level=3
+                self.log(
+                    lambda: ET.tostring(v, encoding="UTF-8", method="xml"),
+                    verbose_level=3,
                 )
 
         if not version_found:
@@ -192,16 +192,12 @@ class JamfPatchUploaderBase(JamfUploaderBase):
                 == "break"
             ):
                 break
-            if count >= max_tries:
+            if not self.retry_wait(r, count, max_tries, sleep_time, url):
                 self.output(
                     "ERROR: Uploading updated Patch Software Title did not succeed after "
-                    f"{max_tries} attempts."
+                    f"{count} attempts."
                 )
                 raise ProcessorError("ERROR: Patch Software Title upload failed.")
-            if int(sleep_time) > 10:
-                sleep(int(sleep_time))
-            else:
-                sleep(10)
 
     def upload_patch(
         self,
@@ -243,16 +239,12 @@ class JamfPatchUploaderBase(JamfUploaderBase):
             # check HTTP response
             if self.status_check(r, "Patch", object_name, request) == "break":
                 break
-            if count >= max_tries:
+            if not self.retry_wait(r, count, max_tries, sleep_time, url):
                 self.output(
-                    f"WARNING: Patch policy upload did not succeed after {max_tries} attempts"
+                    f"WARNING: Patch policy upload did not succeed after {count} attempts"
                 )
                 self.output(f"\nHTTP POST Response Code: {r.status_code}")
                 raise ProcessorError("ERROR: Policy upload failed.")
-            if int(sleep_time) > 10:
-                sleep(int(sleep_time))
-            else:
-                sleep(10)
         return r
 
     def execute(self):
@@ -27,7 +27,6 @@ import json
 import os.path
 import sys
 
-from time import sleep
 from urllib.parse import quote
 
 from autopkglib import ProcessorError, APLooseVersion  # pylint: disable=import-error
@@ -159,16 +158,12 @@ class JamfPkgMetadataUploaderBase(JamfUploaderBase):
             # check HTTP response
             if self.status_check(r, "Package Metadata", pkg_name, request) == "break":
                 break
-            if count >= max_tries:
+            if not self.retry_wait(r, count, max_tries, sleep_time, url):
                 self.output(
-                    f"Package metadata upload did not succeed after {max_tries} attempts"
+                    f"Package metadata upload did not succeed after {count} attempts"
                 )
                 self.output(f"\nHTTP POST Response Code: {r.status_code}")
                 raise ProcessorError("ERROR: Package metadata upload failed ")
-            if int(sleep_time) > 10:
-                sleep(int(sleep_time))
-            else:
-                sleep(10)
         if r.status_code == 201:
             obj = json.loads(json.dumps(r.output))
             self.output(
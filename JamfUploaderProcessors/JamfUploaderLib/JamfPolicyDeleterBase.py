@@ -20,7 +20,6 @@ limitations under the License.
 import os.path
 import sys
 
-from time import sleep
 
 from autopkglib import (  # pylint: disable=import-error
     ProcessorError,
@@ -58,13 +57,12 @@ class JamfPolicyDeleterBase(JamfUploaderBase):
             # check HTTP response
             if self.status_check(r, "Policy", object_id, request) == "break":
                 break
-            if count >= max_tries:
+            if not self.retry_wait(r, count, max_tries, url=url):
                 self.output(
-                    f"WARNING: Policy deletion did not succeed after {max_tries} attempts"
+                    f"WARNING: Policy deletion did not succeed after {count} attempts"
                 )
                 self.output(f"\nHTTP POST Response Code: {r.status_code}")
                 raise ProcessorError("ERROR: Policy deletion failed ")
-            sleep(10)
         return r
 
     def execute(self):
@@ -20,7 +20,6 @@ limitations under the License.
 import os.path
 import sys
 
-from time import sleep
 from urllib.parse import quote
 
 from autopkglib import (  # pylint: disable=import-error
@@ -67,16 +66,12 @@ class JamfPolicyLogFlusherBase(JamfUploaderBase):
             # check HTTP response
             if self.status_check(r, "Log Flush Request", object_id, request) == "break":
                 break
-            if count >= max_tries:
+            if not self.retry_wait(r, count, max_tries, sleep_time, url):
                 self.output(
-                    f"WARNING: Log Flush Request did not succeed after {max_tries} attempts"
+                    f"WARNING: Log Flush Request did not succeed after {count} attempts"
                 )
                 self.output(f"\nHTTP POST Response Code: {r.status_code}")
                 raise ProcessorError("ERROR: Log Flush Request failed")
-            if int(sleep_time) > 10:
-                sleep(int(sleep_time))
-            else:
-                sleep(10)
         return r
 
     def execute(self):
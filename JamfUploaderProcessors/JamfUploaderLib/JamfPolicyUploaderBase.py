@@ -21,7 +21,6 @@ import os.path
 import sys
 import xml.etree.ElementTree as ElementTree
 
-from time import sleep
 
 from autopkglib import (  # pylint: disable=import-error
     ProcessorError,
@@ -52,8 +51,7 @@ class JamfPolicyUploaderBase(JamfUploaderBase):
         """prepare the policy contents"""
         # import template from file and replace any keys in the template
         if os.path.exists(policy_template):
-            with open(policy_template, "r", encoding="utf-8") as file:
-                template_contents = file.read()
+            template_contents = self.read_template(policy_template)
         else:
             raise ProcessorError("Template does not exist!")
 
@@ -73,7 +71,7 @@ class JamfPolicyUploaderBase(JamfUploaderBase):
             template_contents = self.replace_scope(template_contents, existing_scope)
 
         self.output("Policy data:", verbose_level=3)
-        self.output(template_contents, verbose_level=3)
+        self.log(template_contents, verbose_level=3)
 
         # write the template to temp file
         template_xml = self.write_temp_file(api_url, template_contents)
@@ -114,16 +112,12 @@ class JamfPolicyUploaderBase(JamfUploaderBase):
             # check HTTP response
             if self.status_check(r, "Policy", object_name, request) == "break":
                 break
-            if count >= max_tries:
+            if not self.retry_wait(r, count, max_tries, sleep_time, url):
                 self.output(
-                    f"WARNING: Policy upload did not succeed after {max_tries} attempts"
+                    f"WARNING: Policy upload did not succeed after {count} attempts"
                 )
                 self.output(f"\nHTTP POST Response Code: {r.status_code}")
                 raise ProcessorError("ERROR: Policy upload failed ")
-            if int(sleep_time) > 10:
-                sleep(int(sleep_time))
-            else:
-                sleep(10)
         return r
 
     def upload_policy_icon(
@@ -199,16 +193,12 @@ class JamfPolicyUploaderBase(JamfUploaderBase):
                 # check HTTP response
                 if self.status_check(r, "Icon", policy_icon_name, request) == "break":
                     break
-                if count >= max_tries:
+                if not self.retry_wait(r, count, max_tries, sleep_time, url):
                     print(
-                        f"WARNING: Icon upload did not succeed after {max_tries} attempts"
+                        f"WARNING: Icon upload did not succeed after {count} attempts"
                     )
                     print(f"\nHTTP POST Response Code: {r.status_code}")
                     raise ProcessorError("ERROR: Icon upload failed")
-                if int(sleep_time) > 10:
-                    sleep(int(sleep_time))
-                else:
-                    sleep(10)
         else:
             self.output("Not replacing icon. Set replace_icon='True' to enforce...")
         return policy_icon_name
@@ -249,6 +239,8 @@ class JamfPolicyUploaderBase(JamfUploaderBase):
             del self.env["jamfpolicyuploader_summary_result"]
         if "dry_run_summary_result" in self.env:
             del self.env["dry_run_summary_result"]
+        if "jamfpolicyuploader_unchanged_summary_result" in self.env:
+            del self.env["jamfpolicyuploader_unchanged_summary_result"]
 
         process_skipped = False
 
@@ -346,26 +338,40 @@ class JamfPolicyUploaderBase(JamfUploaderBase):
             self.env["process_skipped"] = process_skipped
             return
 
-        # upload the policy
-        r = self.upload_policy(
+        # skip the upload if the existing policy already matches the template
+        if object_id and self.object_is_unchanged(
             api_url,
-            object_name=policy_name,
-            object_template=template_xml,
-            sleep_time=sleep_time,
+            "policy",
+            object_id,
+            self.read_template(template_xml),
             token=token,
-            max_tries=max_tries,
-            object_id=object_id,
             tenant_id=jamf_platform_gw_tenant_id,
-        )
-        policy_updated = True
+        ):
+            self.unchanged_summary(
+                "jamfpolicyuploader_unchanged_summary_result", "policy", policy_name
+            )
+            self.env["changed_policy_id"] = str(object_id)
+        else:
+            # upload the policy
+            r = self.upload_policy(
+                api_url,
+                object_name=policy_name,
+                object_template=template_xml,
+                sleep_time=sleep_time,
+                token=token,
+                max_tries=max_tries,
+                object_id=object_id,
+                tenant_id=jamf_platform_gw_tenant_id,
+            )
+            policy_updated = True
 
-        # Set the changed_policy_id to the returned output's ID if and only
-        # if it can be determined
-        try:
-            changed_policy_id = ElementTree.fromstring(r.output).findtext("id")
-            self.env["changed_policy_id"] = str(changed_policy_id)
-        except UnboundLocalError:
-            self.env["changed_policy_id"] = "UNKNOWN_POLICY_ID"
+            # Set the changed_policy_id to the returned output's ID if and only
+            # if it can be determined
+            try:
+                changed_policy_id = ElementTree.fromstring(r.output).findtext("id")
+                self.env["changed_policy_id"] = str(changed_policy_id)
+            except UnboundLocalError:
+                self.env["changed_policy_id"] = "UNKNOWN_POLICY_ID"
 
         # now upload the icon to the policy if specified in the args
         policy_icon_name = ""
@@ -378,9 +384,13 @@ class JamfPolicyUploaderBase(JamfUploaderBase):
                 else:
                     raise ProcessorError(f"ERROR: Policy icon file {icon} not found")
 
-            # get the policy_id returned from the HTTP response
+            # get the policy_id returned from the HTTP response, or the existing
+            # policy's ID if it was not re-uploaded
             try:
-                policy_id = ElementTree.fromstring(r.output).findtext("id")
+                if policy_updated:
+                    policy_id = ElementTree.fromstring(r.output).findtext("id")
+                else:
+                    policy_id = object_id
                 policy_icon_name = self.upload_policy_icon(
                     api_url,
                     object_name=policy_name,
@@ -0,0 +1,227 @@
+#!/usr/local/autopkg/python
+# pylint: disable=invalid-name
+
+"""
+JamfRetry — retry policy, per-host circuit breaker and retry metrics.
+
+RetryPolicy decides whether a failed request is worth retrying from its HTTP
+status, and how long to wait first: exponential back-off with jitter, or the
+server's Retry-After if it sent one. CircuitBreaker counts consecutive
+failures per host; once a host has failed too often in a row, retries against
+it stop until a cool-down has passed, so a host that is down is not hammered
+by every processor in the run. RetryMetrics counts requests, failures,
+retries and time slept per host.
+
+The breaker and metrics are shared by all processors in an AutoPkg run.
+
+Copyright 2026 Graham Pugh
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import threading
+import time
+
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+from JamfUploadEngine import backoff_delay  # pylint: disable=import-error
+
+# Statuses that may succeed if the same request is sent again. 409 is included
+# because Jamf Pro answers 409 when a write collides with another one.
+# A missing status (0 or None) means that no response was received.
+RETRYABLE_STATUSES = frozenset((408, 409, 423, 425, 429, 500, 502, 503, 504))
+
+# Statuses that count against a host's circuit breaker
+HOST_FAILURE_STATUSES = frozenset((429, 500, 502, 503, 504))
+
+# Delay before the first retry; it doubles with each retry up to RETRY_MAX_DELAY
+RETRY_BASE_DELAY = 2.0
+RETRY_MAX_DELAY = 60.0
+
+# Longest Retry-After that is honoured
+RETRY_AFTER_MAX = 300.0
+
+# Consecutive failures that open a host's circuit, and how long it stays open
+CIRCUIT_THRESHOLD = 5
+CIRCUIT_COOLDOWN = 30.0
+
+
+def host_of(url):
+    """Return the host part of a URL, as used to key the breaker and metrics."""
+    return urlparse(url or "").netloc.lower()
+
+
+def parse_retry_after(value, now=None):
+    """Return the delay in seconds given by a Retry-After value, or None.
+
+    Both forms are accepted: a number of seconds, or an HTTP date.
+    """
+    value = (value or "").strip()
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when is None:
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    now = now or datetime.now(timezone.utc)
+    return max(0.0, (when - now).total_seconds())
+
+
+class RetryPolicy:
+    """Which failures to retry, and how long to wait before each retry.
+
+    Args:
+        base_delay: Delay before the first retry.
+        max_delay:  Longest back-off delay.
+        retryable:  HTTP statuses that are retried.
+    """
+
+    def __init__(
+        self,
+        base_delay=RETRY_BASE_DELAY,
+        max_delay=RETRY_MAX_DELAY,
+        retryable=RETRYABLE_STATUSES,
+    ):
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retryable = retryable
+
+    def is_retryable(self, status_code):
+        """Return True if a request that ended with status_code may be retried."""
+        return not status_code or int(status_code) in self.retryable
+
+    def delay(self, attempt, retry_after=None, minimum=0.0):
+        """Return the seconds to wait after failed attempt number attempt.
+
+        A Retry-After from the server takes precedence over the back-off
+        schedule. The result is never below minimum.
+        """
+        if retry_after is not None:
+            delay = min(retry_after, RETRY_AFTER_MAX)
+        else:
+            delay = backoff_delay(attempt, base=self.base_delay, cap=self.max_delay)
+        return max(delay, minimum)
+
+
+class CircuitBreaker:
+    """Per-host count of consecutive failures.
+
+    Args:
+        threshold: Consecutive failures after which the circuit opens.
+        cooldown:  Seconds the circuit stays open.
+
+    While a host's circuit is open, retries to it should stop. Once the
+    cool-down has passed the next request is let through as a probe: success
+    closes the circuit, and another failure opens it again straight away.
+    """
+
+    def __init__(self, threshold=CIRCUIT_THRESHOLD, cooldown=CIRCUIT_COOLDOWN):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self._failures = {}
+        self._opened = {}
+        self._lock = threading.Lock()
+
+    def record(self, host, failed):
+        """Record the outcome of a request. Returns True if the circuit opened."""
+        with self._lock:
+            if not failed:
+                self._failures.pop(host, None)
+                self._opened.pop(host, None)
+                return False
+            failures = self._failures.get(host, 0) + 1
+            self._failures[host] = failures
+            if failures >= self.threshold and not self._is_open(host):
+                self._opened[host] = time.monotonic()
+                return True
+            return False
+
+    def is_open(self, host):
+        """Return True if retries to host should stop for now."""
+        with self._lock:
+            return self._is_open(host)
+
+    def remaining(self, host):
+        """Return the seconds until host's circuit closes, or 0."""
+        with self._lock:
+            opened = self._opened.get(host)
+            if opened is None:
+                return 0.0
+            return max(0.0, opened + self.cooldown - time.monotonic())
+
+    def _is_open(self, host):
+        opened = self._opened.get(host)
+        return opened is not None and time.monotonic() - opened < self.cooldown
+
+
+class RetryMetrics:
+    """Per-host counts of requests, failed requests, retries and time slept."""
+
+    FIELDS = ("requests", "failures", "retries", "slept")
+
+    def __init__(self):
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def _add(self, host, **counts):
+        with self._lock:
+            entry = self._hosts.setdefault(host, dict.fromkeys(self.FIELDS, 0))
+            for name, value in counts.items():
+                entry[name] += value
+
+    def record_request(self, host, failed):
+        """Count a request, and whether it failed with a retryable status."""
+        self._add(host, requests=1, failures=int(bool(failed)))
+
+    def record_retry(self, host, delay):
+        """Count a retry and the seconds slept before it."""
+        self._add(host, retries=1, slept=delay)
+
+    def snapshot(self, host=None):
+        """Return the counts for one host, or {host: counts} for all hosts."""
+        with self._lock:
+            if host is not None:
+                return dict(self._hosts.get(host, dict.fromkeys(self.FIELDS, 0)))
+            return {name: dict(entry) for name, entry in self._hosts.items()}
+
+    def summary(self, host):
+        """Return the counts for a host as a short line of text."""
+        counts = self.snapshot(host)
+        return (
+            f"{host}: {counts['requests']} requests, {counts['failures']} failed, "
+            f"{counts['retries']} retries, {counts['slept']:.1f}s waiting"
+        )
+
+
+_shared_breaker = CircuitBreaker()
+_shared_metrics = RetryMetrics()
+
+
+def shared_circuit_breaker():
+    """Return the circuit breaker shared by all processors in this run."""
+    return _shared_breaker
+
+
+def shared_retry_metrics():
+    """Return the retry metrics shared by all processors in this run."""
+    return _shared_metrics
@@ -23,9 +23,12 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
+import hashlib
 import json
 import os
 import re
+import tempfile
+import threading
 import time
 
 try:
@@ -200,9 +203,46 @@ JPAPI_KEY_OVERRIDES = {
     },
 }
 
-# Cache TTL in seconds (24 hours)
+# Cache TTL in seconds (24 hours). Cached schemas are revalidated after this
+# long unless the server's Jamf Pro version is known.
 SCHEMA_CACHE_TTL = 86400
 
+# While the server reports the same Jamf Pro version as the cached schema,
+# the schema is only revalidated after this long (7 days)
+SCHEMA_MAX_AGE = 604800
+
+# A background refresh lock older than this (seconds) is assumed abandoned
+SCHEMA_REFRESH_TIMEOUT = 600
+
+# Schema kind → (URL path, cache file name, parser method)
+SCHEMA_SOURCES = {
+    "jpapi": ("api/schema", "jpapi_schema.json", "_parse_jpapi_schema"),
+    "classic": (
+        "classicapi/doc/swagger.yaml",
+        "classic_schema.yaml",
+        "_parse_classic_schema",
+    ),
+}
+
+# Bump when the parsed resource format changes, so older indexes are rebuilt
+SCHEMA_INDEX_FORMAT = 1
+
+# Records which compiled index belongs to each cached schema file
+SCHEMA_INDEX_POINTER = "schema_index.json"
+
+# Compiled indexes kept per schema kind (e.g. across Jamf Pro upgrades)
+SCHEMA_INDEX_KEEP = 4
+
+
+def _same_version(a, b):
+    """Return True if two Jamf Pro version strings name the same release."""
+
+    def release(version):
+        match = re.match(r"\d+(\.\d+)*", str(version).strip())
+        return match.group(0) if match else str(version).strip()
+
+    return release(a) == release(b)
+
 
 class JamfSchemaRegistry:
     """Fetches, caches and queries Jamf Pro API schemas.
@@ -211,14 +251,20 @@ class JamfSchemaRegistry:
         jamf_url:  The base Jamf Pro URL (e.g. https://example.jamfcloud.com).
         cache_dir: Directory for schema cache files.
         log_fn:    Optional callable(msg, verbose_level) for logging.
+        background_refresh: Use a stale schema index straight away and
+                   revalidate it in a background thread.
     """
 
-    def __init__(self, jamf_url, cache_dir, log_fn=None):
+    def __init__(self, jamf_url, cache_dir, log_fn=None, background_refresh=False):
         self.jamf_url = jamf_url.rstrip("/")
         self.cache_dir = cache_dir
+        self.background_refresh = background_refresh
         self._log = log_fn or (lambda msg, **kw: None)
         self._classic_resources = None  # populated on first use
         self._jpapi_resources = None  # populated on first use
+        self._versions = {}  # Jamf Pro version of each loaded schema
+        self._pointer_lock = threading.Lock()
+        self._refresh_thread = None
 
     @property
     def schemas_loaded(self):
@@ -306,119 +352,451 @@ class JamfSchemaRegistry:
     def load_schemas(self, fetch_fn):
         """Download (or load from cache) both API schemas.
 
+        The resources derived from each schema are kept in a compiled index,
+        keyed by Jamf Pro version and schema hash. While the cached schema
+        files are unchanged, the index is loaded instead and the raw schemas
+        are not read at all.
+
+        A cached schema is revalidated with a conditional request (ETag /
+        Last-Modified), so an unchanged schema costs a 304. Once the server's
+        Jamf Pro version has been seen (see note_server_version), the cache is
+        kept until that version changes, up to SCHEMA_MAX_AGE. If
+        background_refresh is set, a stale index is used straight away and
+        revalidated in a background thread.
+
         Args:
-            fetch_fn: callable(url) -> (status_code, data)
-                      where data is the parsed response body (str or dict).
+            fetch_fn: callable(url, headers) -> (status_code, data, resp_headers)
+                      where headers is a dict of extra request headers, data
+                      is the parsed response body (str or dict) and
+                      resp_headers is a dict of lower-case response headers.
                       This is provided by the caller so we don't depend on
                       any particular HTTP library.
         """
-        self._classic_resources = {}
-        self._jpapi_resources = {}
-
-        # --- JPAPI schema (JSON) ---
-        jpapi_cache = os.path.join(self.cache_dir, "jpapi_schema.json")
-        jpapi_data = self._load_cached(jpapi_cache)
-        if jpapi_data is None:
-            self._log("Fetching JPAPI schema from server...", verbose_level=2)
-            status, data = fetch_fn(f"{self.jamf_url}/api/schema")
-            if status and status < 400 and data:
-                jpapi_data = data if isinstance(data, dict) else self._try_json(data)
-                if jpapi_data:
-                    self._save_cache(jpapi_cache, json.dumps(jpapi_data))
-            else:
-                self._log(
-                    f"WARNING: Could not fetch JPAPI schema (HTTP {status})",
-                    verbose_level=1,
-                )
-
-        if jpapi_data:
-            self._jpapi_resources = self._parse_jpapi_schema(jpapi_data)
+        pointer = self._read_index_pointer()
+        stale = []
+        self._jpapi_resources = self._load_kind("jpapi", fetch_fn, pointer, stale)
+        if self._jpapi_resources:
             self._log(
                 f"JPAPI schema loaded: {len(self._jpapi_resources)} resources",
                 verbose_level=2,
             )
+        self._classic_resources = self._load_kind("classic", fetch_fn, pointer, stale)
+        if self._classic_resources:
+            self._log(
+                f"Classic schema loaded: {len(self._classic_resources)} resources",
+                verbose_level=2,
+            )
+        if stale:
+            self._refresh_in_background(fetch_fn, stale)
+
+    def note_server_version(self, version):
+        """Record the Jamf Pro version reported by the server.
+
+        If it differs from the version the cached JPAPI schema describes, the
+        cached schemas are treated as stale from now on.
+        """
+        if not version:
+            return
+        now = time.time()
+        since = self._read_index_pointer().get("server_version", {})
+        since = since.get("since", now) if since.get("version") == version else now
+        pointer = self._update_pointer(
+            None, server_version={"version": version, "seen_at": now, "since": since}
+        )
+        schema_version = pointer.get("jpapi", {}).get("jamf_pro_version", "")
+        if schema_version and not _same_version(version, schema_version):
+            self._log(
+                f"Jamf Pro version {version} differs from the cached schema "
+                f"({schema_version}); the schema cache will be refreshed",
+                verbose_level=2,
+            )
+
+    @property
+    def jamf_pro_version(self):
+        """Return the Jamf Pro version the loaded JPAPI schema describes, or ""."""
+        return self._versions.get("jpapi", "")
 
-        # --- Classic schema (YAML) ---
-        if not YAML_AVAILABLE:
+    def _load_kind(self, kind, fetch_fn, pointer, stale):
+        """Return the resources for one schema kind ("jpapi" or "classic").
+
+        If the index is usable but stale and background refresh is enabled,
+        kind is appended to stale and the index is returned as it is.
+        """
+        _, cache_name, parse_fn = SCHEMA_SOURCES[kind]
+        cache_path = os.path.join(self.cache_dir, cache_name)
+        resources = self._load_current_index(kind, cache_path, pointer)
+        if resources is not None:
+            if not self._is_stale(kind, pointer):
+                return resources
+            if self.background_refresh:
+                stale.append(kind)
+                return resources
+        if kind == "classic" and not YAML_AVAILABLE:
+            # a compiled index can be used even where PyYAML is not available
             self._log(
                 "WARNING: PyYAML not available — Classic schema discovery disabled",
                 verbose_level=1,
             )
+            return resources or {}
+
+        text, data = None, None
+        if resources is None and os.path.exists(cache_path):
+            # a recent schema without an index (e.g. from an older version)
+            # is compiled without fetching it again
+            if time.time() - os.path.getmtime(cache_path) < SCHEMA_CACHE_TTL:
+                text = self._load_cached(cache_path)
+        if text is None:
+            text, data = self._revalidate(kind, fetch_fn, pointer)
+        if text is None:
+            # unchanged (304) or the fetch failed: use what is cached
+            if resources is not None:
+                return resources
+            text = self._load_cached(cache_path)
+            if text is None:
+                return {}
+        loader = self._try_json if kind == "jpapi" else yaml.safe_load
+        resources = self._compile_index(
+            kind, cache_path, text, pointer, getattr(self, parse_fn), data or loader
+        )
+        return resources or {}
+
+    def _is_stale(self, kind, pointer):
+        """Return True if a cached schema should be revalidated."""
+        entry = pointer.get(kind, {})
+        checked_at = entry.get("checked_at") or entry.get("source", [0, 0])[1] / 1e9
+        age = time.time() - checked_at
+        server = pointer.get("server_version", {})
+        schema_version = pointer.get("jpapi", {}).get("jamf_pro_version", "")
+        if (
+            server.get("version")
+            and schema_version
+            and time.time() - server.get("seen_at", 0) < SCHEMA_CACHE_TTL
+        ):
+            if _same_version(server["version"], schema_version):
+                # the server has not been upgraded since the schema was fetched
+                return age >= SCHEMA_MAX_AGE
+            if checked_at < server.get("since", 0):
+                # upgraded since the schema was last checked
+                return True
+        return age >= SCHEMA_CACHE_TTL
+
+    def _revalidate(self, kind, fetch_fn, pointer):
+        """Fetch a schema, conditionally if it is cached.
+
+        Returns (text, data) for a new schema, where data is the parsed schema
+        if the fetch returned one, or (None, None) if the cached schema is
+        still current or the fetch failed.
+        """
+        url_path, cache_name, _ = SCHEMA_SOURCES[kind]
+        cache_path = os.path.join(self.cache_dir, cache_name)
+        entry = pointer.get(kind, {})
+        headers = {}
+        if os.path.exists(cache_path):
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        label = "JPAPI" if kind == "jpapi" else "Classic API"
+        self._log(f"Fetching {label} schema from server...", verbose_level=2)
+        status, data, resp_headers = fetch_fn(f"{self.jamf_url}/{url_path}", headers)
+        resp_headers = resp_headers or {}
+        validators = {
+            "etag": resp_headers.get("etag", entry.get("etag", "")),
+            "last_modified": resp_headers.get(
+                "last-modified", entry.get("last_modified", "")
+            ),
+        }
+        if status == 304 and headers:
+            self._log(f"{label} schema unchanged on server", verbose_level=2)
+            self._update_pointer(kind, checked_at=time.time(), **validators)
+            return None, None
+        if not status or status >= 400 or not data:
+            self._log(
+                f"WARNING: Could not fetch {label} schema (HTTP {status})",
+                verbose_level=1,
+            )
+            return None, None
+
+        parsed = None
+        if isinstance(data, dict):
+            parsed = data
+            if kind == "jpapi":
+                text = json.dumps(data)
+            else:
+                # Already parsed (unlikely for YAML endpoint)
+                text = yaml.dump(data, default_flow_style=False)
+        elif isinstance(data, (str, bytes)):
+            text = data.decode("utf-8") if isinstance(data, bytes) else data
+            if kind == "jpapi":
+                parsed = self._try_json(text)
+                if not parsed:
+                    return None, None
         else:
-            classic_cache = os.path.join(self.cache_dir, "classic_schema.yaml")
-            classic_raw = self._load_cached(classic_cache)
-            if classic_raw is None:
-                self._log("Fetching Classic API schema from server...", verbose_level=2)
-                status, data = fetch_fn(f"{self.jamf_url}/classicapi/doc/swagger.yaml")
-                if status and status < 400 and data:
-                    if isinstance(data, dict):
-                        # Already parsed (unlikely for YAML endpoint)
-                        classic_raw = data
-                        self._save_cache(
-                            classic_cache, yaml.dump(data, default_flow_style=False)
-                        )
-                    elif isinstance(data, (str, bytes)):
-                        raw_str = (
-                            data.decode("utf-8") if isinstance(data, bytes) else data
+            self._log(
+                f"WARNING: Unexpected {label} schema data type: {type(data)}",
+                verbose_level=1,
+            )
+            return None, None
+        self._save_cache(cache_path, text)
+        self._update_pointer(kind, checked_at=time.time(), **validators)
+        return text, parsed
+
+    def _refresh_in_background(self, fetch_fn, kinds):
+        """Revalidate stale schemas in a background thread.
+
+        A lock file stops several processors (or AutoPkg runs) from refreshing
+        the same cache at once. The thread is not a daemon, so a download
+        that has started is completed before the process exits.
+        """
+        lock_path = os.path.join(self.cache_dir, ".refresh.lock")
+        try:
+            if time.time() - os.path.getmtime(lock_path) > SCHEMA_REFRESH_TIMEOUT:
+                os.remove(lock_path)
+        except OSError:
+            pass
+        try:
+            os.close(os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+        except OSError:
+            self._log("Schema refresh already in progress", verbose_level=3)
+            return
+
+        def refresh():
+            try:
+                pointer = self._read_index_pointer()
+                for kind in kinds:
+                    text, data = self._revalidate(kind, fetch_fn, pointer)
+                    if text is not None:
+                        _, cache_name, parse_fn = SCHEMA_SOURCES[kind]
+                        loader = (
+                            self._try_json if kind == "jpapi" else yaml.safe_load
                         )
-                        self._save_cache(classic_cache, raw_str)
-                        classic_raw = raw_str
-                    else:
-                        self._log(
-                            f"WARNING: Unexpected Classic schema data type: "
-                            f"{type(data)}",
-                            verbose_level=1,
+                        self._compile_index(
+                            kind,
+                            os.path.join(self.cache_dir, cache_name),
+                            text,
+                            pointer,
+                            getattr(self, parse_fn),
+                            data or loader,
                         )
-                else:
-                    self._log(
-                        f"WARNING: Could not fetch Classic schema (HTTP {status})",
-                        verbose_level=1,
-                    )
-
-            if classic_raw is not None:
-                if isinstance(classic_raw, str):
-                    classic_data = yaml.safe_load(classic_raw)
-                else:
-                    classic_data = classic_raw
-                if classic_data:
-                    self._classic_resources = self._parse_classic_schema(classic_data)
-                    self._log(
-                        f"Classic schema loaded: "
-                        f"{len(self._classic_resources)} resources",
-                        verbose_level=2,
-                    )
+                self._log("Schema cache refreshed in background", verbose_level=2)
+            except Exception as e:  # pylint: disable=broad-except
+                self._log(
+                    f"WARNING: Background schema refresh failed: {e}", verbose_level=1
+                )
+            finally:
+                try:
+                    os.remove(lock_path)
+                except OSError:
+                    pass
+
+        self._log(
+            f"Refreshing stale schema cache in background ({', '.join(kinds)})",
+            verbose_level=2,
+        )
+        self._refresh_thread = threading.Thread(
+            target=refresh, name="JamfSchemaRefresh"
+        )
+        self._refresh_thread.start()
 
     # ------------------------------------------------------------------
     # Cache helpers
     # ------------------------------------------------------------------
 
     def _load_cached(self, path):
-        """Return cached file contents if fresh, else None."""
+        """Return the raw text of a cached schema file, or None."""
         if os.path.exists(path):
             age = time.time() - os.path.getmtime(path)
-            if age < SCHEMA_CACHE_TTL:
-                self._log(
-                    f"Using cached schema: {path} (age: {int(age)}s)", verbose_level=3
-                )
-                with open(path, "r", encoding="utf-8") as f:
-                    raw = f.read()
-                # For the JPAPI JSON cache, parse it
-                if path.endswith(".json"):
-                    return self._try_json(raw)
-                return raw
-            else:
-                self._log(
-                    f"Schema cache expired: {path} (age: {int(age)}s)", verbose_level=2
-                )
+            self._log(
+                f"Using cached schema: {path} (age: {int(age)}s)", verbose_level=3
+            )
+            with open(path, "r", encoding="utf-8") as f:
+                return f.read()
         return None
 
     def _save_cache(self, path, content):
         """Write content to a cache file."""
-        os.makedirs(os.path.dirname(path), exist_ok=True)
-        with open(path, "w", encoding="utf-8") as f:
-            f.write(content)
+        self._write_file(path, content)
         self._log(f"Schema cached to: {path}", verbose_level=3)
 
+    # ------------------------------------------------------------------
+    # Compiled schema index
+    # ------------------------------------------------------------------
+
+    def _read_index_pointer(self):
+        """Return the record of which index belongs to each cached schema."""
+        try:
+            with open(
+                os.path.join(self.cache_dir, SCHEMA_INDEX_POINTER), encoding="utf-8"
+            ) as f:
+                pointer = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if isinstance(pointer, dict) and pointer.get("format") == SCHEMA_INDEX_FORMAT:
+            return pointer
+        return {}
+
+    def _update_pointer(self, kind, **fields):
+        """Merge fields into one kind's pointer entry (or the top level if kind
+        is None) and write it back. Returns the updated pointer."""
+        with self._pointer_lock:
+            pointer = self._read_index_pointer()
+            pointer["format"] = SCHEMA_INDEX_FORMAT
+            if kind:
+                pointer.setdefault(kind, {}).update(fields)
+            else:
+                pointer.update(fields)
+            self._write_file(
+                os.path.join(self.cache_dir, SCHEMA_INDEX_POINTER),
+                json.dumps(pointer, separators=(",", ":")),
+            )
+        return pointer
+
+    def _load_current_index(self, kind, schema_path, pointer):
+        """Return the indexed resources for a cached schema that is unchanged.
+
+        Only the schema file's size and mtime are checked, so the raw schema
+        is not read. Returns None if there is no usable index.
+        """
+        entry = pointer.get(kind)
+        try:
+            st = os.stat(schema_path)
+        except OSError:
+            return None
+        if not isinstance(entry, dict):
+            return None
+        if entry.get("source") != [st.st_size, st.st_mtime_ns]:
+            return None
+        index = self._read_index(kind, entry.get("sha256", ""))
+        if index is None:
+            return None
+        self._versions[kind] = index["jamf_pro_version"]
+        self._log(
+            f"Using compiled {kind} schema index "
+            f"(version {index['jamf_pro_version'] or 'unknown'})",
+            verbose_level=3,
+        )
+        return index["resources"]
+
+    def _compile_index(self, kind, schema_path, text, pointer, parse_fn, data):
+        """Return the resources for a schema's text, parsing it only if needed.
+
+        A schema whose hash matches an existing index (e.g. one downloaded
+        again after the cache expired) is not parsed again. data is either
+        the already parsed schema or a callable that parses text.
+        """
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        index = self._read_index(kind, digest)
+        if index is not None:
+            resources, version = index["resources"], index["jamf_pro_version"]
+        else:
+            schema = data(text) if callable(data) else data
+            if not isinstance(schema, dict):
+                return None
+            resources = parse_fn(schema)
+            version = str(schema.get("info", {}).get("version", ""))
+            self._write_index(kind, digest, version, resources)
+        self._versions[kind] = version
+
+        try:
+            st = os.stat(schema_path)
+        except OSError:
+            return resources
+        pointer.update(
+            self._update_pointer(
+                kind,
+                source=[st.st_size, st.st_mtime_ns],
+                sha256=digest,
+                jamf_pro_version=version,
+            )
+        )
+        return resources
+
+    def _index_dir(self):
+        """Return the directory holding compiled schema indexes."""
+        return os.path.join(self.cache_dir, "schema_index")
+
+    def _read_index(self, kind, digest):
+        """Return the compiled index for a schema hash, or None."""
+        if not digest:
+            return None
+        try:
+            names = [
+                name
+                for name in os.listdir(self._index_dir())
+                if name.startswith(f"{kind}-") and name.endswith(f"-{digest[:16]}.json")
+            ]
+        except OSError:
+            return None
+        for name in names:
+            try:
+                with open(
+                    os.path.join(self._index_dir(), name), encoding="utf-8"
+                ) as f:
+                    index = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if (
+                index.get("format") != SCHEMA_INDEX_FORMAT
+                or index.get("sha256") != digest
+            ):
+                continue
+            index.setdefault("jamf_pro_version", "")
+            for info in index.setdefault("resources", {}).values():
+                info["methods"] = set(info.get("methods", []))
+            return index
+        return None
+
+    def _write_index(self, kind, digest, version, resources):
+        """Save derived resources as a compiled index and prune old ones."""
+        safe_version = re.sub(r"[^A-Za-z0-9.]+", "_", version) or "unknown"
+        name = f"{kind}-{safe_version}-{digest[:16]}.json"
+        index = {
+            "format": SCHEMA_INDEX_FORMAT,
+            "kind": kind,
+            "jamf_pro_version": version,
+            "sha256": digest,
+            "resources": {
+                key: dict(info, methods=sorted(info["methods"]))
+                for key, info in resources.items()
+            },
+        }
+        if not self._write_file(
+            os.path.join(self._index_dir(), name),
+            json.dumps(index, separators=(",", ":")),
+        ):
+            return
+        self._log(f"Schema index compiled: {name}", verbose_level=3)
+
+        # keep only the most recent indexes of this kind
+        try:
+            old = sorted(
+                (
+                    entry
+                    for entry in os.scandir(self._index_dir())
+                    if entry.name.startswith(f"{kind}-") and entry.name != name
+                ),
+                key=lambda entry: entry.stat().st_mtime,
+                reverse=True,
+            )
+            for entry in old[SCHEMA_INDEX_KEEP - 1 :]:
+                os.remove(entry.path)
+        except OSError:
+            pass
+
+    def _write_file(self, path, content):
+        """Write a file atomically; returns False if it could not be written."""
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp_")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            self._log(f"WARNING: Could not write {path}: {e}", verbose_level=2)
+            return False
+        return True
+
     @staticmethod
     def _try_json(raw):
         """Try to parse a string as JSON, return None on failure."""
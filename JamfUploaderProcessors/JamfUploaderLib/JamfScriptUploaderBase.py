@@ -20,7 +20,6 @@ limitations under the License.
 import os.path
 import sys
 
-from time import sleep
 
 from autopkglib import (  # pylint: disable=import-error
     ProcessorError,
@@ -65,7 +64,9 @@ class JamfScriptUploaderBase(JamfUploaderBase):
         object_id=0,
         tenant_id="",
     ):
-        """Update script metadata."""
+        """Update script metadata.
+
+        Returns None without uploading if the existing script already matches."""
 
         # import script from file and replace any keys in the script
         if os.path.exists(file_path):
@@ -111,6 +112,17 @@ class JamfScriptUploaderBase(JamfUploaderBase):
             verbose_level=2,
         )
 
+        # skip the upload if the existing script already matches
+        if object_id and self.object_is_unchanged(
+            api_url,
+            "script",
+            object_id,
+            script_data,
+            token=token,
+            tenant_id=tenant_id,
+        ):
+            return None
+
         script_json = self.write_json_file(api_url, script_data)
 
         self.output("Uploading script..")
@@ -141,14 +153,10 @@ class JamfScriptUploaderBase(JamfUploaderBase):
             # check HTTP response
             if self.status_check(r, "Script", object_name, request) == "break":
                 break
-            if count >= max_tries:
-                self.output(f"Script upload did not succeed after {max_tries} attempts")
+            if not self.retry_wait(r, count, max_tries, sleep_time, url):
+                self.output(f"Script upload did not succeed after {count} attempts")
                 self.output(f"\nHTTP POST Response Code: {r.status_code}")
                 raise ProcessorError("ERROR: Script upload failed ")
-            if int(sleep_time) > 10:
-                sleep(int(sleep_time))
-            else:
-                sleep(10)
         return r
 
     def execute(self):
@@ -198,6 +206,8 @@ class JamfScriptUploaderBase(JamfUploaderBase):
             del self.env["jamfscriptuploader_summary_result"]
         if "dry_run_summary_result" in self.env:
             del self.env["dry_run_summary_result"]
+        if "jamfscriptuploader_unchanged_summary_result" in self.env:
+            del self.env["jamfscriptuploader_unchanged_summary_result"]
 
         process_skipped = False
 
@@ -318,7 +328,7 @@ class JamfScriptUploaderBase(JamfUploaderBase):
             return
 
         # post the script
-        self.upload_script(
+        r = self.upload_script(
             api_url,
             object_name=script_name,
             file_path=script_path,
@@ -343,7 +353,12 @@ class JamfScriptUploaderBase(JamfUploaderBase):
             object_id=object_id,
             tenant_id=jamf_platform_gw_tenant_id,
         )
-        script_uploaded = True
+        if r is None:
+            self.unchanged_summary(
+                "jamfscriptuploader_unchanged_summary_result", "script", script_name
+            )
+        else:
+            script_uploaded = True
 
         # output the summary
         self.env["script_name"] = script_name
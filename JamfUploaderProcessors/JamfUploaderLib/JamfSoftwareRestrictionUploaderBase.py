@@ -20,7 +20,6 @@ limitations under the License.
 import os.path
 import sys
 
-from time import sleep
 
 from autopkglib import (  # pylint: disable=import-error
     ProcessorError,
@@ -82,7 +81,7 @@ class JamfSoftwareRestrictionUploaderBase(JamfUploaderBase):
         )
 
         self.output("Software Restriction to be uploaded:", verbose_level=2)
-        self.output(template_contents, verbose_level=2)
+        self.log(template_contents, verbose_level=2)
 
         self.output("Uploading Software Restriction...")
 
@@ -113,16 +112,12 @@ class JamfSoftwareRestrictionUploaderBase(JamfUploaderBase):
                 == "break"
             ):
                 break
-            if count >= max_tries:
+            if not self.retry_wait(r, count, max_tries, sleep_time, url):
                 self.output(
-                    f"ERROR: Software Restriction upload did not succeed after {max_tries} attempts"
+                    f"ERROR: Software Restriction upload did not succeed after {count} attempts"
                 )
                 self.output(f"\nHTTP POST Response Code: {r.status_code}")
                 break
-            if int(sleep_time) > 10:
-                sleep(int(sleep_time))
-            else:
-                sleep(10)
 
         return r
 
@@ -197,8 +192,7 @@ class JamfSoftwareRestrictionUploaderBase(JamfUploaderBase):
             )
 
         # import restriction template
-        with open(template, "r", encoding="utf-8") as file:
-            template_contents = file.read()
+        template_contents = self.read_template(template)
 
         # get a token
         token, jamf_url, jamf_platform_gw_region, jamf_platform_gw_tenant_id = (
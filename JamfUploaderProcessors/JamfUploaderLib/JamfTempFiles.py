@@ -0,0 +1,113 @@
+#!/usr/local/autopkg/python
+# pylint: disable=invalid-name
+
+"""
+JamfTempFiles — temporary files created by one JamfUploader processor.
+
+Request bodies (templates, JSON and XML written for upload) and downloaded
+files are created through a TempFileManager, which records each one so that
+all of them are removed when the processor finishes, instead of collecting
+in /tmp/jamf_upload for the rest of the run. Files that are rewritten on
+every request, such as curl's header dump, are reused per thread rather than
+created afresh, which also keeps concurrent requests from overwriting each
+other's files.
+
+The number and total size of the files are reported when they are removed.
+
+Copyright 2026 Graham Pugh
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import os
+import tempfile
+import threading
+
+
+class TempFileManager:
+    """Creates temporary files and removes them all on cleanup().
+
+    Safe to use from several threads at once.
+    """
+
+    def __init__(self):
+        self._paths = set()
+        self._lock = threading.Lock()
+        self.files_created = 0
+        self.bytes_written = 0
+
+    def create(self, directory, prefix=None, suffix=None, text=True):
+        """Create an empty temporary file in directory and return its path."""
+        fd, path = tempfile.mkstemp(
+            prefix=prefix, suffix=suffix, dir=directory, text=text
+        )
+        os.close(fd)
+        with self._lock:
+            self._paths.add(path)
+            self.files_created += 1
+        return path
+
+    def write(self, directory, data, suffix=None):
+        """Write str or bytes to a new temporary file and return its path."""
+        path = self.create(directory, suffix=suffix)
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        with open(path, "wb") as fp:
+            fp.write(data)
+        with self._lock:
+            self.bytes_written += len(data)
+        return path
+
+    def scratch(self, directory, name):
+        """Return the path of a file that is reused by every call from this thread.
+
+        The file is not created here; whatever writes it (e.g. curl) does so.
+        """
+        path = os.path.join(directory, f"{name}_{threading.get_ident()}.txt")
+        with self._lock:
+            if path not in self._paths:
+                self._paths.add(path)
+                self.files_created += 1
+        return path
+
+    def release(self, path):
+        """Remove one temporary file now."""
+        with self._lock:
+            self._paths.discard(path)
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def cleanup(self):
+        """Remove every file still held. Returns (files removed, bytes removed)."""
+        with self._lock:
+            paths, self._paths = self._paths, set()
+        removed = removed_bytes = 0
+        for path in paths:
+            try:
+                size = os.path.getsize(path)
+                os.remove(path)
+            except OSError:
+                continue
+            removed += 1
+            removed_bytes += size
+        return removed, removed_bytes
+
+    def summary(self, removed, removed_bytes):
+        """Return a one-line report of the files created and removed."""
+        return (
+            f"Temporary files: {self.files_created} created "
+            f"({self.bytes_written:,} bytes written), "
+            f"{removed} removed ({removed_bytes:,} bytes)"
+        )
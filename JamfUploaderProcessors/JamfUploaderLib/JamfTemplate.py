@@ -0,0 +1,163 @@
+#!/usr/local/autopkg/python
+# pylint: disable=invalid-name
+
+"""
+JamfTemplate — compiled %KEY% substitution for JamfUploader templates.
+
+A template is split once into literal text and %KEY% placeholders, and the
+compiled form is cached, as are template files (by path, size and mtime).
+Rendering looks up each distinct key once. A value that itself contains
+%KEY% placeholders is resolved recursively, with circular references
+reported as errors, so nested keys no longer need repeated passes over the
+whole template.
+
+Copyright 2026 Graham Pugh
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import os
+import re
+import threading
+
+from collections import OrderedDict
+from xml.sax.saxutils import escape
+
+# A substitutable key, e.g. %NAME%
+KEY_RE = re.compile(r"%(\w+)%")
+
+# Maximum number of compiled templates and template files kept
+TEMPLATE_CACHE_SIZE = 256
+
+_compiled = OrderedDict()
+_files = {}
+_lock = threading.Lock()
+
+
+class TemplateError(Exception):
+    """Base class for template substitution errors."""
+
+
+class TemplateKeyError(TemplateError):
+    """A key in the template has no value."""
+
+    def __init__(self, key):
+        super().__init__(key)
+        self.key = key
+
+
+class TemplateCycleError(TemplateError):
+    """A key's value refers back to the key, directly or indirectly."""
+
+    def __init__(self, chain):
+        super().__init__(" -> ".join(chain))
+        self.chain = chain
+
+
+def compile_template(text):
+    """Return (literals, keys) for a template, using the cache if possible.
+
+    literals has one more item than keys; the template is literals[0] +
+    %keys[0]% + literals[1] + ... + literals[-1].
+    """
+    with _lock:
+        compiled = _compiled.get(text)
+        if compiled is not None:
+            _compiled.move_to_end(text)
+            return compiled
+    compiled = _split(text)
+    with _lock:
+        _compiled[text] = compiled
+        while len(_compiled) > TEMPLATE_CACHE_SIZE:
+            _compiled.popitem(last=False)
+    return compiled
+
+
+def _split(text):
+    """Split text into (literals, keys)."""
+    parts = KEY_RE.split(text)
+    return tuple(parts[0::2]), tuple(parts[1::2])
+
+
+def read_template(path):
+    """Return the text of a template file, cached by path, size and mtime."""
+    st = os.stat(path)
+    key = (st.st_size, st.st_mtime_ns)
+    real_path = os.path.realpath(path)
+    with _lock:
+        cached = _files.get(real_path)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    with open(path, "r", encoding="utf-8") as file:
+        text = file.read()
+    with _lock:
+        if len(_files) >= TEMPLATE_CACHE_SIZE:
+            _files.clear()
+        _files[real_path] = (key, text)
+    return text
+
+
+def render(template, lookup, xml_escape=False, strict=True, log_fn=None):
+    """Substitute every %KEY% in template in a single pass.
+
+    Args:
+        template:   The template text.
+        lookup:     Callable(key) returning the key's value, or None if it has
+                    none.
+        xml_escape: Escape substituted values (other than ints) for XML.
+        strict:     Raise TemplateKeyError for a key without a value, rather
+                    than leaving the placeholder in place.
+        log_fn:     Optional callable(msg, verbose_level) for logging.
+
+    Values are themselves treated as templates, so a value may refer to other
+    keys. Raises TemplateCycleError if a key's value refers back to itself.
+    """
+    literals, keys = compile_template(template)
+    if not keys:
+        return template
+    resolved = {}
+
+    def join(literals, keys, chain, escape_text):
+        out = []
+        for literal, key in zip(literals, keys):
+            out.append(escape(literal) if escape_text else literal)
+            value = value_of(key, chain)
+            out.append(f"%{key}%" if value is None else value)
+        out.append(escape(literals[-1]) if escape_text else literals[-1])
+        return "".join(out)
+
+    def value_of(key, chain):
+        if key in resolved:
+            return resolved[key]
+        if key in chain:
+            raise TemplateCycleError(chain[chain.index(key) :] + (key,))
+        value = lookup(key)
+        if value is None:
+            if strict:
+                raise TemplateKeyError(key)
+            resolved[key] = None
+            return None
+        if log_fn:
+            log_fn(
+                f"Replacing any instances of '{key}' with '{str(value)}'",
+                verbose_level=2,
+            )
+        text = str(value)
+        if not isinstance(value, int) and (xml_escape or "%" in text):
+            # values are short and varied, so they are not added to the cache
+            value_literals, value_keys = _split(text)
+            text = join(value_literals, value_keys, chain + (key,), xml_escape)
+        resolved[key] = text
+        return text
+
+    return join(literals, keys, (), False)
@@ -0,0 +1,213 @@
+#!/usr/local/autopkg/python
+# pylint: disable=invalid-name
+
+"""
+JamfTokenCache — persistent bearer-token store for JamfUploader.
+
+Tokens are kept in a stable, owner-only directory so that they survive across
+separate ``autopkg run`` invocations, instead of living in the per-run
+``mkdtemp`` directory. Entries are keyed by (instance netloc, client ID or
+user, tenant ID). Reads and writes are serialised with ``fcntl`` file locks
+and written via an atomic rename, so parallel AutoPkg workers can share the
+store safely. Tokens are evicted shortly before they expire.
+
+Copyright 2026 Graham Pugh
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import fcntl
+import hashlib
+import json
+import os
+import re
+import stat
+import tempfile
+import time
+
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from urllib.parse import urlparse
+
+# Default location of the token store
+TOKEN_CACHE_DIR = "/tmp/jamf_upload/token_cache"
+
+# Tokens are treated as expired this many seconds before their real expiry,
+# so that a token is never handed out just before the server rejects it
+TOKEN_EXPIRY_MARGIN = 60
+
+
+def parse_expiry(data):
+    """Return the expiry of a token response as a UTC epoch, or None.
+
+    Accepts the ``expires`` ISO 8601 string returned by the Jamf Pro token
+    endpoint and jamf-cli (with any number of fractional digits, or none),
+    or the ``expires_in`` seconds returned by OAuth endpoints.
+    """
+    expires = data.get("expires")
+    if isinstance(expires, (int, float)):
+        return float(expires)
+    if isinstance(expires, str) and expires:
+        match = re.match(
+            r"(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2})(?:\.(\d+))?(Z|[+-]\d{2}:?\d{2})?$",
+            expires.strip(),
+        )
+        if match:
+            base, fraction, _ = match.groups()
+            parsed = datetime.strptime(base, "%Y-%m-%dT%H:%M:%S").replace(
+                tzinfo=timezone.utc
+            )
+            epoch = parsed.timestamp()
+            if fraction:
+                epoch += float(f"0.{fraction}")
+            return epoch
+    expires_in = data.get("expires_in")
+    if expires_in is not None:
+        try:
+            return time.time() + float(expires_in)
+        except (TypeError, ValueError):
+            return None
+    return None
+
+
+class JamfTokenCache:
+    """Cross-run bearer-token store.
+
+    Args:
+        cache_dir: Directory for token files. Created with mode 0700.
+        margin:    Seconds before expiry at which tokens are evicted.
+        log_fn:    Optional callable(msg, verbose_level) for logging.
+    """
+
+    def __init__(self, cache_dir=TOKEN_CACHE_DIR, margin=TOKEN_EXPIRY_MARGIN, log_fn=None):
+        self.cache_dir = cache_dir
+        self.margin = margin
+        self._log = log_fn or (lambda msg, **kw: None)
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def get(self, url, identifier, tenant_id=""):
+        """Return a cached token that is still valid, or ""."""
+        path = self._path(url, identifier, tenant_id)
+        if not os.path.exists(path):
+            self._log("No cached token found", verbose_level=2)
+            return ""
+        with self._locked(path, exclusive=False):
+            try:
+                with open(path, "r", encoding="utf-8") as fp:
+                    entry = json.load(fp)
+            except (OSError, ValueError) as e:
+                self._log(f"Cached token could not be read: {e}", verbose_level=2)
+                return ""
+        if (
+            entry.get("url") != url.rstrip("/")
+            or entry.get("user") != identifier
+            or entry.get("tenant_id", "") != (tenant_id or "")
+        ):
+            self._log("URL or user do not match cached token", verbose_level=2)
+            return ""
+        expires_epoch = entry.get("expires_epoch")
+        if not entry.get("token") or expires_epoch is None:
+            self._log("Cached token entry is incomplete", verbose_level=2)
+            return ""
+        remaining = expires_epoch - time.time()
+        if remaining <= self.margin:
+            self._log(
+                f"Cached token expires in {int(remaining)}s - evicting",
+                verbose_level=2,
+            )
+            self.evict(url, identifier, tenant_id)
+            return ""
+        self._log(
+            f"Using cached token for {identifier} (expires in {int(remaining)}s)",
+            verbose_level=2,
+        )
+        return entry["token"]
+
+    def put(self, url, identifier, data, tenant_id=""):
+        """Store a token response from the Jamf Pro or Platform API.
+
+        ``data`` is the token response dict; the token is taken from
+        ``token`` or ``access_token`` and the expiry from ``expires`` or
+        ``expires_in``. Responses without a parsable expiry are not cached.
+        """
+        token = data.get("token") or data.get("access_token")
+        expires_epoch = parse_expiry(data)
+        if not token or expires_epoch is None:
+            self._log("Token response has no token or expiry, not caching", verbose_level=2)
+            return
+        entry = {
+            "url": url.rstrip("/"),
+            "user": identifier,
+            "tenant_id": tenant_id or "",
+            "token": str(token),
+            "expires_epoch": expires_epoch,
+        }
+        path = self._path(url, identifier, tenant_id)
+        with self._locked(path, exclusive=True):
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, prefix=".token_")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as fp:
+                    json.dump(entry, fp)
+                os.replace(tmp_path, path)
+            except OSError:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+        self._log(f"Token cached to {path}", verbose_level=3)
+
+    def evict(self, url, identifier, tenant_id=""):
+        """Remove a cached token."""
+        path = self._path(url, identifier, tenant_id)
+        with self._locked(path, exclusive=True):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    # ------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------
+
+    def _ensure_dir(self):
+        """Create the cache directory as owner-only and refuse unsafe ones."""
+        os.makedirs(self.cache_dir, mode=0o700, exist_ok=True)
+        st = os.stat(self.cache_dir)
+        if st.st_uid != os.getuid():
+            raise PermissionError(
+                f"Token cache {self.cache_dir} is not owned by the current user"
+            )
+        if stat.S_IMODE(st.st_mode) != 0o700:
+            os.chmod(self.cache_dir, 0o700)
+
+    def _path(self, url, identifier, tenant_id):
+        """Return the token file path for a (netloc, identifier, tenant) key."""
+        self._ensure_dir()
+        netloc = urlparse(url).netloc or url
+        instance_id = re.sub(r"\W+", "_", netloc).strip("_")
+        key = "\n".join((netloc.lower(), identifier or "", tenant_id or ""))
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f"{instance_id}_{digest}.json")
+
+    @contextmanager
+    def _locked(self, path, exclusive):
+        """Hold an flock on a sidecar lock file for the duration of the block."""
+        fd = os.open(f"{path}.lock", os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            yield
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
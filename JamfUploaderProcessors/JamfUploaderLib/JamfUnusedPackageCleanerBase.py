@@ -21,9 +21,11 @@ import csv
 import json
 import os.path
 import pathlib
+import sqlite3
 import sys
 
-from time import sleep
+from concurrent.futures import ThreadPoolExecutor
+from time import monotonic
 from urllib.parse import urlparse
 
 from autopkglib import (  # pylint: disable=import-error
@@ -35,6 +37,11 @@ from autopkglib import (  # pylint: disable=import-error
 # imports require noqa comments for E402
 sys.path.insert(0, os.path.dirname(__file__))
 
+from JamfPackageReferenceIndex import (  # pylint: disable=import-error,wrong-import-position
+    PACKAGE_INDEX_DIR,
+    WEAK_FINGERPRINT_MAX_AGE,
+    JamfPackageReferenceIndex,
+)
 from JamfUploaderBase import (  # pylint: disable=import-error,wrong-import-position
     JamfUploaderBase,
 )
@@ -51,18 +58,141 @@ class Bcolors:
 class JamfUnusedPackageCleanerBase(JamfUploaderBase):
     """Class for functions used removing unused packages from Jamf Pro"""
 
-    def get_packages_in_policies(self, api_url, token, tenant_id=""):
-        """get a list of all packages in all policies"""
+    def get_scan_settings(self):
+        """Return (workers, requests_per_second) for the dependency scans.
+
+        scan_workers sets the number of concurrent object requests (1-32,
+        default 8) and max_requests_per_second paces requests to the Jamf
+        host (default 0, meaning unlimited)."""
+        try:
+            workers = int(self.env.get("scan_workers") or 8)
+            if workers < 1 or workers > 32:
+                raise ValueError
+        except (ValueError, TypeError):
+            workers = 8
+        try:
+            requests_per_second = float(self.env.get("max_requests_per_second") or 0)
+            if requests_per_second < 0:
+                raise ValueError
+        except (ValueError, TypeError):
+            requests_per_second = 0
+        return workers, requests_per_second
+
+    def fetch_concurrently(
+        self, api_url, object_ids, fetch, executor=None, requests_per_second=0
+    ):
+        """call fetch(object_id) for each ID on the shared worker pool, pacing
+        requests to the Jamf host, and return the results in input order"""
+
+        def paced_fetch(object_id):
+            self.wait_for_rate_limit(api_url, requests_per_second)
+            return fetch(object_id)
+
+        if executor is None:
+            return [paced_fetch(object_id) for object_id in object_ids]
+        return list(executor.map(paced_fetch, object_ids))
+
+    def get_package_index(self, api_url, tenant_id="", force_full_rescan=False):
+        """Return the persistent package reference index for this instance.
+
+        Weakly fingerprinted entries are re-fetched on every run, or after
+        package_index_max_age seconds if that is set. force_full_rescan
+        empties the index first. Returns None if the index cannot be used
+        safely, in which case every object is scanned."""
+        try:
+            max_age = int(
+                self.env.get("package_index_max_age") or WEAK_FINGERPRINT_MAX_AGE
+            )
+            if max_age < 0:
+                raise ValueError
+        except (ValueError, TypeError):
+            max_age = WEAK_FINGERPRINT_MAX_AGE
+        instance_id = self.get_netloc(api_url)
+        if tenant_id:
+            instance_id = f"{instance_id}_{tenant_id}"
+        try:
+            index = JamfPackageReferenceIndex(
+                os.path.join(PACKAGE_INDEX_DIR, instance_id, "references.db"),
+                max_age=max_age,
+                log_fn=lambda msg, verbose_level=2: self.output(
+                    msg, verbose_level=verbose_level
+                ),
+            )
+        except (OSError, sqlite3.Error) as e:
+            self.output(
+                f"WARNING: not using the package reference index: {e}",
+                verbose_level=1,
+            )
+            return None
+        if force_full_rescan:
+            self.output("Forcing a full rescan of package references")
+            index.reset()
+        return index
+
+    def scan_package_references(
+        self,
+        api_url,
+        kind,
+        objects,
+        fetch,
+        executor=None,
+        requests_per_second=0,
+        index=None,
+    ):
+        """return the set of packages referenced by a list of objects,
+        calling fetch(object_id) only for objects that the index cannot
+        answer for"""
+        if index is None:
+            referenced = set()
+            for pkgs in self.fetch_concurrently(
+                api_url,
+                [obj["id"] for obj in objects],
+                fetch,
+                executor,
+                requests_per_second,
+            ):
+                referenced.update(pkgs)
+            return referenced
+
+        stale = index.plan(kind, objects)
+        results = self.fetch_concurrently(
+            api_url,
+            [object_id for object_id, _, _ in stale],
+            fetch,
+            executor,
+            requests_per_second,
+        )
+        index.record(
+            kind,
+            [
+                (object_id, digest, strong, pkgs)
+                for (object_id, digest, strong), pkgs in zip(stale, results)
+            ],
+        )
+        return index.packages(kind)
+
+    def get_packages_in_policies(
+        self,
+        api_url,
+        token,
+        tenant_id="",
+        executor=None,
+        requests_per_second=0,
+        index=None,
+    ):
+        """get a set of all packages in all policies
+
+        If a package reference index is supplied, only policies that changed
+        since the last scan are downloaded."""
 
         # get all policies
         policies = self.get_all_api_objects(
             api_url, "policy", token=token, tenant_id=tenant_id
         )
 
-        # get all package objects from policies and add to a list
+        # get all package objects from policies and add to a set
+        packages_in_policies = set()
         if policies:
-            # define a new list
-            packages_in_policies = []
             self.output(
                 (
                     "Please wait while we gather a list of all packages in all policies "
@@ -70,37 +200,55 @@ class JamfUnusedPackageCleanerBase(JamfUploaderBase):
                 ),
                 verbose_level=1,
             )
-            for policy in policies:
+
+            def policy_packages(policy_id):
                 generic_info = self.get_api_object_value_from_id(
                     api_url,
                     object_type="policy",
-                    object_id=policy["id"],
+                    object_id=policy_id,
                     object_path="",
                     token=token,
                     tenant_id=tenant_id,
                 )
                 try:
                     pkgs = generic_info["package_configuration"]["packages"]
-                    for x in pkgs:
-                        pkg = x["name"]
-                        if pkg not in packages_in_policies:
-                            packages_in_policies.append(pkg)
-                except IndexError:
-                    pass
-            return packages_in_policies
+                    return [x["name"] for x in pkgs]
+                except (IndexError, KeyError, TypeError):
+                    return []
+
+            packages_in_policies = self.scan_package_references(
+                api_url,
+                "policy",
+                policies,
+                policy_packages,
+                executor,
+                requests_per_second,
+                index,
+            )
+        return packages_in_policies
 
-    def get_packages_in_patch_titles(self, api_url, token, tenant_id=""):
-        """get a list of all packages in all patch software titles"""
+    def get_packages_in_patch_titles(
+        self,
+        api_url,
+        token,
+        tenant_id="",
+        executor=None,
+        requests_per_second=0,
+        index=None,
+    ):
+        """get a set of all packages in all patch software titles
+
+        If a package reference index is supplied, only titles that changed
+        since the last scan are downloaded."""
 
         # get all patch software titles
         titles = self.get_all_api_objects(
             api_url, "patch_software_title", token=token, tenant_id=tenant_id
         )
 
-        # get all package objects from patch titles and add to a list
+        # get all package objects from patch titles and add to a set
+        packages_in_titles = set()
         if titles:
-            # define a new list
-            packages_in_titles = []
             self.output(
                 (
                     "Please wait while we gather a list of all packages in all patch titles "
@@ -108,44 +256,54 @@ class JamfUnusedPackageCleanerBase(JamfUploaderBase):
                 ),
                 verbose_level=1,
             )
-            for title in titles:
+
+            def title_packages(title_id):
                 versions = self.get_api_object_value_from_id(
                     api_url,
                     object_type="patch_software_title",
-                    object_id=title["id"],
+                    object_id=title_id,
                     object_path="versions",
                     token=token,
                     tenant_id=tenant_id,
                 )
-                try:
-                    if len(versions) > 0:
-                        for i in range(  # pylint: disable=consider-using-enumerate
-                            len(versions)
-                        ):
-                            try:
-                                pkg = versions[i]["package"]["name"]
-                                if pkg:
-                                    if pkg != "None" and pkg not in packages_in_titles:
-                                        packages_in_titles.append(pkg)
-                            except IndexError:
-                                pass
-                            except KeyError:
-                                pass
-                except IndexError:
-                    pass
-            return packages_in_titles
-
-    def get_packages_in_prestages(self, api_url, token, tenant_id=""):
-        """get a list of all packages in all PreStage Enrollments"""
+                pkgs = []
+                for version in versions or []:
+                    try:
+                        pkg = version["package"]["name"]
+                    except (IndexError, KeyError, TypeError):
+                        continue
+                    if pkg and pkg != "None":
+                        pkgs.append(pkg)
+                return pkgs
+
+            packages_in_titles = self.scan_package_references(
+                api_url,
+                "patch_software_title",
+                titles,
+                title_packages,
+                executor,
+                requests_per_second,
+                index,
+            )
+        return packages_in_titles
+
+    def get_packages_in_prestages(
+        self, api_url, token, tenant_id="", package_names=None
+    ):
+        """get a set of all packages in all PreStage Enrollments
+
+        package_names maps package IDs to names. If it is not supplied, it is
+        built from one request for the whole package list, rather than one
+        request per package ID."""
 
         # get all prestages
         prestages = self.get_all_api_objects(
             api_url, "computer_prestage", token=token, tenant_id=tenant_id
         )
 
-        # get all package objects from prestages and add to a list
+        # get all package objects from prestages and add to a set
+        packages_in_prestages = set()
         if prestages:
-            packages_in_prestages = []
             self.output(
                 (
                     "Please wait while we gather a list of all packages in all "
@@ -153,22 +311,20 @@ class JamfUnusedPackageCleanerBase(JamfUploaderBase):
                 ),
                 verbose_level=1,
             )
-            for _, prestage in enumerate(prestages):
-                pkg_ids = prestage["customPackageIds"]
-                if len(pkg_ids) > 0:
-                    for pkg_id in pkg_ids:
-                        pkg = self.get_api_object_value_from_id(
-                            api_url,
-                            object_type="package",
-                            object_id=pkg_id,
-                            object_path="name",
-                            token=token,
-                            tenant_id=tenant_id,
-                        )
-                        if pkg:
-                            if pkg not in packages_in_prestages:
-                                packages_in_prestages.append(pkg)
-            return packages_in_prestages
+            if package_names is None:
+                packages = self.get_all_api_objects(
+                    api_url, "package_v1", token=token, tenant_id=tenant_id
+                )
+                package_names = {
+                    str(package["id"]): package["packageName"]
+                    for package in packages or []
+                }
+            for prestage in prestages:
+                for pkg_id in prestage.get("customPackageIds") or []:
+                    pkg = package_names.get(str(pkg_id))
+                    if pkg:
+                        packages_in_prestages.add(pkg)
+        return packages_in_prestages
 
     def delete_local_pkg(self, mount_share, pkg_name):
         """Delete existing package from local DP or mounted share"""
@@ -213,13 +369,12 @@ class JamfUnusedPackageCleanerBase(JamfUploaderBase):
             # check HTTP response
             if self.status_check(r, "Package", object_id, request) == "break":
                 break
-            if count >= max_tries:
+            if not self.retry_wait(r, count, max_tries, url=url):
                 self.output(
-                    f"WARNING: Package deletion did not succeed after {max_tries} attempts"
+                    f"WARNING: Package deletion did not succeed after {count} attempts"
                 )
                 self.output(f"\nHTTP DELETE Response Code: {r.status_code}")
                 raise ProcessorError("ERROR: Package deletion failed")
-            sleep(10)
         return r
 
     def write_csv_file(self, file, fields, data):
@@ -282,13 +437,12 @@ class JamfUnusedPackageCleanerBase(JamfUploaderBase):
             # check HTTP response
             if self.slack_status_check(r) == "break":
                 break
-            if count >= max_tries:
+            if not self.retry_wait(r, count, max_tries, url=slack_webhook_url):
                 self.output(
-                    f"Slack webhook send did not succeed after {max_tries} attempts"
+                    f"Slack webhook send did not succeed after {count} attempts"
                 )
                 self.output(f"\nHTTP POST Response Code: {r.status_code}")
                 raise ProcessorError("ERROR: Slack webhook failed to send")
-            sleep(10)
 
     def slack_status_check(self, r):
         """Return a message dependent on the HTTP response"""
@@ -317,6 +471,7 @@ class JamfUnusedPackageCleanerBase(JamfUploaderBase):
         slack_webhook_url = self.env.get("slack_webhook_url")
         max_tries = self.env.get("max_tries")
         skip_if = self.env.get("skip_if")
+        force_full_rescan = self.to_bool(self.env.get("force_full_rescan"))
 
         # verify that max_tries is an integer greater than zero and less than 10
         try:
@@ -436,54 +591,97 @@ class JamfUnusedPackageCleanerBase(JamfUploaderBase):
         # create empty dictionaries to hold used and unused packages
         unused_packages = {}
         used_packages = {}
-
-        # get a list of packages in prestage enrollments
-        packages_in_prestages = self.get_packages_in_prestages(
-            api_url, token, tenant_id=jamf_platform_gw_tenant_id
+        deleted_count = 0
+        timings = {}
+
+        def timed(phase, fn, *args, **kwargs):
+            """run one scan phase and record its wall time"""
+            phase_start = monotonic()
+            result = fn(*args, **kwargs)
+            timings[phase] = monotonic() - phase_start
+            self.output(
+                f"Scan of {phase} took {timings[phase]:.1f}s", verbose_level=2
+            )
+            return result
+
+        # get a list of all packages in Jamf Pro, which also resolves the
+        # package IDs used in PreStage Enrollments
+        packages = timed(
+            "packages",
+            self.get_all_api_objects,
+            api_url,
+            "package_v1",
+            token=token,
+            tenant_id=jamf_platform_gw_tenant_id,
         )
-        # get a list of packages in patch software titles
-        packages_in_titles = self.get_packages_in_patch_titles(
-            api_url, token, tenant_id=jamf_platform_gw_tenant_id
+        package_names = {
+            str(package["id"]): package["packageName"] for package in packages or []
+        }
+
+        # scan policies, patch software titles and prestage enrollments at the
+        # same time, sharing one pool of workers for the per-object requests.
+        # Policies and patch titles unchanged since the last run are answered
+        # from the package reference index
+        workers, requests_per_second = self.get_scan_settings()
+        index = self.get_package_index(
+            api_url, jamf_platform_gw_tenant_id, force_full_rescan
         )
-        # get a list of packages in policies
-        packages_in_policies = self.get_packages_in_policies(
-            api_url, token, tenant_id=jamf_platform_gw_tenant_id
+        self.output(
+            f"Scanning with {workers} workers"
+            + (
+                f", at most {requests_per_second:g} requests/s"
+                if requests_per_second
+                else ""
+            ),
+            verbose_level=2,
         )
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            with ThreadPoolExecutor(max_workers=3) as phases:
+                prestages_future = phases.submit(
+                    timed,
+                    "prestages",
+                    self.get_packages_in_prestages,
+                    api_url,
+                    token,
+                    tenant_id=jamf_platform_gw_tenant_id,
+                    package_names=package_names,
+                )
+                titles_future = phases.submit(
+                    timed,
+                    "patch_titles",
+                    self.get_packages_in_patch_titles,
+                    api_url,
+                    token,
+                    tenant_id=jamf_platform_gw_tenant_id,
+                    executor=executor,
+                    requests_per_second=requests_per_second,
+                    index=index,
+                )
+                policies_future = phases.submit(
+                    timed,
+                    "policies",
+                    self.get_packages_in_policies,
+                    api_url,
+                    token,
+                    tenant_id=jamf_platform_gw_tenant_id,
+                    executor=executor,
+                    requests_per_second=requests_per_second,
+                    index=index,
+                )
+                packages_in_use = (
+                    prestages_future.result()
+                    | titles_future.result()
+                    | policies_future.result()
+                )
 
-        # get a list of all packages in Jamf Pro
-        packages = self.get_all_api_objects(
-            api_url, "package_v1", token=token, tenant_id=jamf_platform_gw_tenant_id
-        )
         if packages:
             csv_fields = ["pkg_id", "pkg_name", "used"]
             csv_data = []
 
             for package in packages:
                 # loop all the packages
-                # see if the package is in any policies
-                unused_in_policies = 0
-                unused_in_titles = 0
-                unused_in_prestages = 0
-                if packages_in_policies:
-                    if package["packageName"] not in packages_in_policies:
-                        unused_in_policies = 1
-                else:
-                    unused_in_policies = 1
-                if packages_in_titles:
-                    if package["packageName"] not in packages_in_titles:
-                        unused_in_titles = 1
-                else:
-                    unused_in_titles = 1
-                if packages_in_prestages:
-                    if package["packageName"] not in packages_in_prestages:
-                        unused_in_prestages = 1
-                else:
-                    unused_in_prestages = 1
-                if (
-                    unused_in_policies == 1
-                    and unused_in_titles == 1
-                    and unused_in_prestages == 1
-                ):
+                # see if the package is in any policies, patch titles or prestages
+                if package["packageName"] not in packages_in_use:
                     unused_packages[package["id"]] = package["packageName"]
                     csv_data.append(
                         {
@@ -545,7 +743,6 @@ class JamfUnusedPackageCleanerBase(JamfUploaderBase):
                     f"  {Bcolors.FAIL}{pkg_name}{Bcolors.ENDC}", verbose_level=1
                 )
 
-            deleted_count = 0
             if dry_run:
                 self.output(
                     "Dry run mode enabled. No packages will be deleted.",
@@ -621,11 +818,19 @@ class JamfUnusedPackageCleanerBase(JamfUploaderBase):
                 "used_packages",
                 "unused_packages",
                 "deleted",
+                "packages_scan_time",
+                "policies_scan_time",
+                "patch_titles_scan_time",
+                "prestages_scan_time",
             ],
             "data": {
                 "used_packages": str(len(used_packages)),
                 "unused_packages": str(len(unused_packages)),
                 "deleted": str(deleted_count),
+                "packages_scan_time": f"{timings.get('packages', 0):.1f}s",
+                "policies_scan_time": f"{timings.get('policies', 0):.1f}s",
+                "patch_titles_scan_time": f"{timings.get('patch_titles', 0):.1f}s",
+                "prestages_scan_time": f"{timings.get('prestages', 0):.1f}s",
             },
         }
         self.env["process_skipped"] = process_skipped
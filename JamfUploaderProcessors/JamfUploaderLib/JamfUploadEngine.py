@@ -0,0 +1,229 @@
+#!/usr/local/autopkg/python
+# pylint: disable=invalid-name
+
+"""
+JamfUploadEngine — progress reporting, back-off and resumable copies for
+package uploads.
+
+UploadProgress turns running byte counts into structured progress events
+(bytes sent, percentage, bytes/sec and ETA). backoff_delay gives exponential
+back-off with jitter for retry loops. resumable_copy copies a file to a
+destination such as a mounted file share DP via a hidden partial file, and on
+failure resumes from the last offset that was flushed to the destination
+instead of starting again. verify_file checks a copy against the size and
+digest of its source before the copy is renamed into place.
+
+Copyright 2026 Graham Pugh
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import os
+import random
+import time
+
+from JamfPackageDigests import compute_digests  # pylint: disable=import-error
+
+# Minimum seconds between two progress events
+PROGRESS_INTERVAL = 5.0
+
+# Bytes per read/write when copying files
+COPY_CHUNK_SIZE = 8 * 1024 * 1024
+
+# A copy is flushed to the destination (and so can be resumed) every this many bytes
+COPY_ACK_INTERVAL = 64 * 1024 * 1024
+
+
+class CopyVerificationError(OSError):
+    """A copied file does not match its source."""
+
+
+def backoff_delay(attempt, base=10.0, cap=300.0):
+    """Return the delay before retry number attempt (1 for the first retry).
+
+    The delay doubles with each attempt up to cap, and "equal jitter" picks a
+    random point in its upper half, so that parallel workers do not retry in
+    lockstep while every retry still waits at least base / 2.
+    """
+    delay = min(cap, base * 2 ** max(0, attempt - 1))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+def format_bytes(count):
+    """Return a byte count as a short human-readable string."""
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(count) < 1000:
+            return f"{count:.1f} {unit}" if unit != "B" else f"{int(count)} B"
+        count /= 1000.0
+    return f"{count:.1f} TB"
+
+
+class UploadProgress:
+    """Turn running byte counts into throttled, structured progress events.
+
+    Args:
+        total_bytes: Size of the transfer.
+        emit_fn:     Callable receiving one event dict per report.
+        label:       Name of the item being transferred.
+        interval:    Minimum seconds between "progress" events.
+
+    Events are dicts with the keys event ("progress" or "complete"), label,
+    bytes_sent, total_bytes, percent, bytes_per_sec, eta_seconds, elapsed_seconds
+    and attempt. A byte count lower than the previous one marks a new attempt.
+    """
+
+    def __init__(self, total_bytes, emit_fn, label="", interval=PROGRESS_INTERVAL):
+        self.total_bytes = total_bytes
+        self.emit_fn = emit_fn
+        self.label = label
+        self.interval = interval
+        self.attempt = 0
+        self._start = None
+        self._start_bytes = 0
+        self._last_emit = 0.0
+        self._bytes = 0
+
+    def update(self, bytes_sent, total_bytes=None):
+        """Record the number of bytes transferred so far in this attempt."""
+        now = time.monotonic()
+        if total_bytes:
+            self.total_bytes = total_bytes
+        if self._start is None or bytes_sent < self._bytes:
+            self.attempt += 1
+            self._start = now
+            self._start_bytes = bytes_sent
+            self._last_emit = now
+        self._bytes = bytes_sent
+        if now - self._last_emit >= self.interval:
+            self._last_emit = now
+            self.emit_fn(self.event("progress", now))
+
+    def finish(self):
+        """Emit the final event for a completed transfer."""
+        self._bytes = self.total_bytes
+        self.emit_fn(self.event("complete", time.monotonic()))
+
+    def event(self, kind, now=None):
+        """Return the current state as an event dict."""
+        now = time.monotonic() if now is None else now
+        elapsed = max(now - self._start, 1e-6) if self._start is not None else 0.0
+        rate = (self._bytes - self._start_bytes) / elapsed if elapsed else 0.0
+        remaining = max(self.total_bytes - self._bytes, 0)
+        return {
+            "event": kind,
+            "label": self.label,
+            "bytes_sent": self._bytes,
+            "total_bytes": self.total_bytes,
+            "percent": (
+                round(100.0 * self._bytes / self.total_bytes, 1)
+                if self.total_bytes
+                else 100.0
+            ),
+            "bytes_per_sec": round(rate),
+            "eta_seconds": round(remaining / rate) if rate else None,
+            "elapsed_seconds": round(elapsed, 1),
+            "attempt": self.attempt,
+        }
+
+
+def verify_file(path, size, digest, algorithm="sha3_512"):
+    """Raise CopyVerificationError unless path has the given size and digest.
+
+    The file is read back in full, so on a file share this checks what the
+    server actually stored rather than what was written to it.
+    """
+    actual_size = os.path.getsize(path)
+    if actual_size != size:
+        raise CopyVerificationError(
+            f"size of {path} is {actual_size} bytes, expected {size}"
+        )
+    actual_digest = compute_digests(path, [algorithm])[algorithm]
+    if actual_digest != digest:
+        raise CopyVerificationError(f"{algorithm} of {path} does not match the source")
+
+
+def resumable_copy(
+    source,
+    destination,
+    progress_fn=None,
+    max_tries=5,
+    log_fn=None,
+    sleep_fn=None,
+    verify_fn=None,
+):
+    """Copy source to destination, resuming after I/O errors.
+
+    Data is written to a hidden ".<name>.partial" file next to destination,
+    which is flushed to disk every COPY_ACK_INTERVAL bytes and renamed into
+    place once complete. If a write fails, the copy is retried with back-off
+    from the last flushed offset. Raises the last OSError after max_tries.
+
+    If given, verify_fn(partial_path) is called before the rename and should
+    raise CopyVerificationError if the copy is bad, in which case the partial
+    file is discarded and the copy starts again from the beginning, so a
+    destination is only ever replaced by a verified copy.
+    """
+    log = log_fn or (lambda msg, **kw: None)
+    sleep_fn = sleep_fn or time.sleep
+    partial = os.path.join(
+        os.path.dirname(destination), f".{os.path.basename(destination)}.partial"
+    )
+    total = os.path.getsize(source)
+    acknowledged = 0
+    for attempt in range(1, max_tries + 1):
+        try:
+            offset = 0
+            if acknowledged and os.path.exists(partial):
+                offset = min(acknowledged, os.path.getsize(partial))
+                log(f"Resuming copy at byte {offset} of {total}", verbose_level=1)
+            with open(source, "rb") as fin, open(
+                partial, "r+b" if offset else "wb"
+            ) as fout:
+                fin.seek(offset)
+                fout.seek(offset)
+                fout.truncate(offset)
+                copied = offset
+                since_ack = 0
+                if progress_fn:
+                    progress_fn(copied, total)
+                while True:
+                    chunk = fin.read(COPY_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    fout.write(chunk)
+                    copied += len(chunk)
+                    since_ack += len(chunk)
+                    if since_ack >= COPY_ACK_INTERVAL:
+                        fout.flush()
+                        os.fsync(fout.fileno())
+                        acknowledged, since_ack = copied, 0
+                    if progress_fn:
+                        progress_fn(copied, total)
+                fout.flush()
+                os.fsync(fout.fileno())
+            if verify_fn:
+                verify_fn(partial)
+            os.replace(partial, destination)
+            return
+        except OSError as e:
+            if isinstance(e, CopyVerificationError):
+                # nothing in the partial file can be trusted, so start again
+                acknowledged = 0
+            if attempt >= max_tries:
+                raise
+            delay = backoff_delay(attempt, base=2.0, cap=60.0)
+            log(
+                f"Copy attempt {attempt} failed ({e}), retrying in {delay:.1f}s",
+                verbose_level=1,
+            )
+            sleep_fn(delay)
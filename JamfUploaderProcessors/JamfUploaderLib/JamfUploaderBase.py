@@ -17,31 +17,54 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
+import http.client
 import json
 import os
 import re
 import shutil
 import subprocess
 import tempfile
-import time
+import threading
 import xml.etree.ElementTree as ET
 
 from base64 import b64encode
 from collections import abc, namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta, timezone
 from Foundation import NSPredicate
 from pathlib import Path
 from shutil import rmtree
-from time import sleep
+from time import monotonic, sleep
 from urllib.parse import quote, urlparse
 from uuid import UUID
-from xml.sax.saxutils import escape
 
 from autopkglib import (  # pylint: disable=import-error
     Processor,
     ProcessorError,
 )
 
+from JamfEndpoint import JamfEndpoint  # pylint: disable=import-error
+from JamfHTTPTrace import shared_tracer  # pylint: disable=import-error
+from JamfHTTPTransport import (  # pylint: disable=import-error
+    UnsupportedCurlOption,
+    shared_transport,
+)
+from JamfObjectCache import (  # pylint: disable=import-error
+    JamfObjectCache,
+    shared_object_cache,
+)
+from JamfObjectDiff import compare_objects  # pylint: disable=import-error
+from JamfPackageReferenceIndex import (  # pylint: disable=import-error
+    invalidate_package_references,
+)
+from JamfRetry import (  # pylint: disable=import-error
+    HOST_FAILURE_STATUSES,
+    RetryPolicy,
+    host_of,
+    parse_retry_after,
+    shared_circuit_breaker,
+    shared_retry_metrics,
+)
 from JamfSchemaRegistry import (  # pylint: disable=import-error
     CLASSIC_ALIAS_TABLE,
     CLASSIC_LIST_KEY_OVERRIDES,
@@ -49,6 +72,29 @@ from JamfSchemaRegistry import (  # pylint: disable=import-error
     JPAPI_KEY_OVERRIDES,
     JamfSchemaRegistry,
 )
+from JamfTempFiles import TempFileManager  # pylint: disable=import-error
+from JamfTemplate import (  # pylint: disable=import-error
+    TemplateCycleError,
+    TemplateKeyError,
+    read_template,
+    render,
+)
+from JamfTokenCache import JamfTokenCache  # pylint: disable=import-error
+
+# Object types whose name is held in the "general" section of the object
+NAMEKEY_IN_GENERAL = (
+    "policy",
+    "os_x_configuration_profile",
+    "configuration_profile",
+    "mac_application",
+    "mobile_device_application",
+    "patch_policy",
+    "restricted_software",
+)
+
+# Longest message that log() outputs in full; set log_payload_limit to change it
+# (0 for no limit)
+LOG_PAYLOAD_LIMIT = 20000
 
 
 class JamfUploaderBase(Processor):
@@ -60,6 +106,38 @@ class JamfUploaderBase(Processor):
     # Schema registry instance — lazily initialised per processor run
     _registry = None
 
+    # Persistent token store — shared across runs via a stable directory
+    _token_cache = None
+
+    # Tokens this processor took from the token store, and their replacements
+    _cached_token_sources = None
+    _replaced_tokens = None
+    _token_refresh_lock = threading.Lock()
+
+    # Resolved endpoint fields — shared by all processors in the run
+    _endpoints = {}
+
+    # JamfEndpoint views of those fields — one set per processor
+    _endpoint_views = None
+
+    # Per-host request pacing — shared by all processors in the run
+    _rate_limit_next = {}
+    _rate_limit_lock = threading.Lock()
+
+    # Temporary files — one manager per processor, created on first use
+    _temp_files = None
+    _temp_files_lock = threading.Lock()
+
+    # Temporary file manager that replaces the processor's one in a thread
+    _thread_temp_files = threading.local()
+
+    def process(self):
+        """Run the processor, then remove the temporary files that it created"""
+        try:
+            return super().process()
+        finally:
+            self.cleanup_temp_files()
+
     def predicate_evaluates_as_true(self, predicate_string):
         """Evaluates predicate against our environment dictionary."""
         try:
@@ -88,38 +166,171 @@ class JamfUploaderBase(Processor):
                 log_fn=lambda msg, verbose_level=2: self.output(
                     msg, verbose_level=verbose_level
                 ),
+                background_refresh=self.env.get("schema_refresh", "background")
+                != "blocking",
             )
         return self._registry
 
+    def _get_token_cache(self):
+        """Return the persistent bearer-token store, creating it on first use."""
+        if self._token_cache is None:
+            self._token_cache = JamfTokenCache(
+                log_fn=lambda msg, verbose_level=2: self.output(
+                    msg, verbose_level=verbose_level
+                ),
+            )
+        return self._token_cache
+
+    def _get_object_cache(self):
+        """Return the run-scoped object list cache, or None if disabled."""
+        if self.env.get("disable_object_cache"):
+            return None
+        return shared_object_cache()
+
+    def is_verbose(self, verbose_level):
+        """Return True if messages at verbose_level are output"""
+        try:
+            return int(self.env.get("verbose") or 0) >= verbose_level
+        except (TypeError, ValueError):
+            return False
+
+    def log(self, msg, *args, verbose_level=1):
+        """Output a message, building it only if verbose_level is reached.
+
+        msg can be a string with %-style args, or a callable that returns the
+        message, so that large payloads are not formatted when they will not be
+        shown. Messages longer than log_payload_limit characters are truncated."""
+        if not self.is_verbose(verbose_level):
+            return
+        if callable(msg):
+            msg = msg()
+        elif args:
+            msg = msg % args
+        if isinstance(msg, (bytes, bytearray)):
+            msg = msg.decode("utf-8", errors="replace")
+        elif not isinstance(msg, str):
+            msg = str(msg)
+        try:
+            limit = int(self.env.get("log_payload_limit", LOG_PAYLOAD_LIMIT))
+        except (TypeError, ValueError):
+            limit = LOG_PAYLOAD_LIMIT
+        if limit > 0 and len(msg) > limit:
+            msg = (
+                f"{msg[:limit]}... [{len(msg) - limit} more characters not shown; "
+                "set log_payload_limit to show more]"
+            )
+        self.output(msg, verbose_level=verbose_level)
+
+    def _output_object_cache_stats(self, cache):
+        """Report object list cache hits and misses."""
+        self.output(f"Object list cache: {cache.stats()}", verbose_level=2)
+
     def _ensure_registry_loaded(self, jamf_url):
         """Ensure the schema registry has loaded its schemas."""
         registry = self._get_registry(jamf_url)
         if not registry.schemas_loaded:
-
-            def _schema_fetch(url):
-                """Fetch a URL via curl and return (status, data).
-                Schema endpoints are public and do not require auth."""
+            loading_thread = threading.current_thread()
+
+            def _fetch(url, headers=None):
+                """Fetch a URL via curl and return (status, data, headers).
+                Schema endpoints are public and do not require auth.
+                headers are sent as extra request headers (e.g. If-None-Match);
+                the response headers are returned as a dict with lower-case keys."""
+                curl_opts = []
+                for name, value in (headers or {}).items():
+                    curl_opts.extend(["--header", f"{name}: {value}"])
                 try:
                     r = self.curl(
                         api_type="none",
                         request="GET",
                         url=url,
+                        additional_curl_opts=curl_opts,
                     )
                     data = r.output
                     if isinstance(data, (bytes, str)):
                         pass  # raw string — registry will parse
-                    return (r.status_code, data)
+                    resp_headers = {}
+                    for line in r.headers or []:
+                        if re.match(r"HTTP/", line):
+                            # only keep the headers of the final response
+                            resp_headers = {}
+                        name, sep, value = line.partition(":")
+                        if sep:
+                            resp_headers[name.strip().lower()] = value.strip()
+                    return (r.status_code, data, resp_headers)
                 except (OSError, ProcessorError) as e:
                     self.output(
                         f"WARNING: Schema fetch failed for {url}: {e}",
                         verbose_level=1,
                     )
-                    return (0, None)
+                    return (0, None, {})
+
+            def _schema_fetch(url, headers=None):
+                """Fetch a schema. A background refresh may outlive this processor,
+                whose temporary files are removed when it finishes, so it uses
+                temporary files of its own and removes them after each fetch."""
+                if threading.current_thread() is loading_thread:
+                    return _fetch(url, headers)
+                manager = TempFileManager()
+                self._thread_temp_files.manager = manager
+                try:
+                    return _fetch(url, headers)
+                finally:
+                    self._thread_temp_files.manager = None
+                    manager.cleanup()
 
             registry.load_schemas(_schema_fetch)
         return registry
 
+    def resolve_endpoint(self, object_type, tenant_id=""):
+        """Return the JamfEndpoint describing object_type on this instance.
+
+        Resolved fields are kept for the whole AutoPkg run, keyed by Jamf Pro
+        URL, object type and tenant ID, so each is resolved only once. The
+        returned descriptor resolves any missing field through this processor.
+        Pass it around rather than resolving the same object type again for
+        each request.
+        """
+        key = (
+            self.env.get("JSS_URL", self.env.get("jamf_url", "")),
+            object_type,
+            tenant_id or "",
+        )
+        if self._endpoint_views is None:
+            self._endpoint_views = {}
+        endpoint = self._endpoint_views.get(key)
+        if endpoint is None:
+            endpoint = self._endpoint_views[key] = JamfEndpoint(
+                object_type,
+                tenant_id or "",
+                self._endpoints.setdefault(key, {}),
+                lambda field: self._resolve_endpoint_field(
+                    object_type, tenant_id, field
+                ),
+            )
+        return endpoint
+
+    def _resolve_endpoint_field(self, object_type, tenant_id, field):
+        """Work out one field of a JamfEndpoint."""
+        if field == "api_type":
+            return self._resolve_api_type(object_type)
+        if field == "endpoint":
+            return self._resolve_api_endpoint(object_type, tenant_id)
+        if field == "list_key":
+            return self._resolve_object_list_type(object_type)
+        if field == "name_key":
+            return self._resolve_namekey(object_type)
+        if field == "id_key":
+            return self._resolve_idkey(object_type)
+        if field == "namekey_prefix":
+            return "general/" if object_type in NAMEKEY_IN_GENERAL else ""
+        raise AttributeError(field)
+
     def api_type(self, object_type):
+        """Return the API type from the object type."""
+        return self.resolve_endpoint(object_type).api_type
+
+    def _resolve_api_type(self, object_type):
         """Return the API type from the object type.
 
         Uses the alias tables for offline resolution (needed pre-auth),
@@ -204,8 +415,14 @@ class JamfUploaderBase(Processor):
         return api_endpoint
 
     def api_endpoints(self, object_type, tenant_id=None, uuid=""):
+        """Return the endpoint URL from the object type."""
+        return self.resolve_endpoint(object_type, tenant_id).url_path(uuid)
+
+    def _resolve_api_endpoint(self, object_type, tenant_id=None):
         """Return the endpoint URL from the object type.
 
+        Any {id} placeholder is left in place; JamfEndpoint.url_path fills it in.
+
         Uses alias tables for derivation. Platform endpoints and a few
         special cases (uuid interpolation, non-standard paths) are kept
         inline; everything else is derived from the alias tables or the
@@ -230,12 +447,10 @@ class JamfUploaderBase(Processor):
             endpoint = f"JSSResource/{CLASSIC_ALIAS_TABLE[object_type]}"
             return self.construct_api_endpoint(endpoint, tenant_id)
 
-        # JPAPI: derive from alias table (with {id} → uuid substitution)
+        # JPAPI: derive from alias table
         if object_type in JPAPI_ALIAS_TABLE:
             base_path = JPAPI_ALIAS_TABLE[object_type]
             endpoint = f"api/{base_path}"
-            if "{id}" in endpoint:
-                endpoint = endpoint.replace("{id}", uuid)
             return self.construct_api_endpoint(endpoint, tenant_id)
 
         # Schema registry fallback (works from cache without token)
@@ -254,6 +469,10 @@ class JamfUploaderBase(Processor):
         raise ProcessorError(f"ERROR: Unknown endpoint for object type {object_type}")
 
     def object_list_types(self, object_type):
+        """Return the list wrapper key for the object type."""
+        return self.resolve_endpoint(object_type).list_key
+
+    def _resolve_object_list_type(self, object_type):
         """Return the list wrapper key for the object type.
 
         Derives the key from alias tables and the schema registry
@@ -309,6 +528,10 @@ class JamfUploaderBase(Processor):
         raise ValueError(f"Cannot convert {value!r} to boolean")
 
     def get_namekey(self, object_type):
+        """Return the name key that identifies the object."""
+        return self.resolve_endpoint(object_type).name_key
+
+    def _resolve_namekey(self, object_type):
         """Return the name key that identifies the object.
 
         Uses JPAPI_KEY_OVERRIDES, then schema registry, defaulting to 'name'.
@@ -330,6 +553,10 @@ class JamfUploaderBase(Processor):
         return "name"
 
     def get_idkey(self, object_type):
+        """Return the ID key that identifies the object."""
+        return self.resolve_endpoint(object_type).id_key
+
+    def _resolve_idkey(self, object_type):
         """Return the ID key that identifies the object.
 
         Uses JPAPI_KEY_OVERRIDES, then schema registry, defaulting to 'id'.
@@ -389,50 +616,33 @@ class JamfUploaderBase(Processor):
 
     def get_namekey_path(self, object_type, namekey):
         """Return the namekey path in Xpath format"""
-        # define xpath for name based on object type
-        if object_type in (
-            "policy",
-            "os_x_configuration_profile",
-            "configuration_profile",
-            "mac_application",
-            "mobile_device_application",
-            "patch_policy",
-            "restricted_software",
-        ):
-            namekey_path = f"general/{namekey}"
-        else:
-            namekey_path = namekey
-        return namekey_path
+        return self.resolve_endpoint(object_type).namekey_path(namekey)
 
     def write_json_file(self, jamf_url, data):
         """dump some json to a temporary file"""
-        tf = self.init_temp_file(jamf_url, suffix=".json")
-        with open(tf, "w", encoding="utf-8") as fp:
-            json.dump(data, fp)
-        return tf
-
-    def write_token_to_json_file(self, api_url, identifier, data):
-        """dump the token, expiry, url and user as json to an instance-specific token file"""
-        tmp_dir = self.make_tmp_dir(api_url)
-        token_file = os.path.join(tmp_dir, "token_from_jamf_upload.txt")
-        data["url"] = api_url
-        data["user"] = identifier
-        with open(token_file, "w", encoding="utf-8") as fp:
-            json.dump(data, fp)
+        return self._get_temp_files().write(
+            self.get_temp_dir(jamf_url), json.dumps(data), suffix=".json"
+        )
+
+    def write_token_to_json_file(self, api_url, identifier, data, tenant_id=""):
+        """store the token and its expiry in the persistent token cache, keyed by
+        instance, user or client ID, and tenant ID"""
+        try:
+            self._get_token_cache().put(api_url, identifier, data, tenant_id=tenant_id)
+        except OSError as e:
+            self.output(f"WARNING: Could not cache token: {e}", verbose_level=1)
 
     def write_xml_file(self, jamf_url, data):
         """dump some xml to a temporary file"""
-        xml_tree = ET.ElementTree(data)
-        tf = self.init_temp_file(jamf_url, suffix=".xml")
-        xml_tree.write(tf)
-        return tf
+        return self._get_temp_files().write(
+            self.get_temp_dir(jamf_url), ET.tostring(data), suffix=".xml"
+        )
 
     def write_temp_file(self, jamf_url, data):
         """dump some text to a temporary file"""
-        tf = self.init_temp_file(jamf_url, suffix=".txt")
-        with open(tf, "w", encoding="utf-8") as fp:
-            fp.write(data)
-        return tf
+        return self._get_temp_files().write(
+            self.get_temp_dir(jamf_url), data, suffix=".txt"
+        )
 
     def make_tmp_dir(self, jamf_url, tmp_dir="/tmp/jamf_upload"):
         """make the tmp directory"""
@@ -460,17 +670,42 @@ class JamfUploaderBase(Processor):
         dir_name="/tmp/jamf_upload",
         text=True,
     ):
-        """dump some text to a temporary file"""
+        """create an empty temporary file, which is removed when the processor
+        finishes"""
+        return self._get_temp_files().create(
+            self.get_temp_dir(jamf_url, dir_name),
+            prefix=prefix,
+            suffix=suffix,
+            text=text,
+        )
+
+    def get_temp_dir(self, jamf_url, dir_name="/tmp/jamf_upload"):
+        """return the directory for temporary files, creating it if needed"""
         if self.env.get("jamfupload_tmp_dir"):
             dir_name = self.env.get("jamfupload_tmp_dir")
         if not os.path.exists(dir_name):
             dir_name = self.make_tmp_dir(jamf_url=jamf_url, tmp_dir=dir_name)
-        return tempfile.mkstemp(
-            prefix=prefix,
-            suffix=suffix,
-            dir=dir_name,
-            text=text,
-        )[1]
+        return dir_name
+
+    def _get_temp_files(self):
+        """Return this processor's temporary file manager, creating it on first use,
+        or the manager that the current thread has set up for itself"""
+        manager = getattr(self._thread_temp_files, "manager", None)
+        if manager is not None:
+            return manager
+        with self._temp_files_lock:
+            if self._temp_files is None:
+                self._temp_files = TempFileManager()
+            return self._temp_files
+
+    def cleanup_temp_files(self):
+        """Remove the temporary files created by this processor and report them"""
+        with self._temp_files_lock:
+            temp_files, self._temp_files = self._temp_files, None
+        if temp_files is None:
+            return
+        removed, removed_bytes = temp_files.cleanup()
+        self.output(temp_files.summary(removed, removed_bytes), verbose_level=2)
 
     def get_enc_creds(self, user, password):
         """encode the username and password into a b64-encoded string"""
@@ -478,68 +713,58 @@ class JamfUploaderBase(Processor):
         enc_creds = str(b64encode(credentials.encode("utf-8")), "utf-8")
         return enc_creds
 
-    def check_api_token(self, jamf_url, jamf_user):
-        """Check validity of an existing token"""
-        tmp_dir = self.make_tmp_dir(jamf_url)
-        token_file = os.path.join(tmp_dir, "token_from_jamf_upload.txt")
-        token = ""
-
-        if os.path.exists(token_file):
-            with open(token_file, "rb") as file:
-                data = json.load(file)
-                # check that there is a 'token' key
-                try:
-                    self.output(
-                        f"Checking {data['url']} against {jamf_url}", verbose_level=2
-                    )
-                    if data["url"] == jamf_url and data["user"] == jamf_user:
-                        self.output(
-                            "URL and user for token matches current request",
-                            verbose_level=2,
-                        )
-                        if data["token"]:
-                            try:
-                                # check if it's expired or not
-                                # this may not always work due to inconsistent
-                                # ISO 8601 time format in the expiry token,
-                                # so we look for a ValueError
-
-                                # Convert the strings to datetime objects with UTC timezone
-                                expires_datetime = datetime.strptime(
-                                    data["expires"], "%Y-%m-%dT%H:%M:%S.%fZ"
-                                ).replace(tzinfo=timezone.utc)
-
-                                now_datetime = datetime.now(timezone.utc)
-
-                                if expires_datetime > now_datetime:
-                                    self.output("Existing token is valid")
-                                    token = data["token"]
-                                else:
-                                    self.output(
-                                        f"Existing token expired - {data['expires']} "
-                                        "vs {datetime.now(timezone.utc)}"
-                                    )
-
-                            except ValueError:
-                                self.output(
-                                    "Token expiry could not be parsed", verbose_level=2
-                                )
-                        else:
-                            self.output("Token not found in file", verbose_level=2)
-                    else:
-                        self.output(
-                            "URL or user do not match current token request",
-                            verbose_level=2,
-                        )
-                except KeyError as e:
-                    self.output(
-                        f"Some other error: {e}",
-                        verbose_level=2,
+    def check_api_token(self, jamf_url, jamf_user, tenant_id="", refresh_fn=None):
+        """Check the persistent token cache for a valid existing token.
+        refresh_fn() gets a new token if the server rejects the cached one"""
+        self.output(f"Checking for cached token for {jamf_url}", verbose_level=2)
+        try:
+            token = self._get_token_cache().get(jamf_url, jamf_user, tenant_id)
+        except OSError as e:
+            self.output(f"WARNING: Could not read token cache: {e}", verbose_level=1)
+            token = ""
+        if token:
+            self.output("Existing token is valid")
+            if refresh_fn:
+                with self._token_refresh_lock:
+                    if self._cached_token_sources is None:
+                        self._cached_token_sources = {}
+                    self._cached_token_sources[token] = (
+                        jamf_url,
+                        jamf_user,
+                        tenant_id,
+                        refresh_fn,
                     )
         else:
             self.output("No existing valid token found", verbose_level=2)
         return token
 
+    def refresh_cached_token(self, token):
+        """Evict a cached token that the server rejected and get a new one.
+        Each cached token is replaced at most once; later calls return the same
+        replacement. Returns the new token, or '' if token was not cached or no
+        new token could be obtained"""
+        with self._token_refresh_lock:
+            if self._replaced_tokens and token in self._replaced_tokens:
+                return self._replaced_tokens[token]
+            source = (self._cached_token_sources or {}).pop(token, None)
+            if source is None:
+                return ""
+            jamf_url, identifier, tenant_id, refresh_fn = source
+            self.output(
+                "Cached token was rejected by the server; getting a new token",
+                verbose_level=1,
+            )
+            try:
+                self._get_token_cache().evict(jamf_url, identifier, tenant_id)
+            except OSError as e:
+                self.output(f"WARNING: Could not evict token: {e}", verbose_level=1)
+            new_token = refresh_fn() or ""
+            if new_token:
+                if self._replaced_tokens is None:
+                    self._replaced_tokens = {}
+                self._replaced_tokens[token] = new_token
+            return new_token
+
     def get_api_token_from_oauth(self, jamf_url="", client_id="", client_secret=""):
         """get a token for the Jamf Pro API or Classic API using OAuth"""
         if client_id and client_secret:
@@ -701,10 +926,8 @@ class JamfUploaderBase(Processor):
         config lookup in auth() ensures the correct API type is used, so no
         JWT inspection is needed here.
 
-        For Platform API (region provided), uses make_url_specific_dir for
-        token storage.
-        For Pro/Classic API (no region), uses make_tmp_dir for token
-        storage."""
+        Tokens for both the Platform API (region provided) and the Pro/Classic
+        API (no region) are stored in the persistent token cache."""
 
         # get jamf-cli path from user path
         jamf_cli_path = shutil.which("jamf-cli")
@@ -768,29 +991,17 @@ class JamfUploaderBase(Processor):
                 if "expires_at" in normalized_output:
                     del normalized_output["expires_at"]
 
+                self.write_token_to_json_file(
+                    api_url=api_url,
+                    identifier=f"jamf-cli:{jamf_cli_profile}",
+                    data=normalized_output,
+                )
                 if region:
-                    # Platform API — store in URL-specific directory
-                    url_specific_dir = self.make_url_specific_dir(api_url)
-                    token_file = os.path.join(
-                        url_specific_dir,
-                        "token_from_jamf_upload.txt",
-                    )
-                    normalized_output["url"] = api_url
-                    normalized_output["user"] = f"jamf-cli:{jamf_cli_profile}"
-                    with open(token_file, "w", encoding="utf-8") as fp:
-                        json.dump(normalized_output, fp)
-
                     self.output(
                         f"Platform API token received via jamf-cli "
                         f"for region {region}"
                     )
                 else:
-                    # Pro/Classic API — store in session-specific directory
-                    self.write_token_to_json_file(
-                        api_url=api_url,
-                        identifier=f"jamf-cli:{jamf_cli_profile}",
-                        data=normalized_output,
-                    )
                     self.output("Pro/Classic API token received via jamf-cli")
 
                 self.output(f"Token: {token}", verbose_level=2)
@@ -814,30 +1025,19 @@ class JamfUploaderBase(Processor):
                 token = str(output["access_token"])
                 expires_in = output.get("expires_in", 1800)
 
-                if region:
-                    url_specific_dir = self.make_url_specific_dir(api_url)
-                    token_file = os.path.join(
-                        url_specific_dir,
-                        "token_from_jamf_upload.txt",
-                    )
-                    output["url"] = api_url
-                    output["user"] = f"jamf-cli:{jamf_cli_profile}"
-                    with open(token_file, "w", encoding="utf-8") as fp:
-                        json.dump(output, fp)
-                else:
-                    normalized_output = output.copy()
-                    normalized_output["token"] = token
-                    expires_timestamp = datetime.now(timezone.utc) + timedelta(
-                        seconds=expires_in
-                    )
-                    normalized_output["expires"] = expires_timestamp.strftime(
-                        "%Y-%m-%dT%H:%M:%S.%fZ"
-                    )
-                    self.write_token_to_json_file(
-                        api_url=api_url,
-                        identifier=f"jamf-cli:{jamf_cli_profile}",
-                        data=normalized_output,
-                    )
+                normalized_output = output.copy()
+                normalized_output["token"] = token
+                expires_timestamp = datetime.now(timezone.utc) + timedelta(
+                    seconds=expires_in
+                )
+                normalized_output["expires"] = expires_timestamp.strftime(
+                    "%Y-%m-%dT%H:%M:%S.%fZ"
+                )
+                self.write_token_to_json_file(
+                    api_url=api_url,
+                    identifier=f"jamf-cli:{jamf_cli_profile}",
+                    data=normalized_output,
+                )
 
                 self.output("Token received via jamf-cli (access_token format)")
                 self.output(f"Token: {token}", verbose_level=2)
@@ -913,7 +1113,13 @@ class JamfUploaderBase(Processor):
         if jamf_cli_profile:
             # check for existing token first using the profile as identifier
             # This ensures jamf-cli tokens are cached separately from other auth methods
-            token = self.check_api_token(jamf_url, f"jamf-cli:{jamf_cli_profile}")
+            token = self.check_api_token(
+                jamf_url,
+                f"jamf-cli:{jamf_cli_profile}",
+                refresh_fn=lambda: self.get_token_from_jamf_cli(
+                    jamf_url, jamf_cli_profile=jamf_cli_profile, region=""
+                ),
+            )
             if not token:
                 token = self.get_token_from_jamf_cli(
                     jamf_url, jamf_cli_profile=jamf_cli_profile, region=""
@@ -945,7 +1151,13 @@ class JamfUploaderBase(Processor):
         # check for existing token
         self.output("Checking for existing authentication token", verbose_level=2)
         if client_id and client_secret:
-            token = self.check_api_token(jamf_url, client_id)
+            token = self.check_api_token(
+                jamf_url,
+                client_id,
+                refresh_fn=lambda: self.get_api_token_from_oauth(
+                    jamf_url, client_id, client_secret
+                ),
+            )
             # if no valid token, get one
             if not token:
                 self.output(
@@ -957,7 +1169,13 @@ class JamfUploaderBase(Processor):
             if not token:
                 raise ProcessorError("No token found, cannot continue")
         elif jamf_user and password:
-            token = self.check_api_token(jamf_url, jamf_user)
+            token = self.check_api_token(
+                jamf_url,
+                jamf_user,
+                refresh_fn=lambda: self.get_api_token_from_basic_auth(
+                    jamf_url, jamf_user, password
+                ),
+            )
             # if no valid token, get one
             if not token:
                 self.output(
@@ -980,74 +1198,17 @@ class JamfUploaderBase(Processor):
         os.makedirs(url_specific_dir, exist_ok=True)
         return url_specific_dir
 
-    def check_platform_api_token(self, api_url, client_id):
-        """Check validity of an existing token"""
-        url_specific_dir = self.make_url_specific_dir(api_url)
-        token_file = os.path.join(url_specific_dir, "token_from_jamf_upload.txt")
-        token = ""
-
-        if os.path.exists(token_file):
-            with open(token_file, "rb") as file:
-                data = json.load(file)
-                # check that there is a 'token' key
-                try:
-                    self.output(
-                        f"Checking {data['url']} against {api_url}", verbose_level=2
-                    )
-                    if data["url"] == api_url and data["user"] == client_id:
-                        self.output(
-                            "URL and client ID for token matches current request",
-                            verbose_level=2,
-                        )
-                        if data["access_token"]:
-                            try:
-                                # check if it's expired or not -  the expires_in key represents
-                                # how many seconds until the token expires,
-                                # from the time the file was created
-                                expires_in = data["expires_in"]
-                                token_file_creation_epoch = os.path.getctime(token_file)
-
-                                token_file_expiry_epoch = token_file_creation_epoch + (
-                                    expires_in
-                                )
-
-                                now_epoch = time.time()
-                                token_file_expiry_epoch_human = datetime.fromtimestamp(
-                                    token_file_expiry_epoch, timezone.utc
-                                ).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
-
-                                if token_file_expiry_epoch > now_epoch:
-                                    self.output(
-                                        f"Existing token is valid ({token_file}) - "
-                                        f"expires {token_file_expiry_epoch_human}"
-                                    )
-                                    token = data["access_token"]
-                                else:
-                                    self.output(
-                                        f"Existing token invalid ({token_file}) - "
-                                        f"expired {token_file_expiry_epoch}"
-                                    )
-                            except ValueError:
-                                self.output(
-                                    "Token expiry could not be parsed", verbose_level=2
-                                )
-                        else:
-                            self.output("Token not found in file", verbose_level=2)
-                    else:
-                        self.output(
-                            "URL or user do not match current token request",
-                            verbose_level=2,
-                        )
-                except KeyError as e:
-                    self.output(
-                        f"Some other error: {e}",
-                        verbose_level=2,
-                    )
-        else:
-            self.output("No existing valid token found", verbose_level=2)
-        return token
+    def check_platform_api_token(
+        self, api_url, client_id, tenant_id="", refresh_fn=None
+    ):
+        """Check the persistent token cache for a valid existing Platform API token"""
+        return self.check_api_token(
+            api_url, client_id, tenant_id=tenant_id, refresh_fn=refresh_fn
+        )
 
-    def get_platform_api_token(self, api_url="", client_id="", client_secret=""):
+    def get_platform_api_token(
+        self, api_url="", client_id="", client_secret="", tenant_id=""
+    ):
         """get a token for the Platform API gateway using client credentials grant flow"""
         url = api_url + "/" + self.api_endpoints("platform_api_token")
         additional_curl_opts = [
@@ -1074,7 +1235,9 @@ class JamfUploaderBase(Processor):
                 expires_in = output["expires_in"]
 
                 # write the data to a file
-                self.write_token_to_json_file(api_url, client_id, output)
+                self.write_token_to_json_file(
+                    api_url, client_id, output, tenant_id=tenant_id
+                )
                 self.output("Session token received")
                 self.output(f"Token: {token}", verbose_level=2)
                 self.output(f"Expires: {expires_in}", verbose_level=2)
@@ -1124,7 +1287,11 @@ class JamfUploaderBase(Processor):
             # Check for existing token using the profile as identifier
             # This ensures jamf-cli tokens are cached separately from OAuth tokens
             token = self.check_platform_api_token(
-                api_url, client_id=f"jamf-cli:{jamf_cli_profile}"
+                api_url,
+                client_id=f"jamf-cli:{jamf_cli_profile}",
+                refresh_fn=lambda: self.get_token_from_jamf_cli(
+                    api_url, jamf_cli_profile=jamf_cli_profile, region=region
+                ),
             )
             if not token:
                 token = self.get_token_from_jamf_cli(
@@ -1163,13 +1330,22 @@ class JamfUploaderBase(Processor):
         # check for existing token
         self.output("Checking for existing authentication token", verbose_level=2)
         if client_id and client_secret:
-            token = self.check_platform_api_token(api_url, client_id)
+            token = self.check_platform_api_token(
+                api_url,
+                client_id,
+                tenant_id=tenant_id,
+                refresh_fn=lambda: self.get_platform_api_token(
+                    api_url, client_id, client_secret, tenant_id=tenant_id
+                ),
+            )
             # if no valid token, get one
             if not token:
                 self.output(
                     "Getting a Platform API authentication token", verbose_level=2
                 )
-                token = self.get_platform_api_token(api_url, client_id, client_secret)
+                token = self.get_platform_api_token(
+                    api_url, client_id, client_secret, tenant_id=tenant_id
+                )
             if not token:
                 raise ProcessorError("No token found, cannot continue")
         else:
@@ -1316,6 +1492,8 @@ class JamfUploaderBase(Processor):
         additional_curl_opts="",
         endpoint_type="",
         accept_header="",
+        progress_fn=None,
+        form_filename="",
     ):
         """
         Build a curl command based on request type (GET, POST, PUT, PATCH, DELETE).
@@ -1331,8 +1509,22 @@ class JamfUploaderBase(Processor):
         Subsequent requests to the same URL use the bearer token until it expires.
         Jamf Pro versions older than 10.35 use basic auth for all Classic API requests.
         The Jamf Platform API uses OAuth 2.0 for authentication.
+
+        If http_transport is set to 'native', the curl command is executed in-process
+        by JamfHTTPTransport, which keeps a pool of keep-alive connections per host for
+        the whole AutoPkg run. Requests that use curl options the native transport does
+        not implement (e.g. via custom_curl_opts) fall back to the curl subprocess.
+        With the native transport, progress_fn(bytes_sent, total) is called while a
+        file is uploaded. For multipart uploads, form_filename sets the file name sent
+        to the server, so that a file can be uploaded under a different name without
+        copying it.
         """
         tmp_dir = self.make_tmp_dir(jamf_url=url)
+        native = self.env.get("http_transport") == "native"
+
+        # a cached token that was rejected earlier has already been replaced
+        if token and self._replaced_tokens:
+            token = self._replaced_tokens.get(token, token)
 
         # dry-run: skip write operations but allow auth/token requests
         if self.env.get("dry_run") and request in ("POST", "PUT", "PATCH", "DELETE"):
@@ -1345,8 +1537,13 @@ class JamfUploaderBase(Processor):
                 )
                 return r(headers=[], status_code=200, output={})
 
-        headers_file = os.path.join(tmp_dir, "curl_headers_from_jamf_upload.txt")
-        output_file = self.init_temp_file(url, suffix=".txt")
+        # each thread reuses its own header dump file, so that concurrent requests
+        # do not overwrite each other's headers
+        headers_file = self._get_temp_files().scratch(
+            tmp_dir, "curl_headers_from_jamf_upload"
+        )
+        # the response body is kept in memory unless a caller needs it in a file
+        output_file = None
         cookie_jar = os.path.join(tmp_dir, "curl_cookies_from_jamf_upload.txt")
 
         # build the curl command based on supplied endpoint_types
@@ -1440,7 +1637,12 @@ class JamfUploaderBase(Processor):
                 if self.env.get("show_upload_progress"):
                     curl_cmd.extend(["--progress-bar"])
                 curl_cmd.extend(["--header", "Content-type: multipart/form-data"])
-                curl_cmd.extend(["--form", f"file=@{data}"])
+                form_field = f"file=@{data}"
+                if form_filename:
+                    # quoted, as curl requires for names containing ; or ,
+                    escaped = form_filename.replace("\\", "\\\\").replace('"', '\\"')
+                    form_field += f';filename="{escaped}"'
+                curl_cmd.extend(["--form", form_field])
 
             # policy icon upload (Classic API)
             elif endpoint_type == "policy_icon":
@@ -1553,8 +1755,9 @@ class JamfUploaderBase(Processor):
                 )
 
         # direct output to a file
-        curl_cmd.extend(["--output", output_file])
-        self.output(f"Output file is: {output_file}", verbose_level=3)
+        if output_file:
+            curl_cmd.extend(["--output", output_file])
+            self.output(f"Output file is: {output_file}", verbose_level=3)
 
         # write session for jamf API requests
         if "/api/" in url or "/uapi/" in url or "JSSResource" in url:
@@ -1578,46 +1781,118 @@ class JamfUploaderBase(Processor):
             custom_curl_opts_list = self.env.get("custom_curl_opts").split()
             curl_cmd.extend(custom_curl_opts_list)
 
-        # Format curl command for shell execution, adding quotes where needed
-        formatted_cmd = []
-        for arg in curl_cmd:
-            # Convert bytes to string if necessary
-            arg_str = arg.decode("utf-8") if isinstance(arg, bytes) else str(arg)
-            if (
-                " " in arg_str
-                or '"' in arg_str
-                or "'" in arg_str
-                or "&" in arg_str
-                or "|" in arg_str
-            ):
-                # Escape any existing quotes and wrap in quotes
-                escaped_arg = arg_str.replace('"', '\\"')
-                formatted_cmd.append(f'"{escaped_arg}"')
-            else:
-                formatted_cmd.append(arg_str)
-
-        self.output(f"curl command: {' '.join(formatted_cmd)}", verbose_level=3)
-
-        # now subprocess the curl command and build the r tuple which contains the
-        # headers, status code and outputted data
-        subprocess.check_output(curl_cmd)
+        self.log(
+            lambda: f"curl command: {self.format_curl_cmd(curl_cmd)}", verbose_level=3
+        )
 
         r = namedtuple(
             "r", ["headers", "status_code", "output"], defaults=(None, None, None)
         )
-        try:
-            with open(headers_file, "r", encoding="utf-8") as file:
-                headers = file.readlines()
-            r.headers = [x.strip() for x in headers]
-            for header in r.headers:  # pylint: disable=not-an-iterable
-                if re.match(r"HTTP/(1.1|2)", header) and "Continue" not in header:
-                    r.status_code = int(header.split()[1])
-        except IOError as exc:
-            raise ProcessorError(f"WARNING: {headers_file} not found") from exc
+
+        # time the request if tracing is enabled
+        tracer = self.http_tracer()
+        started = monotonic() if tracer else 0
+
+        # execute the request in-process if the native transport is enabled
+        body = None
+        if native:
+            transport = shared_transport(
+                log_fn=lambda msg, verbose_level=2: self.output(
+                    msg, verbose_level=verbose_level
+                )
+            )
+            try:
+                r.headers, _, body = transport.execute_curl(
+                    curl_cmd, progress_fn=progress_fn
+                )
+            except UnsupportedCurlOption as e:
+                self.output(
+                    f"Native transport cannot handle this request ({e}), using curl",
+                    verbose_level=2,
+                )
+                native = False
+            except (OSError, http.client.HTTPException) as e:
+                self.record_request_outcome(url, None)
+                if tracer:
+                    self.trace_request(
+                        tracer, request, url, None, started, data, None, None
+                    )
+                raise ProcessorError(f"ERROR: Request to {url} failed: {e}") from e
+
+        if not native:
+            # now subprocess the curl command and build the r tuple which contains the
+            # headers, status code and outputted data
+            if output_file:
+                subprocess.check_output(curl_cmd)
+            else:
+                body = subprocess.check_output(curl_cmd)
+
+            try:
+                with open(headers_file, "r", encoding="utf-8") as file:
+                    headers = file.readlines()
+                r.headers = [x.strip() for x in headers]
+            except IOError as exc:
+                raise ProcessorError(f"WARNING: {headers_file} not found") from exc
+
+        for header in r.headers:  # pylint: disable=not-an-iterable
+            if re.match(r"HTTP/(1.1|2)", header) and "Continue" not in header:
+                r.status_code = int(header.split()[1])
+        self.record_request_outcome(url, r.status_code)
+        if tracer:
+            self.trace_request(
+                tracer, request, url, r.status_code, started, data, body, output_file
+            )
+
+        # if the server rejects a token from the token cache (e.g. it was revoked
+        # before it expired), evict it, get a new one and send the request once more
+        if r.status_code == 401 and token:
+            new_token = self.refresh_cached_token(token)
+            if new_token and new_token != token:
+                return self.curl(
+                    api_type,
+                    request=request,
+                    url=url,
+                    token=new_token,
+                    enc_creds=enc_creds,
+                    data=data,
+                    additional_curl_opts=additional_curl_opts,
+                    endpoint_type=endpoint_type,
+                    accept_header=accept_header,
+                    progress_fn=progress_fn,
+                    form_filename=form_filename,
+                )
+
+        # any write makes cached object lists for this resource stale
+        if request in ("POST", "PUT", "PATCH", "DELETE") and endpoint_type not in (
+            "oauth",
+            "token",
+            "auth",
+            "platform_api_token",
+        ):
+            if shared_object_cache().invalidate_url(url):
+                self.output("Object list cache invalidated", verbose_level=3)
+            if invalidate_package_references(url):
+                self.output("Package reference index invalidated", verbose_level=3)
         if r.status_code is not None:
             self.output(f"HTTP response: {r.status_code}", verbose_level=3)
             if int(r.status_code) < 400:
-                if os.path.exists(output_file) and os.path.getsize(output_file) > 0:
+                if body:
+                    if "ics.services.jamfcloud.com" in url:
+                        # callers expect a file path for downloaded icons
+                        output_file = self._get_temp_files().write(
+                            tmp_dir, body, suffix=".txt"
+                        )
+                        r.output = output_file
+                    else:
+                        try:
+                            r.output = json.loads(body)
+                        except (json.JSONDecodeError, ValueError):
+                            r.output = body
+                elif (
+                    output_file
+                    and os.path.exists(output_file)
+                    and os.path.getsize(output_file) > 0
+                ):
                     if "ics.services.jamfcloud.com" in url:
                         r.output = output_file
                     else:
@@ -1628,12 +1903,33 @@ class JamfUploaderBase(Processor):
                             except (json.JSONDecodeError, ValueError):
                                 file.seek(0)  # Reset file pointer to beginning
                                 r.output = file.read()
-                else:
+                elif int(r.status_code) != 304:
                     self.output(
-                        f"No output from request ({output_file} not found or empty)"
+                        f"No output from request ({output_file or 'response'} "
+                        "not found or empty)"
                     )
         return r()
 
+    def format_curl_cmd(self, curl_cmd):
+        """Format a curl command for shell execution, adding quotes where needed"""
+        formatted_cmd = []
+        for arg in curl_cmd:
+            # Convert bytes to string if necessary
+            arg_str = arg.decode("utf-8") if isinstance(arg, bytes) else str(arg)
+            if (
+                " " in arg_str
+                or '"' in arg_str
+                or "'" in arg_str
+                or "&" in arg_str
+                or "|" in arg_str
+            ):
+                # Escape any existing quotes and wrap in quotes
+                escaped_arg = arg_str.replace('"', '\\"')
+                formatted_cmd.append(f'"{escaped_arg}"')
+            else:
+                formatted_cmd.append(arg_str)
+        return " ".join(formatted_cmd)
+
     def status_check(self, r, endpoint_type, object_name, request):
         """Return a message dependent on the HTTP response"""
         if request == "DELETE":
@@ -1658,10 +1954,7 @@ class JamfUploaderBase(Processor):
             return "break"
         else:
             self.output("API response:", verbose_level=2)
-            if isinstance(r.output, (bytes, bytearray)):
-                self.output(r.output.decode("utf-8"), verbose_level=2)
-            else:
-                self.output(r.output, verbose_level=2)
+            self.log(r.output, verbose_level=2)
 
             if r.status_code >= 400:
                 # extract the error message
@@ -1704,6 +1997,9 @@ class JamfUploaderBase(Processor):
             try:
                 jamf_pro_version = str(r.output["version"])
                 self.output(f"Jamf Pro Version: {jamf_pro_version}")
+                if not tenant_id:
+                    # lets the schema cache last until the server is upgraded
+                    self._get_registry(jamf_url).note_server_version(jamf_pro_version)
                 return jamf_pro_version
             except KeyError as error:
                 self.output(f"ERROR: No version of Jamf Pro received.  Error:\n{error}")
@@ -1722,10 +2018,52 @@ class JamfUploaderBase(Processor):
         """check if a Classic or Jamf Pro API object with the same name exists on the server"""
         # define the relationship between the object types and their URL
         # get api type
-        api_type = self.api_type(object_type)
+        resolved = self.resolve_endpoint(object_type, tenant_id)
+        api_type = resolved.api_type
+        endpoint = resolved.url_path()
+
+        # answer from the run-scoped cache if this list was already downloaded
+        cache = self._get_object_cache()
+        cache_key = JamfObjectCache.make_key(jamf_url, object_type, tenant_id)
+        if cache:
+            if api_type == "classic":
+                found, object_id = cache.find_id(cache_key, object_name)
+            else:
+                found, object_id = cache.find_id(
+                    cache_key,
+                    object_name,
+                    name_key=filter_name,
+                    id_key=id_key,
+                    case_insensitive=False,
+                )
+            self._output_object_cache_stats(cache)
+            if found:
+                self.output(
+                    f"Object ID for '{object_name}' is: {object_id} (cached)",
+                    verbose_level=2,
+                )
+                return object_id
+
         if api_type == "classic":
+            # try the object's /name/ endpoint first, which avoids downloading the
+            # whole list; this is only conclusive when it finds the object
+            if object_type not in ("account_user", "account_group"):
+                object_id = self.get_classic_object_id_by_name(
+                    jamf_url, endpoint, object_name, token
+                )
+                if object_id:
+                    if cache:
+                        cache.put_lookup(
+                            cache_key, endpoint, "name", object_name, object_id
+                        )
+                    self.output(
+                        f"Object ID for '{object_name}' is: {object_id}",
+                        verbose_level=2,
+                    )
+                    return object_id
+
             # do XML stuff
-            url = jamf_url + "/" + self.api_endpoints(object_type, tenant_id=tenant_id)
+            url = jamf_url + "/" + endpoint
             r = self.curl(api_type=api_type, request="GET", url=url, token=token)
 
             if r.status_code == 200:
@@ -1739,22 +2077,18 @@ class JamfUploaderBase(Processor):
                 elif object_type == "account_group":
                     object_list = response_data.get("accounts", {}).get("groups", [])
                 else:
-                    object_list = response_data[self.object_list_types(object_type)]
+                    object_list = response_data[resolved.list_key]
+                if cache:
+                    cache.put_list(cache_key, endpoint, object_list)
 
-                self.output(
-                    object_list,
-                    verbose_level=4,
-                )
+                self.log(object_list, verbose_level=4)
                 object_id = 0
                 self.output(
                     f"Looking for {object_type} with {filter_name} '{object_name}'",
                     verbose_level=2,
                 )
                 for obj in object_list:
-                    self.output(
-                        obj,
-                        verbose_level=4,
-                    )
+                    self.log(obj, verbose_level=4)
                     # we need to check for a case-insensitive match
                     if isinstance(obj, dict) and "name" in obj:
                         if obj["name"].lower() == object_name.lower():
@@ -1772,24 +2106,26 @@ class JamfUploaderBase(Processor):
                 f"?page=0&page-size=100&sort={id_key}&filter={filter_name}"
                 f"%3D%3D%22{quote(object_name)}%22"
             )
-            url = (
-                jamf_url
-                + "/"
-                + self.api_endpoints(object_type, tenant_id=tenant_id)
-                + url_filter
-            )
+            url = jamf_url + "/" + endpoint + url_filter
             r = self.curl(api_type=api_type, request="GET", url=url, token=token)
             if r.status_code == 200:
                 object_id = 0
                 output = r.output
                 for obj in output["results"]:
-                    self.output(
-                        f"ID: {obj.get(id_key)} NAME: {obj.get(filter_name)} MATCH: {object_name}",
+                    self.log(
+                        "ID: %s NAME: %s MATCH: %s",
+                        obj.get(id_key),
+                        obj.get(filter_name),
+                        object_name,
                         verbose_level=3,
                     )
                     if obj[filter_name] == object_name:
                         object_id = obj[id_key]
                         break
+                if cache:
+                    cache.put_lookup(
+                        cache_key, endpoint, filter_name, object_name, object_id
+                    )
                 self.output(
                     f"Object ID for '{object_name}' is: {object_id}", verbose_level=2
                 )
@@ -1800,8 +2136,44 @@ class JamfUploaderBase(Processor):
                     f"status code {r.status_code}"
                 )
 
+    def get_classic_object_id_by_name(self, jamf_url, endpoint, object_name, token):
+        """Look up a Classic API object's ID with its /name/ endpoint.
+
+        Returns 0 if the lookup does not find exactly one object whose name matches
+        (ignoring case), so that the caller can fall back to searching the full
+        list. This covers names that differ in case, names the endpoint cannot
+        look up, and endpoints without a /name/ form."""
+        if not object_name:
+            return 0
+        url = f"{jamf_url}/{endpoint}/name/{quote(object_name, safe='')}"
+        r = self.curl(api_type="classic", request="GET", url=url, token=token)
+        if r.status_code != 200:
+            self.output(
+                f"No match for '{object_name}' at {endpoint}/name "
+                f"(HTTP status {r.status_code}); searching the full list",
+                verbose_level=2,
+            )
+            return 0
+        try:
+            response_data = r.output
+            if not isinstance(response_data, dict):
+                response_data = json.loads(response_data)
+            # the object is the only top-level value, e.g. {"policy": {...}}
+            (obj,) = response_data.values()
+            if "id" not in obj and isinstance(obj.get("general"), dict):
+                obj = obj["general"]
+            object_id = obj["id"]
+            name = obj["name"]
+        except (AttributeError, KeyError, TypeError, ValueError):
+            return 0
+        if not isinstance(name, str) or name.lower() != object_name.lower():
+            return 0
+        return object_id
+
     def substitute_assignable_keys(self, data, xml_escape=False):
-        """substitutes any key in the inputted text using the %MY_KEY% nomenclature"""
+        """substitutes any key in the inputted text using the %MY_KEY% nomenclature.
+        Values that themselves contain %MY_KEY% placeholders are substituted too, and
+        circular references between keys are reported as errors."""
         # if JSS_INVENTORY_NAME is not given, make it equivalent to %NAME%.app
         # (this is to allow use of legacy JSSImporter group templates)
         try:
@@ -1812,34 +2184,19 @@ class JamfUploaderBase(Processor):
             except KeyError:
                 pass
 
-        # do a four-pass to ensure that all keys are substituted
-        loop = 5
-        while loop > 0:
-            loop = loop - 1
-            found_keys = re.findall(r"\%\w+\%", data)
-            if not found_keys:
-                break
-            found_keys = [i.replace("%", "") for i in found_keys]
-            for found_key in found_keys:
-                if self.env.get(found_key) is not None:
-                    self.output(
-                        f"Replacing any instances of '{found_key}' with "
-                        f"'{str(self.env.get(found_key))}'",
-                        verbose_level=2,
-                    )
-                    if xml_escape and not isinstance(self.env.get(found_key), int):
-                        replacement_key = escape(str(self.env.get(found_key)))
-                    else:
-                        replacement_key = self.env.get(found_key)
-                    data = data.replace(f"%{found_key}%", str(replacement_key))
-                else:
-                    self.output(
-                        f"WARNING: '{found_key}' has no replacement object!",
-                    )
-                    raise ProcessorError(
-                        f"Unsubstitutable key in template found: '{found_key}'"
-                    )
-        return data
+        try:
+            return render(data, self.env.get, xml_escape, log_fn=self.output)
+        except TemplateKeyError as e:
+            self.output(
+                f"WARNING: '{e.key}' has no replacement object!",
+            )
+            raise ProcessorError(
+                f"Unsubstitutable key in template found: '{e.key}'"
+            ) from e
+        except TemplateCycleError as e:
+            raise ProcessorError(
+                f"Circular reference in template keys: {' -> '.join(e.chain)}"
+            ) from e
 
     def substitute_limited_assignable_keys(
         self, data, cli_custom_keys, xml_escape=False
@@ -1849,31 +2206,29 @@ class JamfUploaderBase(Processor):
         substitute_assignable_keys, to ensure that a specific set of keys are substituted in the
         right order.
         Whenever %MY_KEY% is found in the provided data, it is replaced with the assigned
-        value of MY_KEY. A five-times pass-through is done to ensure that all keys are substituted.
+        value of MY_KEY, including any keys within that value. Keys that are not in the
+        assigned set are left in place.
 
         Optionally, if the xml_escape key is set, the value is escaped for XML special characters.
         This is designed primarily to account for ampersands in the substituted strings.
         """
-        loop = 5
-        while loop > 0:
-            loop = loop - 1
-            found_keys = re.findall(r"\%\w+\%", data)
-            if not found_keys:
-                break
-            found_keys = [i.replace("%", "") for i in found_keys]
-            for found_key in found_keys:
-                if cli_custom_keys.get(found_key):
-                    self.output(
-                        f"Replacing any instances of '{found_key}' with "
-                        f"'{str(cli_custom_keys[found_key])}'",
-                        verbose_level=2,
-                    )
-                    if xml_escape and not isinstance(self.env.get(found_key), int):
-                        replacement_key = escape(cli_custom_keys[found_key])
-                    else:
-                        replacement_key = cli_custom_keys[found_key]
-                    data = data.replace(f"%{found_key}%", str(replacement_key))
-        return data
+        try:
+            return render(
+                data,
+                lambda key: cli_custom_keys.get(key) or None,
+                xml_escape,
+                strict=False,
+                log_fn=self.output,
+            )
+        except TemplateCycleError as e:
+            raise ProcessorError(
+                f"Circular reference in template keys: {' -> '.join(e.chain)}"
+            ) from e
+
+    def read_template(self, template_path):
+        """return the contents of a template file, reusing the previous read if the
+        file has not changed"""
+        return read_template(template_path)
 
     def get_path_to_file(self, filename):
         """Find a file in a recipe without requiring a path. Looks in the following places
@@ -1995,6 +2350,150 @@ class JamfUploaderBase(Processor):
                         return matched_filepath
         raise ProcessorError(f"File '{filename}' not found")
 
+    def get_retry_after(self, r):
+        """Return the Retry-After delay in seconds from a response, or None"""
+        for header in r.headers or []:
+            name, _, value = header.partition(":")
+            if name.strip().lower() == "retry-after":
+                return parse_retry_after(value)
+        return None
+
+    def http_tracer(self):
+        """Return the request tracer if http_trace_file is set, otherwise None"""
+        trace_file = self.env.get("http_trace_file")
+        if not trace_file:
+            return None
+        return shared_tracer(
+            os.path.expanduser(trace_file),
+            log_fn=lambda msg, verbose_level=1: self.output(
+                msg, verbose_level=verbose_level
+            ),
+        )
+
+    def trace_request(
+        self, tracer, request, url, status_code, started, data, body, output_file
+    ):
+        """Write a trace record for a request made by curl"""
+        bytes_out = 0
+        if data:
+            if isinstance(data, str) and os.path.isfile(data):
+                bytes_out = os.path.getsize(data)
+            else:
+                bytes_out = len(str(data).encode("utf-8"))
+        if body is not None:
+            bytes_in = len(body)
+        elif output_file and os.path.exists(output_file):
+            bytes_in = os.path.getsize(output_file)
+        else:
+            bytes_in = 0
+        tracer.record(
+            type(self).__name__,
+            request,
+            url,
+            status_code,
+            monotonic() - started,
+            bytes_out=bytes_out,
+            bytes_in=bytes_in,
+        )
+
+    def record_request_outcome(self, url, status_code):
+        """Count a request towards the retry metrics and the host's circuit breaker.
+        No status code means that no response was received"""
+        host = host_of(url)
+        failed = not status_code or int(status_code) in HOST_FAILURE_STATUSES
+        shared_retry_metrics().record_request(host, failed)
+        if shared_circuit_breaker().record(host, failed):
+            self.output(
+                f"WARNING: {host} has failed {shared_circuit_breaker().threshold} "
+                "requests in a row; not retrying requests to it for "
+                f"{shared_circuit_breaker().cooldown:.0f}s"
+            )
+
+    def retry_wait(self, r, attempt, max_tries, sleep_time=0, url=""):
+        """Wait before retrying a failed request, if it is worth retrying.
+
+        Returns False without waiting if the attempts are used up, the response
+        status is not one that a retry can fix (for example 400, 401 or 404), or
+        the host's circuit breaker is open. Otherwise waits and returns True.
+        The wait doubles with each attempt (2s, 4s, 8s... with jitter, up to 60s)
+        unless the server sent Retry-After. A sleep_time greater than 0 sets the
+        shortest wait."""
+        status_code = r.status_code if r is not None else None
+        host = host_of(url)
+        if attempt >= max_tries:
+            return False
+        policy = RetryPolicy()
+        if not policy.is_retryable(status_code):
+            self.output(
+                f"Not retrying: HTTP status {status_code} will not change on retry",
+                verbose_level=1,
+            )
+            return False
+        if shared_circuit_breaker().is_open(host):
+            self.output(
+                f"Not retrying: too many consecutive failures from {host}; "
+                "retries resume in "
+                f"{shared_circuit_breaker().remaining(host):.0f}s",
+                verbose_level=1,
+            )
+            return False
+        try:
+            minimum = max(0.0, float(sleep_time or 0))
+        except (TypeError, ValueError):
+            minimum = 0.0
+        retry_after = self.get_retry_after(r) if r is not None else None
+        delay = policy.delay(attempt, retry_after=retry_after, minimum=minimum)
+        self.output(
+            f"Attempt {attempt} of {max_tries} failed "
+            f"(HTTP status {status_code or 'none'}); retrying in {delay:.1f}s"
+            + (" as requested by the server" if retry_after is not None else ""),
+            verbose_level=1,
+        )
+        sleep(delay)
+        shared_retry_metrics().record_retry(host, delay)
+        self.output(shared_retry_metrics().summary(host), verbose_level=2)
+        tracer = self.http_tracer()
+        if tracer:
+            tracer.note_retry(url, attempt)
+        return True
+
+    def wait_for_rate_limit(self, url, requests_per_second):
+        """Pace requests to the host of url to at most requests_per_second.
+
+        The schedule is shared by all threads and processors in the run, so
+        concurrent workers hitting the same Jamf instance are paced together.
+        A rate of 0 or None means unlimited."""
+        if not requests_per_second:
+            return
+        host = urlparse(url).netloc.lower()
+        interval = 1.0 / float(requests_per_second)
+        with JamfUploaderBase._rate_limit_lock:
+            now = monotonic()
+            start = max(now, JamfUploaderBase._rate_limit_next.get(host, 0.0))
+            JamfUploaderBase._rate_limit_next[host] = start + interval
+        if start > now:
+            sleep(start - now)
+
+    def get_pagination_settings(self):
+        """Return (page_size, workers) for paginated requests.
+
+        page_size can be set with the pagination_page_size key (1-2000, default 100)
+        and the number of concurrent page requests with pagination_workers
+        (1-16, default 4)."""
+        try:
+            page_size = int(self.env.get("pagination_page_size") or 100)
+            if page_size < 1 or page_size > 2000:
+                raise ValueError
+        except (ValueError, TypeError):
+            page_size = 100
+        try:
+            workers = int(self.env.get("pagination_workers") or 4)
+            if workers < 1 or workers > 16:
+                raise ValueError
+        except (ValueError, TypeError):
+            workers = 4
+        return page_size, workers
+
     def paginated_get(
         self,
         api_type,
@@ -2005,90 +2504,179 @@ class JamfUploaderBase(Processor):
         domain,
     ):
         """get a list of all objects of a particular type, handling pagination if needed.
-        For JPAPI endpoints only, as Classic API endpoints do not paginate."""
+        For JPAPI endpoints only, as Classic API endpoints do not paginate.
+
+        The first page also supplies totalCount; the remaining pages are fetched
+        concurrently. Pages are reassembled in page order, so the returned list is
+        deterministic. If the server answers 429 or 503, all workers back off
+        (honouring Retry-After) and the delay decays again after successful pages."""
+
+        page_size, workers = self.get_pagination_settings()
+        if object_type == "managed_software_updates_available_updates":
+            results_key = "availableUpdates"
+        elif object_type == "managed_software_updates_plans_events":
+            results_key = "events"
+        else:
+            results_key = "results"
 
-        url_filter = "?page=0&page-size=1"
-        r = self.curl(
-            api_type=api_type, request="GET", url=f"{url}{url_filter}", token=token
-        )
-        self.output(f"Output:\n{r.output}", verbose_level=4)
-        # check if there is a totalCount value in the output
-        try:
-            total_objects = int(r.output["totalCount"])
-            self.output(f"Total objects: {total_objects}", verbose_level=2)
-            # if total count is 0, return empty list
-            if total_objects == 0:
-                return []
-            # now get all objects in a loop, paginating per 100 objects
-            object_list = []
+        # shared politeness delay, raised on 429/503 and decayed on success
+        politeness = {"delay": 0.0}
+        politeness_lock = threading.Lock()
+        max_page_tries = 5
 
-            for page in range(0, (total_objects + 99) // 100):
-                url_filter = f"?page={page}&page-size=100&sort={namekey}&sort-order=asc"
+        def get_page(page):
+            """fetch one page, backing off while the server is throttling"""
+            url_filter = (
+                f"?page={page}&page-size={page_size}&sort={namekey}&sort-order=asc"
+            )
+            for _ in range(max_page_tries):
+                with politeness_lock:
+                    delay = politeness["delay"]
+                if delay:
+                    sleep(delay)
                 self.output(f"Getting page {page} of objects", verbose_level=2)
-                if page > 0:
-                    time.sleep(0.5)  # be nice to the server
-                r = self.curl(
+                page_r = self.curl(
                     api_type=api_type,
                     request="GET",
                     url=f"{url}{url_filter}",
                     token=token,
                 )
-                if r.status_code != 200:
-                    raise ProcessorError(
-                        f"ERROR: Unable to get list of {object_type} from {domain}"
+                if page_r.status_code in (429, 503):
+                    retry_after = self.get_retry_after(page_r)
+                    with politeness_lock:
+                        politeness["delay"] = min(
+                            30.0,
+                            (
+                                retry_after
+                                if retry_after is not None
+                                else max(0.5, politeness["delay"] * 2)
+                            ),
+                        )
+                        delay = politeness["delay"]
+                    self.output(
+                        f"Server responded {page_r.status_code} to page {page}, "
+                        f"backing off {delay}s",
+                        verbose_level=2,
                     )
-                self.output(f"Output:\n{r.output}", verbose_level=4)
-                # parse the output to get the list of objects
-                if object_type == "managed_software_updates_available_updates":
-                    object_list.extend(r.output["availableUpdates"])
-                elif object_type == "managed_software_updates_plans_events":
-                    object_list.extend(r.output["events"])
-                else:
-                    object_list.extend(r.output["results"])
-                # any null values in the output should be converted to empty strings
-                # this is to avoid problems outputting to XML later
-                for obj in object_list:
-                    for key, value in obj.items():
-                        if value is None:
-                            obj[key] = ""
+                    continue
+                with politeness_lock:
+                    politeness["delay"] = (
+                        politeness["delay"] / 2 if politeness["delay"] > 0.1 else 0.0
+                    )
+                return page_r
+            return page_r
+
+        def page_results(page_r):
+            """extract a page's objects, converting null values to empty strings
+            to avoid problems outputting to XML later"""
+            page_objects = page_r.output[results_key]
+            for obj in page_objects:
+                for key, value in obj.items():
+                    if value is None:
+                        obj[key] = ""
+            return page_objects
+
+        # the first page gives us totalCount as well as the first objects
+        r = get_page(0)
+        if r.status_code != 200:
+            # may not be a paginated endpoint - fall back to a plain request, but a
+            # paginated endpoint whose sorted page failed is an error, as for the
+            # later pages
+            url_filter = "?page=0&page-size=1"
+            plain_r = self.curl(
+                api_type=api_type, request="GET", url=f"{url}{url_filter}", token=token
+            )
+            if plain_r.status_code != 200 or (
+                isinstance(plain_r.output, dict) and "totalCount" in plain_r.output
+            ):
+                raise ProcessorError(
+                    f"ERROR: Unable to get list of {object_type} from {domain} "
+                    f"(HTTP status {r.status_code})"
+                )
+            return plain_r.output
+        self.log("Output:\n%s", r.output, verbose_level=4)
+        # check if there is a totalCount value in the output
+        try:
+            total_objects = int(r.output["totalCount"])
+            self.output(f"Total objects: {total_objects}", verbose_level=2)
+            # if total count is 0, return empty list
+            if total_objects == 0:
+                return []
+            pages = {0: page_results(r)}
         except (KeyError, TypeError):
             # if not, we're not dealing with a paginated endpoint, so just return the
             # results list
-            object_list = r.output
+            return r.output
+
+        # now get the remaining pages concurrently
+        page_count = (total_objects + page_size - 1) // page_size
+        if page_count > 1:
+            self.output(
+                f"Getting {page_count - 1} further pages of {page_size} objects "
+                f"using {workers} workers",
+                verbose_level=2,
+            )
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = {
+                    executor.submit(get_page, page): page
+                    for page in range(1, page_count)
+                }
+                for future in as_completed(futures):
+                    page_r = future.result()
+                    if page_r.status_code != 200:
+                        raise ProcessorError(
+                            f"ERROR: Unable to get list of {object_type} from {domain}"
+                        )
+                    self.log("Output:\n%s", page_r.output, verbose_level=4)
+                    pages[futures[future]] = page_results(page_r)
 
+        object_list = []
+        for page in sorted(pages):
+            object_list.extend(pages[page])
         return object_list
 
     def get_all_api_objects(
         self, domain, object_type, tenant_id="", uuid="", token="", namekey=""
     ):
         """get a list of all objects of a particular type"""
+        resolved = self.resolve_endpoint(object_type, tenant_id)
 
         # Resolve the correct name key for this object type if not provided
         if not namekey:
-            namekey = self.get_namekey(object_type)
+            namekey = resolved.name_key
 
         # Get all objects from Jamf Pro as JSON object
-        self.output(
-            f"Getting all {self.api_endpoints(object_type, tenant_id=tenant_id)} from {domain}"
-        )
+        self.output(f"Getting all {resolved.url_path()} from {domain}")
+
+        # return a copy of the list if it was already downloaded during this run
+        cache = self._get_object_cache()
+        cache_key = JamfObjectCache.make_key(domain, object_type, tenant_id, uuid)
+        object_list = cache.get_list(cache_key) if cache else None
+        if cache:
+            self._output_object_cache_stats(cache)
+        endpoint = resolved.url_path(uuid)
 
         # find the number of objects to get so that we can paginate properly
         # get api type
-        api_type = self.api_type(object_type)
-        if api_type == "classic":
+        api_type = resolved.api_type
+        if object_list is not None:
+            self.output(f"Using cached list of {object_type}", verbose_level=2)
+        elif api_type == "classic":
             # Classic API: no pagination, just get all objects at once
-            url = f"{domain}/{self.api_endpoints(object_type, uuid=uuid, tenant_id=tenant_id)}"
+            url = f"{domain}/{endpoint}"
             r = self.curl(api_type=api_type, request="GET", url=url, token=token)
             if r.status_code != 200:
                 raise ProcessorError(
                     f"ERROR: Unable to get list of {object_type} from {domain}"
                 )
-            self.output(f"Output:\n{r.output}", verbose_level=4)
-            object_list = r.output[self.object_list_types(object_type)]
+            self.log("Output:\n%s", r.output, verbose_level=4)
+            object_list = r.output[resolved.list_key]
+            if cache:
+                cache.put_list(cache_key, endpoint, object_list)
         elif api_type == "jpapi" or api_type == "platform":
             # Jamf Pro API: use pagination
             # url_filter = "?page=0&page-size=1"
-            url = f"{domain}/{self.api_endpoints(object_type, uuid=uuid, tenant_id=tenant_id)}"
+            url = f"{domain}/{endpoint}"
             object_list = self.paginated_get(
                 api_type,
                 url,
@@ -2097,6 +2685,8 @@ class JamfUploaderBase(Processor):
                 namekey,
                 domain,
             )
+            if cache:
+                cache.put_list(cache_key, endpoint, object_list)
         else:
             raise ProcessorError(f"ERROR: Unknown API type {api_type}")
 
@@ -2106,22 +2696,25 @@ class JamfUploaderBase(Processor):
         except (KeyError, TypeError, AttributeError):
             # if not, just leave the list as is
             pass
-        self.output(f"List of objects:\n{object_list}", verbose_level=3)
+        self.log(
+            lambda: f"List of {len(object_list)} objects:\n{object_list}",
+            verbose_level=3,
+        )
 
         return object_list
 
     def get_settings_object(self, jamf_url, object_type, token="", tenant_id=""):
         """get the content of a settings-style endpoint"""
+        resolved = self.resolve_endpoint(object_type, tenant_id)
+
         # Get results from Jamf Pro as JSON object
-        self.output(
-            f"Getting {self.api_endpoints(object_type, tenant_id=tenant_id)} from {jamf_url}"
-        )
+        self.output(f"Getting {resolved.url_path()} from {jamf_url}")
 
         # get api type
-        api_type = self.api_type(object_type)
+        api_type = resolved.api_type
 
         # check for existing
-        url = f"{jamf_url}/{self.api_endpoints(object_type, tenant_id=tenant_id)}"
+        url = f"{jamf_url}/{resolved.url_path()}"
 
         # for Classic API
         if api_type == "classic":
@@ -2142,10 +2735,7 @@ class JamfUploaderBase(Processor):
                 object_content = ET.tostring(object_xml, encoding="UTF-8").decode(
                     "UTF-8"
                 )
-            self.output(
-                object_content,
-                verbose_level=4,
-            )
+            self.log(object_content, verbose_level=4)
 
         # for Jamf Pro API
         else:
@@ -2157,10 +2747,7 @@ class JamfUploaderBase(Processor):
                 accept_header="json",
             )
             object_content = r.output
-            self.output(
-                object_content,
-                verbose_level=4,
-            )
+            self.log(object_content, verbose_level=4)
 
         return object_content
 
@@ -2219,10 +2806,7 @@ class JamfUploaderBase(Processor):
                     object_content = r.output
                 else:
                     object_content = json.loads(r.output)
-                self.output(
-                    object_content,
-                    verbose_level=4,
-                )
+                self.log(object_content, verbose_level=4)
                 return object_content
 
     def get_api_object_value_from_id(
@@ -2248,7 +2832,7 @@ class JamfUploaderBase(Processor):
                     object_content = r.output
                 else:
                     object_content = json.loads(r.output)
-                self.output(object_content, verbose_level=4)
+                self.log(object_content, verbose_level=4)
 
                 # convert an xpath to json
                 xpath_list = object_path.split("/")
@@ -2258,7 +2842,7 @@ class JamfUploaderBase(Processor):
                     if xpath:
                         try:
                             value = value[xpath]
-                            self.output(value, verbose_level=3)
+                            self.log(value, verbose_level=3)
                         except KeyError:
                             value = ""
                             break
@@ -2271,7 +2855,7 @@ class JamfUploaderBase(Processor):
             r = self.curl(api_type=api_type, request="GET", url=url, token=token)
             if r.status_code == 200:
                 object_content = r.output
-                self.output(object_content, verbose_level=4)
+                self.log(object_content, verbose_level=4)
 
                 # convert an xpath to json
                 xpath_list = object_path.split("/")
@@ -2281,7 +2865,7 @@ class JamfUploaderBase(Processor):
                     if xpath:
                         try:
                             value = value[xpath]
-                            self.output(value, verbose_level=3)
+                            self.log(value, verbose_level=3)
                         except KeyError:
                             value = ""
                             break
@@ -2291,7 +2875,7 @@ class JamfUploaderBase(Processor):
                     f"ERROR: {object_type} of ID {object_id} not found."
                 )
         if value:
-            self.output(f"Value of '{object_path}': {value}", verbose_level=2)
+            self.log("Value of '%s': %s", object_path, value, verbose_level=2)
         return value
 
     def delete_object(
@@ -2327,13 +2911,12 @@ class JamfUploaderBase(Processor):
             # check HTTP response
             if self.status_check(r, object_type, object_id, "DELETE") == "break":
                 break
-            if count >= max_tries:
+            if not self.retry_wait(r, count, max_tries, url=url):
                 self.output(
-                    f"WARNING: {object_type} deletion did not succeed after {max_tries} attempts"
+                    f"WARNING: {object_type} deletion did not succeed after {count} attempts"
                 )
                 self.output(f"\nHTTP POST Response Code: {r.status_code}")
                 raise ProcessorError(f"ERROR: {object_type} deletion failed ")
-            sleep(10)
         return r.status_code
 
     def pretty_print_xml(self, xml):
@@ -2382,7 +2965,7 @@ class JamfUploaderBase(Processor):
         # convert to string
         template_contents = template_contents.decode("UTF-8")
         # Print new scope element for debugging
-        self.output(template_contents, verbose_level=2)
+        self.log(template_contents, verbose_level=2)
         return template_contents
 
     def mount_smb(self, mount_share, mount_user, mount_pass):
@@ -2565,6 +3148,78 @@ class JamfUploaderBase(Processor):
             return json.dumps(existing_object, indent=4)
         return ""
 
+    def object_is_unchanged(
+        self,
+        jamf_url,
+        object_type,
+        object_id,
+        new_contents,
+        token,
+        tenant_id="",
+        elements_to_remove=None,
+    ):
+        """Return True if the existing object already matches the contents that
+        would be uploaded, so that the PUT can be skipped.
+
+        Only the elements or keys present in new_contents are compared. Any
+        failure to fetch or parse the existing object returns False, so that the
+        upload goes ahead as before. Set disable_unchanged_check to always upload.
+        """
+        if self.to_bool(self.env.get("disable_unchanged_check", False)):
+            return False
+        existing_object = self.get_api_object_contents_from_id(
+            jamf_url,
+            object_type,
+            object_id,
+            "",
+            token=token,
+            tenant_id=tenant_id,
+        )
+        if not existing_object:
+            return False
+        if isinstance(new_contents, (dict, list)):
+            # parse_downloaded_api_object alters dicts in place
+            new_contents = json.dumps(new_contents)
+        try:
+            existing_parsed = self.parse_downloaded_api_object(
+                existing_object, object_type, elements_to_remove
+            )
+            new_parsed = self.parse_downloaded_api_object(
+                new_contents, object_type, elements_to_remove
+            )
+            unchanged, existing_hash, new_hash = compare_objects(
+                existing_parsed, new_parsed, self.api_type(object_type)
+            )
+        except (ET.ParseError, ProcessorError, ValueError) as e:
+            self.output(
+                f"Could not compare with the existing {object_type}: {e}",
+                verbose_level=2,
+            )
+            return False
+        self.output(
+            f"Existing {object_type} hash: {existing_hash}; new: {new_hash}",
+            verbose_level=2,
+        )
+        return unchanged
+
+    def unchanged_summary(self, summary_key, object_type, object_name):
+        """Record an object that was not re-uploaded because it was unchanged.
+
+        This uses its own summary key, so that it does not trigger the
+        notifications that are sent for created or updated objects."""
+        self.output(
+            f"{object_type} '{object_name}' is unchanged in Jamf Pro; not uploading",
+            verbose_level=1,
+        )
+        self.env[summary_key] = {
+            "summary_text": (
+                "The following objects were unchanged in Jamf Pro "
+                "and were not re-uploaded:"
+            ),
+            "report_fields": ["object_type", "object_name"],
+            "data": {"object_type": object_type, "object_name": object_name},
+        }
+
     def substitute_existing_version_locks(
         self, jamf_url, object_type, object_id, object_template, token, tenant_id=""
     ):
@@ -2643,8 +3298,7 @@ class JamfUploaderBase(Processor):
         """prepare the object contents"""
         # import template from file and replace any keys in the template
         if os.path.exists(object_template):
-            with open(object_template, "r", encoding="utf-8") as file:
-                template_contents = file.read()
+            template_contents = self.read_template(object_template)
         else:
             raise ProcessorError("Template does not exist!")
 
@@ -2681,7 +3335,7 @@ class JamfUploaderBase(Processor):
             template_contents = self.inject_version_lock(template_contents)
 
         self.output("object data:", verbose_level=2)
-        self.output(template_contents, verbose_level=2)
+        self.log(template_contents, verbose_level=2)
 
         # write the template to temp file
         template_file = self.write_temp_file(jamf_url, template_contents)